@@ -3,12 +3,8 @@ Main Flask application entry point
 """
 from flask import Flask, jsonify
 from flask_cors import CORS
-try:
-    from flask_session import Session
-except ImportError:
-    Session = None
 from config import config
-from database import db, init_db
+from database import db, register_models
 import os
 
 def create_app(config_name='development'):
@@ -24,18 +20,13 @@ def create_app(config_name='development'):
     # Initialize CORS with credentials support
     CORS(app, supports_credentials=True, origins=['http://localhost:3000', 'http://localhost:5173', 'http://localhost:5174'])
     
-    # Initialize Flask-Session if available; fall back to signed cookies otherwise
-    if Session:
-        Session(app)
-    else:
-        app.logger.warning("Flask-Session not installed; using default client-side sessions.")
+    # Initialize the server-side session backend (SESSION_TYPE)
+    from utils.sessions import init_sessions
+    init_sessions(app)
     
-    # Initialize SQLAlchemy
+    # Initialize SQLAlchemy; schema and seed data are managed by manage.py
     db.init_app(app)
-
-    # Initialize and create database tables
-    init_db(app)
-    print("✓ Database tables created successfully")
+    register_models()
     
     # Register blueprints
     from auth.routes import auth_bp
@@ -48,6 +39,7 @@ def create_app(config_name='development'):
     from routes.feedback import feedback_bp
     from routes.document_routes import document_bp
     from routes.consultant_routes import consultant_bp
+    from routes.job_routes import job_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(profile_bp)
@@ -59,6 +51,7 @@ def create_app(config_name='development'):
     app.register_blueprint(feedback_bp)
     app.register_blueprint(document_bp)
     app.register_blueprint(consultant_bp)
+    app.register_blueprint(job_bp)
     
     # Health check route
     @app.route('/api/health', methods=['GET'])
@@ -74,51 +67,6 @@ def create_app(config_name='development'):
     def internal_error(error):
         return jsonify({'error': 'Internal server error'}), 500
     
-    with app.app_context():
-        from models.tax_slab import TaxSlab
-        from models.user import User
-        # Seed default tax slabs if none exist
-        if TaxSlab.query.count() == 0:
-            default_slabs = [
-                TaxSlab(min_income=0, max_income=300000, tax_rate=0),           # 0% for first 300K
-                TaxSlab(min_income=300000, max_income=400000, tax_rate=5),      # 5% for 300K-400K
-                TaxSlab(min_income=400000, max_income=500000, tax_rate=10),     # 10% for 400K-500K
-                TaxSlab(min_income=500000, max_income=600000, tax_rate=15),     # 15% for 500K-600K
-                TaxSlab(min_income=600000, max_income=3000000, tax_rate=20),    # 20% for 600K-3M
-                TaxSlab(min_income=3000000, max_income=None, tax_rate=25),      # 25% for 3M+
-            ]
-            db.session.bulk_save_objects(default_slabs)
-            db.session.commit()
-            print("✓ Default tax slabs seeded successfully")
-        
-        # Create default admin user if none exists
-        admin = User.query.filter_by(email='admin@tax.com').first()
-        if not admin:
-            admin = User(email='admin@tax.com', role='admin')
-            admin.set_password('admin123')
-            db.session.add(admin)
-            db.session.commit()
-        
-        # Create default consultant if none exists
-        consultant_user = User.query.filter_by(email='consultant@tax.com').first()
-        if not consultant_user:
-            from models.consultant import Consultant
-            consultant_user = User(email='consultant@tax.com', role='consultant')
-            consultant_user.set_password('cons123')
-            db.session.add(consultant_user)
-            db.session.commit()
-            
-            # Create consultant profile
-            consultant_profile = Consultant(
-                user_id=consultant_user.id,
-                qualification='Certified Tax Specialist (CTS)',
-                experience='8 years in Corporate Tax Filing',
-                bio='Expert in personal and corporate tax optimization. Helping clients stay compliant and save money since 2016.'
-            )
-            db.session.add(consultant_profile)
-            db.session.commit()
-            print("✓ Default consultant created (consultant@tax.com / cons123)")
-    
     return app
 
 if __name__ == '__main__':
@@ -128,5 +76,6 @@ if __name__ == '__main__':
     print("="*50)
     print("📍 API Base URL: http://localhost:5000/api")
     print("🔐 Default Admin: admin@tax.com / admin123")
+    print("🗄️  First run? Create the schema and seed data: python manage.py setup")
     print("="*50 + "\n")
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -4,10 +4,17 @@ Authentication routes for user registration and login
 from flask import Blueprint, request, jsonify, session
 from models import db
 from models.user import User
+from services.password_hasher import PasswordHasherBusy
 import re
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+def _busy_response():
+    """429 for when the password hashing pool is saturated"""
+    response = jsonify({'error': 'Too many login attempts right now. Please try again shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
 def validate_email(email):
     """Validate email format"""
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -60,6 +67,9 @@ def register():
             'user': new_user.to_dict()
         }), 201
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return _busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Registration failed: {str(e)}'}), 500
@@ -91,6 +101,14 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated. Contact admin.'}), 403
         
+        # Upgrade hashes made with an older work factor while the password is known
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except PasswordHasherBusy:
+                db.session.rollback()
+        
         # Create session
         session['user_id'] = user.id
         session['email'] = user.email
@@ -101,6 +119,8 @@ def login():
             'user': user.to_dict()
         }), 200
         
+    except PasswordHasherBusy:
+        return _busy_response()
     except Exception as e:
         return jsonify({'error': f'Login failed: {str(e)}'}), 500
 
@@ -0,0 +1,190 @@
+"""
+Query plan benchmark for the hot-query composite indexes (migration 0004)
+
+Seeds a synthetic dataset, then runs the hot endpoint queries twice: once
+without the 0004 indexes and once after applying the migration. Prints each
+query's plan and median latency for both runs.
+
+    python benchmarks/index_benchmark.py --rows 1000000
+    python benchmarks/index_benchmark.py --database-url mysql+pymysql://u:p@localhost/bench
+
+--rows is the number of tax submissions, payments and chat messages; users,
+consultation requests, feedback and documents are scaled from it. Use a
+scratch database: every table in it is dropped and re-created.
+"""
+import argparse
+import importlib
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+from database import db, register_models  # noqa: E402
+from migrations import drop_indexes  # noqa: E402
+
+hot_query_indexes = importlib.import_module('migrations.0004_hot_query_indexes')
+
+BATCH_SIZE = 10000
+
+# (label, SQL, parameters) for the query shapes the indexes target
+QUERIES = [
+    ('user submission history',
+     'SELECT * FROM tax_submissions WHERE user_id = :user_id ORDER BY submitted_at DESC',
+     {'user_id': 42}),
+    ('user pending submissions',
+     "SELECT * FROM tax_submissions WHERE user_id = :user_id AND status = 'pending'",
+     {'user_id': 42}),
+    ('re-assessment keyset chunk',
+     "SELECT id, taxable_income FROM tax_submissions WHERE status = 'pending' AND id > :last_id ORDER BY id LIMIT 1000",
+     {'last_id': 500000}),
+    ('user payment history',
+     'SELECT * FROM payments WHERE user_id = :user_id ORDER BY paid_at DESC',
+     {'user_id': 42}),
+    ('admin payments by status',
+     "SELECT * FROM payments WHERE status = 'pending' ORDER BY paid_at DESC LIMIT 50",
+     {}),
+    ('consultant dashboard count',
+     "SELECT COUNT(*) FROM consultation_requests WHERE consultant_id = :consultant_id AND status = 'accepted'",
+     {'consultant_id': 7}),
+    ('consultant request list',
+     'SELECT * FROM consultation_requests WHERE consultant_id = :consultant_id ORDER BY created_at DESC',
+     {'consultant_id': 7}),
+    ('admin sessions by status',
+     "SELECT * FROM consultation_requests WHERE status = 'completed' ORDER BY created_at DESC, id DESC LIMIT 50",
+     {}),
+    ('admin chat viewer',
+     'SELECT * FROM consultation_messages WHERE consultation_id = :consultation_id ORDER BY timestamp',
+     {'consultation_id': 1234}),
+    ('admin feedback by status',
+     "SELECT * FROM feedback WHERE status = 'pending' ORDER BY created_at DESC",
+     {}),
+    ('user documents',
+     'SELECT * FROM document WHERE user_id = :user_id ORDER BY uploaded_at DESC',
+     {'user_id': 42}),
+]
+
+
+def _batched(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(engine, rows):
+    """Drop and re-create every table, then fill them with synthetic rows"""
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    users = max(100, rows // 100)
+    consultants = max(10, users // 100)
+    requests = max(100, rows // 10)
+
+    def moment():
+        return start + timedelta(seconds=rng.randrange(60 * 60 * 24 * 730))
+
+    tables = {t.name: t for t in db.metadata.sorted_tables}
+    generators = [
+        ('users', ({'email': f'user{i}@bench.test', 'password_hash': 'x', 'role': 'user',
+                    'is_active': True, 'created_at': moment()} for i in range(users))),
+        ('consultants', ({'user_id': rng.randrange(1, users + 1), 'is_available': True}
+                         for _ in range(consultants))),
+        ('tax_submissions', ({'user_id': rng.randrange(1, users + 1), 'income_details': '{}',
+                              'total_income': 600000, 'taxable_income': 600000, 'tax_amount': 25000,
+                              'status': rng.choice(('pending', 'paid', 'paid', 'overdue')),
+                              'submitted_at': moment()} for _ in range(rows))),
+        ('payments', ({'user_id': rng.randrange(1, users + 1), 'submission_id': i + 1, 'amount': 25000,
+                       'payment_method': 'card', 'transaction_id': f'TXN{i:010d}',
+                       'status': rng.choice(('completed', 'completed', 'completed', 'pending')),
+                       'paid_at': moment()} for i in range(rows))),
+        ('consultation_requests', ({'user_id': rng.randrange(1, users + 1),
+                                    'consultant_id': rng.randrange(1, consultants + 1),
+                                    'status': rng.choice(('pending', 'accepted', 'rejected', 'completed')),
+                                    'topic': 'bench', 'created_at': moment()} for _ in range(requests))),
+        ('consultation_messages', ({'consultation_id': rng.randrange(1, requests + 1),
+                                    'sender_id': rng.randrange(1, users + 1), 'message': 'hello',
+                                    'timestamp': moment()} for _ in range(rows))),
+        ('feedback', ({'user_id': rng.randrange(1, users + 1), 'subject': 'bench', 'message': 'bench',
+                       'status': rng.choice(('pending', 'reviewed', 'resolved')),
+                       'created_at': moment()} for _ in range(max(100, rows // 10)))),
+        ('document', ({'filename': 'file.pdf', 'path': 'uploads/file.pdf',
+                       'user_id': rng.randrange(1, users + 1), 'uploaded_at': moment()}
+                      for _ in range(max(100, rows // 10)))),
+    ]
+
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    for name, generator in generators:
+        began = time.perf_counter()
+        count = 0
+        for batch in _batched(generator):
+            with engine.begin() as connection:
+                connection.execute(insert(tables[name]), batch)
+            count += len(batch)
+        print(f"  seeded {name}: {count} rows in {time.perf_counter() - began:.1f}s")
+
+
+def explain(connection, sql, params):
+    """Query plan as printable lines"""
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = connection.execute(text(prefix + sql), params).fetchall()
+    if connection.dialect.name == 'sqlite':
+        return [row[-1] for row in rows]
+    return [' | '.join(f'{key}={value}' for key, value in row._mapping.items() if value is not None) for row in rows]
+
+
+def measure(engine, repeat):
+    """Plan and median latency (ms) of every benchmark query"""
+    results = {}
+    with engine.connect() as connection:
+        for label, sql, params in QUERIES:
+            timings = []
+            for _ in range(repeat):
+                began = time.perf_counter()
+                connection.execute(text(sql), params).fetchall()
+                timings.append((time.perf_counter() - began) * 1000)
+            results[label] = (explain(connection, sql, params), statistics.median(timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default='sqlite:///index_benchmark.db')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--skip-seed', action='store_true', help='reuse the data from a previous run')
+    args = parser.parse_args()
+
+    register_models()
+    engine = create_engine(args.database_url)
+
+    if not args.skip_seed:
+        print(f"Seeding {args.rows} rows into {engine.url.render_as_string(hide_password=True)}")
+        seed(engine, args.rows)
+
+    with engine.begin() as connection:
+        drop_indexes(connection, hot_query_indexes.INDEXES)
+    before = measure(engine, args.repeat)
+
+    with engine.begin() as connection:
+        hot_query_indexes.upgrade(connection)
+    after = measure(engine, args.repeat)
+
+    for label, _, _ in QUERIES:
+        plan_before, ms_before = before[label]
+        plan_after, ms_after = after[label]
+        print(f"\n== {label}: {ms_before:.2f} ms -> {ms_after:.2f} ms")
+        print("  before: " + "\n          ".join(plan_before))
+        print("  after:  " + "\n          ".join(plan_after))
+
+
+if __name__ == '__main__':
+    main()
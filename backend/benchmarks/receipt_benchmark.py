@@ -0,0 +1,82 @@
+"""
+Receipt rendering micro-benchmark
+
+Compares receipts per second for a freshly rendered receipt download:
+    baseline  the original renderer (benchmarks/baseline_pdf_generator.py):
+              styles rebuilt for every receipt, SimpleDocTemplate writing to
+              a file path, the file then read back to be sent
+    current   ReceiptStore.get_receipt: styles built once per process, PDF
+              rendered into memory, stored under its content key and sent
+              from memory
+
+    python benchmarks/receipt_benchmark.py --count 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.baseline_pdf_generator import PDFGenerator as BaselinePDFGenerator  # noqa: E402
+from services.receipt_store import ReceiptStore  # noqa: E402
+
+
+def sample_receipts(count):
+    """Synthetic (payment, user, profile, submission) tuples"""
+    receipts = []
+    for i in range(count):
+        submission = SimpleNamespace(total_income=850000 + i, taxable_income=750000 + i, tax_amount=42500 + i)
+        payment = SimpleNamespace(transaction_id=f'TXN{i:010d}', paid_at=datetime(2024, 7, 1, 12, 0, i % 60),
+                                  status='completed', amount=42500 + i, payment_method='card')
+        user = SimpleNamespace(email=f'user{i}@bench.test')
+        profile = SimpleNamespace(name=f'Taxpayer {i}', nid=f'{1990000000 + i}', tin=f'{100000000000 + i}')
+        receipts.append((payment, user, profile, submission))
+    return receipts
+
+
+def render_baseline(receipt, directory):
+    """Baseline download: render to a file with fresh styles, read it back"""
+    path = BaselinePDFGenerator.generate_receipt(*receipt, output_dir=directory)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def render_current(receipt, directory):
+    """Current download of a receipt that is not stored yet"""
+    _, _, pdf = ReceiptStore.get_receipt(*receipt, receipt_dir=directory)
+    return pdf
+
+
+def measure(render, receipts, directory):
+    """Receipts rendered per second"""
+    began = time.perf_counter()
+    for receipt in receipts:
+        render(receipt, directory)
+    return len(receipts) / (time.perf_counter() - began)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=500)
+    args = parser.parse_args()
+
+    receipts = sample_receipts(args.count)
+    warmup = sample_receipts(1)
+    # Separate directories so neither run finds the other's files
+    with tempfile.TemporaryDirectory() as baseline_dir, tempfile.TemporaryDirectory() as current_dir:
+        # Warm up font and module caches so both runs start equal
+        render_baseline(warmup[0], os.path.join(baseline_dir, 'warmup'))
+        render_current(warmup[0], os.path.join(current_dir, 'warmup'))
+        before = measure(render_baseline, receipts, baseline_dir)
+        after = measure(render_current, receipts, current_dir)
+
+    print(f"baseline renderer: {before:.1f} receipts/sec")
+    print(f"current renderer:  {after:.1f} receipts/sec ({after / before:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
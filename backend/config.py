@@ -40,8 +40,68 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Session configuration
-    SESSION_TYPE = 'filesystem'
+    # SESSION_TYPE: filesystem, memory (single node) or redis
+    SESSION_TYPE = os.getenv('SESSION_TYPE', 'filesystem')
     SESSION_PERMANENT = False
+    # Seconds a session is kept server-side after its last change
+    # (default 31 days, Flask's own PERMANENT_SESSION_LIFETIME)
+    SESSION_LIFETIME = int(os.getenv('SESSION_LIFETIME', str(31 * 86400)))
+    PERMANENT_SESSION_LIFETIME = SESSION_LIFETIME
+    SESSION_MEMORY_MAX_ENTRIES = int(os.getenv('SESSION_MEMORY_MAX_ENTRIES', '100000'))
+    SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+    SESSION_REDIS_POOL_SIZE = int(os.getenv('SESSION_REDIS_POOL_SIZE', '20'))
+    # Filesystem sessions: never prune inline (0 = no threshold); the sweeper
+    # removes expired files every SESSION_SWEEP_INTERVAL seconds instead
+    SESSION_FILE_THRESHOLD = 0
+    SESSION_SWEEP_INTERVAL = int(os.getenv('SESSION_SWEEP_INTERVAL', '600'))
+    
+    # Password hashing: bcrypt work factor for new hashes (2^rounds iterations),
+    # worker processes (0 = hash in the calling thread), operations queued or
+    # running before new ones are rejected, and seconds a request waits for its hash
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', str(min(4, os.cpu_count() or 1))))
+    BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', str(max(1, BCRYPT_WORKERS) * 8)))
+    BCRYPT_TIMEOUT = float(os.getenv('BCRYPT_TIMEOUT', '10'))
+    
+    # Batch tax calculation limits
+    TAX_BATCH_MAX_ROWS = int(os.getenv('TAX_BATCH_MAX_ROWS', '100000'))
+    TAX_BATCH_CHUNK_SIZE = int(os.getenv('TAX_BATCH_CHUNK_SIZE', '10000'))
+    
+    # Pending submissions re-priced per transaction after a slab change
+    REASSESSMENT_CHUNK_SIZE = int(os.getenv('REASSESSMENT_CHUNK_SIZE', '1000'))
+    
+    # Seconds the admin dashboard snapshot may be served before it is recomputed
+    DASHBOARD_STATS_MAX_AGE = int(os.getenv('DASHBOARD_STATS_MAX_AGE', '60'))
+    
+    # Refresh interval (and client max-age) of the public landing page stats
+    PUBLIC_STATS_INTERVAL = int(os.getenv('PUBLIC_STATS_INTERVAL', '30'))
+    
+    # Seconds between keep-alive comments on consultation event streams
+    CHAT_STREAM_HEARTBEAT = int(os.getenv('CHAT_STREAM_HEARTBEAT', '15'))
+    
+    # Directory holding rendered PDF receipts
+    RECEIPT_DIR = os.getenv('RECEIPT_DIR', 'static/receipts')
+    
+    # Directory holding files written by background export jobs (relative to the backend directory)
+    EXPORT_DIR = os.getenv('EXPORT_DIR', 'static/exports')
+    
+    # Background jobs: JOB_BROKER is database (shared by every process) or
+    # memory (single process); JOB_WORKERS threads run jobs inside the web
+    # process (0 = only `python manage.py worker` processes run them)
+    JOB_BROKER = os.getenv('JOB_BROKER', 'database')
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+    # Retry delay: JOB_RETRY_BACKOFF * 2^(attempt - 1) seconds, at most JOB_RETRY_BACKOFF_MAX
+    JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', '5'))
+    JOB_RETRY_BACKOFF_MAX = float(os.getenv('JOB_RETRY_BACKOFF_MAX', '300'))
+    # Seconds between polls of the jobs table while idle
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1'))
+    # Seconds a claimed job is reserved for its worker; the worker renews the
+    # lease while the job runs, so only jobs of vanished workers are picked up again
+    JOB_LEASE = int(os.getenv('JOB_LEASE', '600'))
+    # Seconds finished jobs (and their export files) are kept before
+    # `python manage.py purge-jobs` deletes them
+    JOB_RETENTION = int(os.getenv('JOB_RETENTION', str(7 * 24 * 3600)))
     
     # AI Chatbot API configuration
     CHATBOT_API_URL = os.getenv('CHATBOT_API_URL', '')
@@ -57,9 +117,22 @@ class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
 
+class TestingConfig(Config):
+    """Test suite configuration: SQLite, in-process sessions, job broker and hashing"""
+    DEBUG = False
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite://')
+    SESSION_TYPE = 'memory'
+    JOB_BROKER = 'memory'
+    JOB_WORKERS = 0
+    # Cheap hashes, computed inline
+    BCRYPT_ROUNDS = 4
+    BCRYPT_WORKERS = 0
+
 # Configuration dictionary
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
@@ -2,16 +2,23 @@ from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
 
-def init_db(app):
-    """Initializes the database and registers models."""
+def register_models():
+    """Import every model so its table is registered on db.metadata"""
     from models.user import User
-    from models.tax_slab import TaxSlab
+    from models.tax_slab import TaxSlab, TaxSlabVersion
     from models.tax_submission import TaxSubmission
     from models.payment import Payment
     from models.feedback import Feedback
     from models.document import Document
     from models.taxpayer_profile import TaxpayerProfile
     from models.consultant import Consultant, ConsultationRequest, ConsultationMessage
+    from models.job import Job
+
+def init_db(app):
+    """Initializes the database and brings the schema up to date."""
+    register_models()
 
     with app.app_context():
-        db.create_all()
+        from migrations import upgrade
+        for migration in upgrade(db.engine):
+            print(f"✓ Applied migration {migration.version}_{migration.name}")
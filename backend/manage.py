@@ -0,0 +1,157 @@
+"""
+Database management command line (schema and seed data)
+
+    python manage.py setup       apply pending migrations, then seed defaults
+    python manage.py upgrade     apply pending migrations
+    python manage.py seed        create default tax slabs and accounts if missing
+    python manage.py status      list migrations and when they were applied
+    python manage.py sweep-sessions   delete expired filesystem session files
+    python manage.py purge-jobs  delete finished jobs older than JOB_RETENTION
+    python manage.py worker [threads] run background jobs until interrupted
+
+Set FLASK_CONFIG to pick the configuration (default: development).
+The web app itself never creates tables or seed data; run this once per
+deployment (and after pulling new migrations) before starting the server.
+"""
+from flask import Flask
+from config import config
+from database import db, init_db, register_models
+import migrations
+import os
+import sys
+
+# Pre-2025 slab table used when the tax_slabs table is empty
+DEFAULT_SLABS = [
+    (0, 300000, 0),             # 0% for first 300K
+    (300000, 400000, 5),        # 5% for 300K-400K
+    (400000, 500000, 10),       # 10% for 400K-500K
+    (500000, 600000, 15),       # 15% for 500K-600K
+    (600000, 3000000, 20),      # 20% for 600K-3M
+    (3000000, None, 25),        # 25% for 3M+
+]
+
+def create_management_app(config_name):
+    """Minimal app with only the database configured (no routes)"""
+    app = Flask(__name__)
+    app.config.from_object(config[config_name])
+    db.init_app(app)
+    register_models()
+    return app
+
+def seed_defaults():
+    """Seed default tax slabs and the default admin and consultant accounts"""
+    from models.tax_slab import TaxSlab
+    from models.user import User
+    from models.consultant import Consultant
+    from services.tax_engine import TaxEngine, DEFAULT_ASSESSMENT_YEAR
+    
+    # Seed default tax slabs if none exist
+    if TaxSlab.query.count() == 0:
+        db.session.bulk_save_objects([
+            TaxSlab(min_income=low, max_income=high, tax_rate=rate)
+            for low, high, rate in DEFAULT_SLABS
+        ])
+        db.session.commit()
+        print("✓ Default tax slabs seeded successfully")
+    
+    # Seed the dated slab set for the current assessment year from the tax engine rules
+    if TaxSlab.query.filter_by(assessment_year=DEFAULT_ASSESSMENT_YEAR).count() == 0:
+        db.session.bulk_save_objects([
+            TaxSlab(min_income=low, max_income=high, tax_rate=rate, assessment_year=DEFAULT_ASSESSMENT_YEAR)
+            for low, high, rate in TaxEngine.slab_bounds(DEFAULT_ASSESSMENT_YEAR)
+        ])
+        db.session.commit()
+        print(f"✓ {DEFAULT_ASSESSMENT_YEAR} tax slabs seeded successfully")
+    
+    # Create default admin user if none exists
+    admin = User.query.filter_by(email='admin@tax.com').first()
+    if not admin:
+        admin = User(email='admin@tax.com', role='admin')
+        admin.set_password('admin123')
+        db.session.add(admin)
+        db.session.commit()
+        print("✓ Default admin created (admin@tax.com / admin123)")
+    
+    # Create default consultant if none exists
+    consultant_user = User.query.filter_by(email='consultant@tax.com').first()
+    if not consultant_user:
+        consultant_user = User(email='consultant@tax.com', role='consultant')
+        consultant_user.set_password('cons123')
+        db.session.add(consultant_user)
+        db.session.commit()
+        
+        # Create consultant profile
+        consultant_profile = Consultant(
+            user_id=consultant_user.id,
+            qualification='Certified Tax Specialist (CTS)',
+            experience='8 years in Corporate Tax Filing',
+            bio='Expert in personal and corporate tax optimization. Helping clients stay compliant and save money since 2016.'
+        )
+        db.session.add(consultant_profile)
+        db.session.commit()
+        print("✓ Default consultant created (consultant@tax.com / cons123)")
+
+def run_worker(app, threads):
+    """Run job worker threads until interrupted"""
+    import threading
+    from services.jobs import JobQueue
+    
+    if app.config.get('JOB_BROKER') == 'memory':
+        print("✗ JOB_BROKER=memory only reaches workers inside the web process")
+        return 1
+    
+    stop = threading.Event()
+    workers = [threading.Thread(target=JobQueue.work, args=(app, stop)) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    print(f"✓ Job worker running with {threads} threads (Ctrl+C to stop)")
+    try:
+        while any(worker.is_alive() for worker in workers):
+            for worker in workers:
+                worker.join(timeout=1)
+    except KeyboardInterrupt:
+        stop.set()
+        for worker in workers:
+            worker.join()
+    return 0
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'setup'
+    if command not in ('setup', 'upgrade', 'seed', 'status', 'sweep-sessions', 'purge-jobs', 'worker'):
+        print(__doc__)
+        return 1
+    
+    app = create_management_app(os.getenv('FLASK_CONFIG', 'development'))
+    
+    if command == 'sweep-sessions':
+        from utils.sessions import sweep_session_files
+        directory = app.config.get('SESSION_FILE_DIR') or os.path.join(os.getcwd(), 'flask_session')
+        removed = sweep_session_files(directory, app.config['SESSION_LIFETIME'])
+        print(f"✓ Removed {removed} expired session files")
+        return 0
+    
+    if command == 'purge-jobs':
+        from services.jobs import JobQueue
+        with app.app_context():
+            removed = JobQueue.purge_finished(app.config['JOB_RETENTION'])
+        print(f"✓ Removed {removed} finished jobs")
+        return 0
+    
+    if command == 'worker':
+        return run_worker(app, int(argv[2]) if len(argv) > 2 else app.config['JOB_WORKERS'] or 1)
+    
+    if command in ('setup', 'upgrade'):
+        init_db(app)
+        print("✓ Schema is up to date")
+    
+    with app.app_context():
+        if command in ('setup', 'seed'):
+            seed_defaults()
+        if command == 'status':
+            for version, name, applied_at in migrations.status(db.engine):
+                state = applied_at.isoformat() if applied_at else 'pending'
+                print(f"{version}_{name}: {state}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
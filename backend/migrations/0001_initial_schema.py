@@ -0,0 +1,124 @@
+"""
+Baseline schema: the tables as they were before versioned migrations
+Frozen here instead of built from the models, so later model changes never
+leak into this step; every change since has its own migration. Tables that
+already exist are left alone.
+"""
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Integer, MetaData, Numeric, String, Table, Text
+)
+
+metadata = MetaData()
+
+users = Table(
+    'users', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('email', String(120), unique=True, nullable=False, index=True),
+    Column('password_hash', String(255), nullable=False),
+    Column('role', String(20), nullable=False),
+    Column('is_active', Boolean, nullable=False),
+    Column('created_at', DateTime)
+)
+
+taxpayer_profiles = Table(
+    'taxpayer_profiles', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False, unique=True),
+    Column('name', String(200), nullable=False),
+    Column('phone', String(20), nullable=False),
+    Column('nid', String(50), unique=True, nullable=False),
+    Column('tin', String(50), unique=True, nullable=True),
+    Column('address', Text, nullable=False),
+    Column('occupation', String(100), nullable=False),
+    Column('annual_income', Numeric(15, 2), nullable=True),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime)
+)
+
+tax_slabs = Table(
+    'tax_slabs', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('min_income', Numeric(15, 2), nullable=False),
+    Column('max_income', Numeric(15, 2), nullable=True),
+    Column('tax_rate', Numeric(5, 2), nullable=False),
+    Column('created_at', DateTime)
+)
+
+tax_submissions = Table(
+    'tax_submissions', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('income_details', Text, nullable=False),
+    Column('total_income', Numeric(15, 2), nullable=False),
+    Column('taxable_income', Numeric(15, 2), nullable=False),
+    Column('tax_amount', Numeric(15, 2), nullable=False),
+    Column('status', String(20), nullable=False),
+    Column('submitted_at', DateTime)
+)
+
+payments = Table(
+    'payments', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('submission_id', Integer, ForeignKey('tax_submissions.id'), nullable=False, unique=True),
+    Column('amount', Numeric(15, 2), nullable=False),
+    Column('transaction_id', String(100), unique=True, nullable=False),
+    Column('payment_method', String(50), nullable=False),
+    Column('status', String(20), nullable=False),
+    Column('paid_at', DateTime)
+)
+
+consultants = Table(
+    'consultants', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('qualification', String(255)),
+    Column('experience', String(255)),
+    Column('is_available', Boolean),
+    Column('bio', Text)
+)
+
+consultation_requests = Table(
+    'consultation_requests', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('consultant_id', Integer, ForeignKey('consultants.id'), nullable=False),
+    Column('status', String(20)),
+    Column('topic', String(255)),
+    Column('message', Text),
+    Column('created_at', DateTime)
+)
+
+consultation_messages = Table(
+    'consultation_messages', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('consultation_id', Integer, ForeignKey('consultation_requests.id'), nullable=False),
+    Column('sender_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('message', Text, nullable=False),
+    Column('timestamp', DateTime)
+)
+
+feedback = Table(
+    'feedback', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('subject', String(200), nullable=False),
+    Column('message', Text, nullable=False),
+    Column('status', String(20)),
+    Column('admin_notes', Text),
+    Column('created_at', DateTime),
+    Column('updated_at', DateTime)
+)
+
+document = Table(
+    'document', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('filename', String(100), nullable=False),
+    Column('path', String(200), nullable=False),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('uploaded_at', DateTime)
+)
+
+
+def upgrade(connection):
+    metadata.create_all(connection)
@@ -0,0 +1,11 @@
+"""
+Dated slab sets: tax_slabs.assessment_year
+"""
+from migrations import add_column, create_indexes
+
+
+def upgrade(connection):
+    add_column(connection, 'tax_slabs', 'assessment_year', 'VARCHAR(9) NULL')
+    create_indexes(connection, [
+        ('tax_slabs', 'ix_tax_slabs_assessment_year', ['assessment_year']),
+    ])
@@ -0,0 +1,14 @@
+"""
+Indexes backing keyset pagination of admin listings and incremental chat fetches
+"""
+from migrations import create_indexes
+
+INDEXES = [
+    ('payments', 'ix_payments_paid_at_id', ['paid_at', 'id']),
+    ('users', 'ix_users_created_at_id', ['created_at', 'id']),
+    ('consultation_messages', 'ix_consultation_messages_consultation_id_id', ['consultation_id', 'id']),
+]
+
+
+def upgrade(connection):
+    create_indexes(connection, INDEXES)
@@ -0,0 +1,25 @@
+"""
+Composite indexes for the filter + sort shapes of hot endpoints
+"""
+from migrations import create_indexes
+
+INDEXES = [
+    ('tax_submissions', 'ix_tax_submissions_user_id_submitted_at', ['user_id', 'submitted_at']),
+    ('tax_submissions', 'ix_tax_submissions_user_id_status', ['user_id', 'status']),
+    ('tax_submissions', 'ix_tax_submissions_status_id', ['status', 'id']),
+    ('payments', 'ix_payments_user_id_paid_at', ['user_id', 'paid_at']),
+    ('payments', 'ix_payments_status_paid_at', ['status', 'paid_at']),
+    ('consultation_requests', 'ix_consultation_requests_consultant_status_created', ['consultant_id', 'status', 'created_at']),
+    ('consultation_requests', 'ix_consultation_requests_consultant_id_created_at', ['consultant_id', 'created_at']),
+    ('consultation_requests', 'ix_consultation_requests_user_id_created_at', ['user_id', 'created_at']),
+    ('consultation_requests', 'ix_consultation_requests_created_at_id', ['created_at', 'id']),
+    ('consultation_requests', 'ix_consultation_requests_status_created_at_id', ['status', 'created_at', 'id']),
+    ('consultation_messages', 'ix_consultation_messages_consultation_id_timestamp', ['consultation_id', 'timestamp']),
+    ('feedback', 'ix_feedback_status_created_at', ['status', 'created_at']),
+    ('feedback', 'ix_feedback_user_id_created_at', ['user_id', 'created_at']),
+    ('document', 'ix_document_user_id_uploaded_at', ['user_id', 'uploaded_at']),
+]
+
+
+def upgrade(connection):
+    create_indexes(connection, INDEXES)
@@ -0,0 +1,31 @@
+"""
+Background job queue: jobs table
+"""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text
+
+metadata = MetaData()
+
+# Only the referenced key; users itself comes from 0001
+Table('users', metadata, Column('id', Integer, primary_key=True))
+
+jobs = Table(
+    'jobs', metadata,
+    Column('id', String(32), primary_key=True),
+    Column('type', String(50), nullable=False),
+    Column('status', String(20), nullable=False),
+    Column('payload', Text),
+    Column('result', Text),
+    Column('error', Text),
+    Column('attempts', Integer, nullable=False),
+    Column('max_attempts', Integer, nullable=False),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=True),
+    Column('run_after', DateTime, nullable=False),
+    Column('created_at', DateTime),
+    Column('started_at', DateTime),
+    Column('finished_at', DateTime),
+    Index('ix_jobs_status_run_after', 'status', 'run_after')
+)
+
+
+def upgrade(connection):
+    jobs.create(connection, checkfirst=True)
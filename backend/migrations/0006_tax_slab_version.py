@@ -0,0 +1,19 @@
+"""
+Shared slab schedule version: tax_slab_version (one row)
+"""
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, insert, select
+
+metadata = MetaData()
+
+tax_slab_version = Table(
+    'tax_slab_version', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('version', Integer, nullable=False),
+    Column('updated_at', DateTime)
+)
+
+
+def upgrade(connection):
+    tax_slab_version.create(connection, checkfirst=True)
+    if connection.execute(select(tax_slab_version.c.id).where(tax_slab_version.c.id == 1)).first() is None:
+        connection.execute(insert(tax_slab_version).values(id=1, version=0))
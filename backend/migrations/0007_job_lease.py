@@ -0,0 +1,9 @@
+"""
+Job lease ownership: jobs.claimed_by, jobs.lease_expires_at
+"""
+from migrations import add_column
+
+
+def upgrade(connection):
+    add_column(connection, 'jobs', 'claimed_by', 'VARCHAR(100) NULL')
+    add_column(connection, 'jobs', 'lease_expires_at', 'DATETIME NULL')
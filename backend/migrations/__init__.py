@@ -0,0 +1,140 @@
+"""
+Versioned schema migrations
+Each migration is a module named NNNN_description.py in this package with an
+upgrade(connection) function. Applied versions are recorded in the
+schema_migrations table; pending ones run in order, each inside a
+transaction together with its schema_migrations row. That transaction does
+not make a migration atomic: MySQL commits every DDL statement implicitly, so
+a migration that fails halfway leaves its earlier statements applied and is
+not recorded. Migrations must therefore be idempotent - check before each
+change, as the helpers below do - so running them again finishes the job.
+0001 is a frozen snapshot of the baseline schema; never build tables from the
+current models in a migration.
+"""
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select
+from datetime import datetime
+import importlib
+import os
+import re
+
+MIGRATIONS_TABLE = 'schema_migrations'
+_MODULE_PATTERN = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+_metadata = MetaData()
+schema_migrations = Table(
+    MIGRATIONS_TABLE, _metadata,
+    Column('version', String(4), primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+class Migration:
+    """One migration module"""
+
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+
+    def upgrade(self, connection):
+        self.module.upgrade(connection)
+
+
+def load_migrations():
+    """
+    Discover migration modules in version order
+
+    Returns:
+        list: Migration objects
+    """
+    migrations = []
+    for filename in sorted(os.listdir(os.path.dirname(__file__))):
+        match = _MODULE_PATTERN.match(filename)
+        if match:
+            module = importlib.import_module(f'{__name__}.{filename[:-3]}')
+            migrations.append(Migration(match.group(1), match.group(2), module))
+    return migrations
+
+
+def applied_versions(engine):
+    """Versions recorded in schema_migrations, mapped to when they were applied"""
+    with engine.connect() as connection:
+        if not inspect(connection).has_table(MIGRATIONS_TABLE):
+            return {}
+        rows = connection.execute(select(schema_migrations.c.version, schema_migrations.c.applied_at))
+        return {row.version: row.applied_at for row in rows}
+
+
+def status(engine):
+    """
+    Get every known migration with its applied time
+
+    Returns:
+        list: (version, name, applied_at or None) tuples
+    """
+    applied = applied_versions(engine)
+    return [(m.version, m.name, applied.get(m.version)) for m in load_migrations()]
+
+
+def upgrade(engine):
+    """
+    Apply every pending migration in order
+
+    Returns:
+        list: Migrations that were applied
+    """
+    _metadata.create_all(engine)
+    applied = applied_versions(engine)
+
+    done = []
+    for migration in load_migrations():
+        if migration.version in applied:
+            continue
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.utcnow()
+            ))
+        done.append(migration)
+    return done
+
+
+# ---- Helpers for migration modules ----
+
+def add_column(connection, table, column, ddl):
+    """ALTER TABLE table ADD COLUMN column ddl, unless the column exists"""
+    columns = {c['name'] for c in inspect(connection).get_columns(table)}
+    if column not in columns:
+        connection.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}')
+
+
+def create_indexes(connection, indexes):
+    """
+    Create indexes that do not exist yet
+
+    Args:
+        connection: Connection inside the migration transaction
+        indexes: (table, index name, [columns]) tuples
+    """
+    inspector = inspect(connection)
+    existing = {}
+    for table, name, columns in indexes:
+        if table not in existing:
+            existing[table] = {index['name'] for index in inspector.get_indexes(table)}
+        if name not in existing[table]:
+            connection.exec_driver_sql(f'CREATE INDEX {name} ON {table} ({", ".join(columns)})')
+            existing[table].add(name)
+
+
+def drop_indexes(connection, indexes):
+    """Drop indexes that exist (used by benchmarks to measure the schema without them)"""
+    inspector = inspect(connection)
+    for table, name, columns in indexes:
+        if name in {index['name'] for index in inspector.get_indexes(table)}:
+            if connection.dialect.name == 'mysql':
+                connection.exec_driver_sql(f'DROP INDEX {name} ON {table}')
+            else:
+                connection.exec_driver_sql(f'DROP INDEX {name}')
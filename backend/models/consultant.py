@@ -31,6 +31,17 @@ class Consultant(db.Model):
 class ConsultationRequest(db.Model):
     """Requests for consultation from users to consultants"""
     __tablename__ = 'consultation_requests'
+    __table_args__ = (
+        # Consultant dashboard counts
+        db.Index('ix_consultation_requests_consultant_status_created', 'consultant_id', 'status', 'created_at'),
+        # A consultant's requests, newest first
+        db.Index('ix_consultation_requests_consultant_id_created_at', 'consultant_id', 'created_at'),
+        # A user's requests, newest first
+        db.Index('ix_consultation_requests_user_id_created_at', 'user_id', 'created_at'),
+        # Keyset pagination of the admin session list, with and without a status filter
+        db.Index('ix_consultation_requests_created_at_id', 'created_at', 'id'),
+        db.Index('ix_consultation_requests_status_created_at_id', 'status', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -58,6 +69,12 @@ class ConsultationRequest(db.Model):
 class ConsultationMessage(db.Model):
     """Messages within a consultation session"""
     __tablename__ = 'consultation_messages'
+    __table_args__ = (
+        # Incremental chat fetches: WHERE consultation_id = ? AND id > ?
+        db.Index('ix_consultation_messages_consultation_id_id', 'consultation_id', 'id'),
+        # Admin chat viewer, ordered by timestamp
+        db.Index('ix_consultation_messages_consultation_id_timestamp', 'consultation_id', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     consultation_id = db.Column(db.Integer, db.ForeignKey('consultation_requests.id'), nullable=False)
@@ -2,6 +2,11 @@ from . import db
 from datetime import datetime
 
 class Document(db.Model):
+    __table_args__ = (
+        # A user's documents, newest first
+        db.Index('ix_document_user_id_uploaded_at', 'user_id', 'uploaded_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(100), nullable=False)
     path = db.Column(db.String(200), nullable=False)
@@ -8,6 +8,12 @@ from models import db
 class Feedback(db.Model):
     """Feedback model for user submissions"""
     __tablename__ = 'feedback'
+    __table_args__ = (
+        # Admin feedback list filtered by status, newest first
+        db.Index('ix_feedback_status_created_at', 'status', 'created_at'),
+        # A user's feedback, newest first
+        db.Index('ix_feedback_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
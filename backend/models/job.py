@@ -0,0 +1,50 @@
+"""
+Background job model
+Persistent record of work queued for the job workers
+"""
+from datetime import datetime
+from models import db
+import json
+
+class Job(db.Model):
+    """Model for a queued, running or finished background job"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # Workers pick the next due job by status and run_after
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+    
+    id = db.Column(db.String(32), primary_key=True)
+    type = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    payload = db.Column(db.Text)   # JSON arguments for the handler
+    result = db.Column(db.Text)    # JSON value returned by the handler
+    error = db.Column(db.Text)     # Last failure
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    claimed_by = db.Column(db.String(100))     # Worker holding the current attempt
+    lease_expires_at = db.Column(db.DateTime)  # Extended by the worker's heartbeat while it runs
+    
+    def to_dict(self):
+        """Convert job status to dictionary"""
+        return {
+            'id': self.id,
+            'type': self.type,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'run_after': self.run_after.isoformat() if self.run_after else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<Job {self.id} {self.type} {self.status}>'
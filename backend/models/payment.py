@@ -9,6 +9,14 @@ class Payment(db.Model):
     """Model for payment transactions"""
     
     __tablename__ = 'payments'
+    __table_args__ = (
+        # Keyset pagination of the admin payments listing
+        db.Index('ix_payments_paid_at_id', 'paid_at', 'id'),
+        # A user's payment history, newest first
+        db.Index('ix_payments_user_id_paid_at', 'user_id', 'paid_at'),
+        # Admin payments filtered by status; completed/due totals
+        db.Index('ix_payments_status_paid_at', 'status', 'paid_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -13,6 +13,7 @@ class TaxSlab(db.Model):
     min_income = db.Column(db.Numeric(15, 2), nullable=False)  # Minimum income for this slab
     max_income = db.Column(db.Numeric(15, 2), nullable=True)   # Maximum income (NULL for highest slab)
     tax_rate = db.Column(db.Numeric(5, 2), nullable=False)     # Tax rate as percentage
+    assessment_year = db.Column(db.String(9), nullable=True, index=True)  # e.g. '2025-26' (NULL for the live schedule)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
@@ -22,9 +23,22 @@ class TaxSlab(db.Model):
             'min_income': float(self.min_income),
             'max_income': float(self.max_income) if self.max_income else None,
             'tax_rate': float(self.tax_rate),
+            'assessment_year': self.assessment_year,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
     
     def __repr__(self):
         max_inc = f'{self.max_income}' if self.max_income else '∞'
         return f'<TaxSlab {self.min_income}-{max_inc} @ {self.tax_rate}%>'
+
+class TaxSlabVersion(db.Model):
+    """Single-row counter bumped on every slab change, shared by all app processes"""
+    
+    __tablename__ = 'tax_slab_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<TaxSlabVersion {self.version}>'
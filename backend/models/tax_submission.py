@@ -9,6 +9,14 @@ class TaxSubmission(db.Model):
     """Model for tax return submissions"""
     
     __tablename__ = 'tax_submissions'
+    __table_args__ = (
+        # A user's submission history, newest first
+        db.Index('ix_tax_submissions_user_id_submitted_at', 'user_id', 'submitted_at'),
+        # A user's pending/paid submissions
+        db.Index('ix_tax_submissions_user_id_status', 'user_id', 'status'),
+        # Keyset walk over pending submissions during re-assessment
+        db.Index('ix_tax_submissions_status_id', 'status', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
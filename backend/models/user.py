@@ -2,13 +2,17 @@
 User model for authentication and user management
 """
 from models import db
+from services.password_hasher import PasswordHasher
 from datetime import datetime
-import bcrypt
 
 class User(db.Model):
     """User model for storing user authentication and profile information"""
     
     __tablename__ = 'users'
+    __table_args__ = (
+        # Keyset pagination of the admin user directory
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
@@ -24,13 +28,16 @@ class User(db.Model):
     consultant = db.relationship('Consultant', backref='user', uselist=False, cascade='all, delete-orphan')
     
     def set_password(self, password):
-        """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """Hash password using bcrypt (on the password worker pool)"""
+        self.password_hash = PasswordHasher.hash_password(password)
     
     def check_password(self, password):
         """Verify password against hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return PasswordHasher.verify_password(password, self.password_hash)
+    
+    def password_needs_rehash(self):
+        """Whether the stored hash predates the current bcrypt work factor"""
+        return PasswordHasher.needs_rehash(self.password_hash)
     
     def to_dict(self):
         """Convert user object to dictionary (excluding password)"""
@@ -1,92 +1,141 @@
 """
 Admin dashboard and management routes
 """
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, jsonify, session, stream_with_context
 from models import db
 from models.user import User
 from models.payment import Payment
 from models.tax_submission import TaxSubmission
 from models.tax_slab import TaxSlab
 from models.taxpayer_profile import TaxpayerProfile
+from services.tax_calculator import TaxCalculator
+from services.reassessment import ReassessmentService
+from services.stats_service import DashboardStats
+from services.password_hasher import PasswordHasherBusy
+from services.receipt_export import ReceiptExport
+from services.jobs import JobQueue
 from utils.decorators import admin_required
+from utils.pagination import encode_cursor, get_page_size, keyset_after, parse_date
+from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import func
+from sqlalchemy import func, or_
+from sqlalchemy.orm import contains_eager
+import json
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
 @admin_bp.route('/dashboard', methods=['GET'])
 @admin_required
 def get_dashboard_stats():
-    """Get dashboard statistics"""
+    """Get dashboard statistics from the periodically refreshed snapshot"""
     try:
-        # Count statistics
-        total_users = User.query.filter_by(role='user').count()
-        total_admin = User.query.filter_by(role='admin').count()
-        total_payments = Payment.query.count()
-        total_submissions = TaxSubmission.query.count()
-        
-        # Revenue statistics
-        total_revenue = db.session.query(func.sum(Payment.amount)).scalar() or Decimal('0')
-        pending_submissions = TaxSubmission.query.filter_by(status='pending').count()
-        
-        # Recent payments
-        recent_payments = Payment.query.order_by(Payment.paid_at.desc()).limit(5).all()
-        recent_payments_data = []
-        for payment in recent_payments:
-            payment_dict = payment.to_dict()
-            user = User.query.get(payment.user_id)
-            if user:
-                payment_dict['user_email'] = user.email
-            recent_payments_data.append(payment_dict)
-        
-        return jsonify({
-            'stats': {
-                'total_users': total_users,
-                'total_admins': total_admin,
-                'total_payments': total_payments,
-                'total_submissions': total_submissions,
-                'total_revenue': float(total_revenue),
-                'pending_submissions': pending_submissions
-            },
-            'recent_payments': recent_payments_data
-        }), 200
+        max_age = current_app.config.get('DASHBOARD_STATS_MAX_AGE', 60)
+        return jsonify(DashboardStats.get(max_age)), 200
         
     except Exception as e:
         return jsonify({'error': f'Failed to get dashboard stats: {str(e)}'}), 500
 
+def _user_directory_query(args):
+    """
+    Build the filtered admin user directory query (users outer-joined to profiles)
+
+    Raises:
+        ValueError: If a filter value is invalid
+    """
+    query = User.query \
+        .outerjoin(User.profile) \
+        .options(contains_eager(User.profile))
+    
+    role = args.get('role')
+    if role:
+        query = query.filter(User.role == role)
+    is_active = args.get('is_active')
+    if is_active is not None:
+        query = query.filter(User.is_active == (is_active.lower() == 'true'))
+    
+    # Prefix searches can use the email, nid and tin indexes
+    email = args.get('email')
+    if email:
+        query = query.filter(User.email.startswith(email.lower().strip(), autoescape=True))
+    nid = args.get('nid')
+    if nid:
+        query = query.filter(TaxpayerProfile.nid.startswith(nid.strip(), autoescape=True))
+    tin = args.get('tin')
+    if tin:
+        query = query.filter(TaxpayerProfile.tin.startswith(tin.strip(), autoescape=True))
+    search = args.get('search')
+    if search:
+        search = search.strip()
+        query = query.filter(or_(
+            User.email.startswith(search.lower(), autoescape=True),
+            TaxpayerProfile.nid.startswith(search, autoescape=True),
+            TaxpayerProfile.tin.startswith(search, autoescape=True)
+        ))
+    return query
+
+def _user_with_profile(user):
+    """Serialize a user with its (eagerly loaded) profile"""
+    user_dict = user.to_dict()
+    if user.profile:
+        user_dict['profile'] = user.profile.to_dict()
+    return user_dict
+
 @admin_bp.route('/users', methods=['GET'])
 @admin_required
 def get_all_users():
-    """Get all users with optional filters"""
+    """
+    Get users with their profiles, newest first
+    Query params: limit, cursor, role, is_active, email/nid/tin/search (prefix),
+                  format=ndjson to stream every matching user
+    Returns: one page of users and next_cursor (None on the last page)
+    """
     try:
-        # Get query parameters
-        role = request.args.get('role')
-        is_active = request.args.get('is_active')
-        
-        # Build query
-        query = User.query
+        query = _user_directory_query(request.args)
         
-        if role:
-            query = query.filter_by(role=role)
-        if is_active is not None:
-            query = query.filter_by(is_active=is_active.lower() == 'true')
+        if request.args.get('format') == 'ndjson':
+            return _export_users_ndjson(query)
         
-        users = query.order_by(User.created_at.desc()).all()
+        limit = get_page_size(request.args)
+        cursor = request.args.get('cursor')
+        if cursor:
+            query = keyset_after(query, User.created_at, User.id, cursor)
         
-        # Include profile information
-        users_data = []
-        for user in users:
-            user_dict = user.to_dict()
-            profile = TaxpayerProfile.query.filter_by(user_id=user.id).first()
-            if profile:
-                user_dict['profile'] = profile.to_dict()
-            users_data.append(user_dict)
+        # Fetch one extra row to know whether another page exists
+        users = query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1).all()
+        has_more = len(users) > limit
+        users = users[:limit]
         
-        return jsonify({'users': users_data}), 200
+        next_cursor = encode_cursor(users[-1].created_at, users[-1].id) if has_more else None
+        return jsonify({'users': [_user_with_profile(user) for user in users], 'next_cursor': next_cursor}), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to get users: {str(e)}'}), 500
 
+def _export_users_ndjson(query):
+    """Stream every user matching query as NDJSON, one keyset page per query"""
+    chunk_size = 1000
+    
+    def generate():
+        page_query = query
+        while True:
+            users = page_query.order_by(User.created_at.desc(), User.id.desc()).limit(chunk_size).all()
+            if not users:
+                break
+            yield ''.join(json.dumps(_user_with_profile(user)) + '\n' for user in users)
+            if len(users) < chunk_size:
+                break
+            page_query = keyset_after(query, User.created_at, User.id, encode_cursor(users[-1].created_at, users[-1].id))
+            # Release the page before fetching the next one
+            db.session.expunge_all()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=users.ndjson'}
+    )
+
 @admin_bp.route('/users/<int:user_id>/activate', methods=['PUT'])
 @admin_required
 def toggle_user_activation(user_id):
@@ -167,6 +216,9 @@ def reset_user_password(user_id):
         
         return jsonify({'message': 'Password reset successfully'}), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return jsonify({'error': 'Password service is busy, please retry'}), 429
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to reset password: {str(e)}'}), 500
@@ -174,36 +226,162 @@ def reset_user_password(user_id):
 @admin_bp.route('/payments', methods=['GET'])
 @admin_required
 def get_all_payments():
-    """Get all payments with user information"""
+    """
+    Get payments with user information, newest first
+    Query params: limit, cursor, status, payment_method, user_email (prefix),
+                  date_from, date_to (ISO dates on paid_at)
+    Returns: one page of payments and next_cursor (None on the last page)
+    """
     try:
-        payments = Payment.query.order_by(Payment.paid_at.desc()).all()
+        limit = get_page_size(request.args)
+        
+        # One query: payments joined to their user and submission
+        query = Payment.query \
+            .join(Payment.user) \
+            .outerjoin(Payment.submission) \
+            .options(contains_eager(Payment.user), contains_eager(Payment.submission))
+        
+        status = request.args.get('status')
+        if status:
+            query = query.filter(Payment.status == status)
+        payment_method = request.args.get('payment_method')
+        if payment_method:
+            query = query.filter(Payment.payment_method == payment_method)
+        user_email = request.args.get('user_email')
+        if user_email:
+            query = query.filter(User.email.startswith(user_email.lower().strip(), autoescape=True))
+        date_from = request.args.get('date_from')
+        if date_from:
+            query = query.filter(Payment.paid_at >= parse_date(date_from, 'date_from'))
+        date_to = request.args.get('date_to')
+        if date_to:
+            query = query.filter(Payment.paid_at < parse_date(date_to, 'date_to'))
+        
+        cursor = request.args.get('cursor')
+        if cursor:
+            query = keyset_after(query, Payment.paid_at, Payment.id, cursor)
+        
+        # Fetch one extra row to know whether another page exists
+        payments = query.order_by(Payment.paid_at.desc(), Payment.id.desc()).limit(limit + 1).all()
+        has_more = len(payments) > limit
+        payments = payments[:limit]
         
         payments_data = []
         for payment in payments:
             payment_dict = payment.to_dict()
-            user = User.query.get(payment.user_id)
-            if user:
-                payment_dict['user_email'] = user.email
+            payment_dict['user_email'] = payment.user.email
             if payment.submission:
                 payment_dict['submission'] = payment.submission.to_dict()
             payments_data.append(payment_dict)
         
-        return jsonify({'payments': payments_data}), 200
+        next_cursor = encode_cursor(payments[-1].paid_at, payments[-1].id) if has_more else None
+        return jsonify({'payments': payments_data, 'next_cursor': next_cursor}), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to get payments: {str(e)}'}), 500
 
+@admin_bp.route('/receipts/export', methods=['GET'])
+@admin_required
+def export_receipts():
+    """
+    Export receipts for every matching payment
+    Query params: format (zip or pdf), status, district (matched against the
+                  taxpayer address), date_from, date_to (ISO dates on paid_at)
+    Returns: a streamed ZIP with one PDF per receipt (format=zip), or one
+             merged PDF (format=pdf; a ZIP of merged parts when the selection
+             exceeds RECEIPT_EXPORT_PDF_PART_SIZE receipts)
+    """
+    try:
+        export_format = request.args.get('format', 'zip')
+        if export_format not in ('zip', 'pdf'):
+            return jsonify({'error': 'format must be zip or pdf'}), 400
+        
+        query = ReceiptExport.query_from_args(request.args)
+        total = query.count()
+        if total == 0:
+            return jsonify({'error': 'No payments match the export filters'}), 404
+        
+        body, mimetype, extension = ReceiptExport.output(query, export_format, total)
+        filename = f"tax_receipts_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{extension}"
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}', 'X-Receipt-Count': str(total)}
+        )
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Failed to export receipts: {str(e)}'}), 500
+
+@admin_bp.route('/receipts/export', methods=['POST'])
+@admin_required
+def queue_receipt_export():
+    """
+    Export receipts in the background
+    Expects: format (zip or pdf), status, district, date_from, date_to (as for GET)
+    Returns: 202 with the job; GET /api/jobs/<id>/download serves the file once it succeeds
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        params = {key: data.get(key) for key in ('format', 'status', 'district', 'date_from', 'date_to') if data.get(key)}
+        params.setdefault('format', 'zip')
+        if params['format'] not in ('zip', 'pdf'):
+            return jsonify({'error': 'format must be zip or pdf'}), 400
+        
+        # Validate the filters now rather than in the worker
+        ReceiptExport.query_from_args(params)
+        
+        job = JobQueue.enqueue('receipt_export', params, user_id=session['user_id'])
+        response = jsonify({'job': job.to_dict(), 'status_url': f'/api/jobs/{job.id}'})
+        response.headers['Location'] = f'/api/jobs/{job.id}'
+        return response, 202
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to queue receipt export: {str(e)}'}), 500
+
 @admin_bp.route('/slabs', methods=['GET'])
 @admin_required
 def get_slabs():
-    """Get all tax slabs"""
+    """Get all tax slabs, optionally only those of one assessment year"""
     try:
-        slabs = TaxSlab.query.order_by(TaxSlab.min_income).all()
+        query = TaxSlab.query
+        year = request.args.get('year')
+        if year == 'live':
+            query = query.filter(TaxSlab.assessment_year.is_(None))
+        elif year:
+            query = query.filter(TaxSlab.assessment_year == TaxCalculator.normalize_assessment_year(year))
+        
+        slabs = query.order_by(TaxSlab.assessment_year, TaxSlab.min_income).all()
         return jsonify({'slabs': [slab.to_dict() for slab in slabs]}), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to get tax slabs: {str(e)}'}), 500
 
+def _reassess_after_slab_change(*assessment_years):
+    """Re-price pending submissions if the live (undated) schedule changed"""
+    if None not in assessment_years:
+        return None
+    job = ReassessmentService.start(reason='Tax slab change', user_id=session.get('user_id'))
+    return ReassessmentService.to_dict(job)
+
+@admin_bp.route('/slabs/cache', methods=['GET'])
+@admin_required
+def get_slab_cache_stats():
+    """Get tax calculation cache statistics"""
+    try:
+        return jsonify({'cache': TaxCalculator.cache_stats()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get cache stats: {str(e)}'}), 500
+
 @admin_bp.route('/slabs', methods=['POST'])
 @admin_required
 def create_slab():
@@ -216,18 +394,26 @@ def create_slab():
             if field not in data:
                 return jsonify({'error': f'{field} is required'}), 400
         
+        try:
+            assessment_year = TaxCalculator.normalize_assessment_year(data.get('assessment_year'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         slab = TaxSlab(
             min_income=Decimal(str(data['min_income'])),
             max_income=Decimal(str(data['max_income'])) if data.get('max_income') else None,
-            tax_rate=Decimal(str(data['tax_rate']))
+            tax_rate=Decimal(str(data['tax_rate'])),
+            assessment_year=assessment_year
         )
         
         db.session.add(slab)
         db.session.commit()
+        TaxCalculator.bump_schedule_version()
         
         return jsonify({
             'message': 'Tax slab created successfully',
-            'slab': slab.to_dict()
+            'slab': slab.to_dict(),
+            'reassessment': _reassess_after_slab_change(slab.assessment_year)
         }), 201
         
     except Exception as e:
@@ -251,12 +437,20 @@ def update_slab(slab_id):
             slab.max_income = Decimal(str(data['max_income'])) if data['max_income'] else None
         if 'tax_rate' in data:
             slab.tax_rate = Decimal(str(data['tax_rate']))
+        previous_year = slab.assessment_year
+        if 'assessment_year' in data:
+            try:
+                slab.assessment_year = TaxCalculator.normalize_assessment_year(data['assessment_year'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
         
         db.session.commit()
+        TaxCalculator.bump_schedule_version()
         
         return jsonify({
             'message': 'Tax slab updated successfully',
-            'slab': slab.to_dict()
+            'slab': slab.to_dict(),
+            'reassessment': _reassess_after_slab_change(previous_year, slab.assessment_year)
         }), 200
         
     except Exception as e:
@@ -272,11 +466,43 @@ def delete_slab(slab_id):
         if not slab:
             return jsonify({'error': 'Tax slab not found'}), 404
         
+        assessment_year = slab.assessment_year
         db.session.delete(slab)
         db.session.commit()
+        TaxCalculator.bump_schedule_version()
         
-        return jsonify({'message': 'Tax slab deleted successfully'}), 200
+        return jsonify({
+            'message': 'Tax slab deleted successfully',
+            'reassessment': _reassess_after_slab_change(assessment_year)
+        }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to delete tax slab: {str(e)}'}), 500
+
+@admin_bp.route('/reassessments', methods=['POST'])
+@admin_required
+def start_reassessment():
+    """Start re-pricing all pending submissions against the live slabs"""
+    try:
+        job = ReassessmentService.start(reason='Manual', user_id=session.get('user_id'))
+        return jsonify({'reassessment': ReassessmentService.to_dict(job)}), 202
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to start re-assessment: {str(e)}'}), 500
+
+@admin_bp.route('/reassessments', methods=['GET'])
+@admin_required
+def list_reassessments():
+    """List recent re-assessment jobs"""
+    return jsonify({'reassessments': [ReassessmentService.to_dict(job) for job in ReassessmentService.list_jobs()]}), 200
+
+@admin_bp.route('/reassessments/<job_id>', methods=['GET'])
+@admin_required
+def get_reassessment(job_id):
+    """Get progress of a re-assessment job"""
+    job = ReassessmentService.get(job_id)
+    if not job:
+        return jsonify({'error': 'Re-assessment job not found'}), 404
+    
+    return jsonify({'reassessment': ReassessmentService.to_dict(job)}), 200
@@ -1,8 +1,11 @@
 """
 Chatbot API routes
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, session
+from models import db
 from services.chatbot import chatbot_service
+from services.jobs import JobQueue
+from utils.decorators import admin_required
 
 chatbot_bp = Blueprint('chatbot', __name__, url_prefix='/api/chatbot')
 
@@ -10,21 +13,42 @@ chatbot_bp = Blueprint('chatbot', __name__, url_prefix='/api/chatbot')
 def chat():
     """
     Process chatbot messages
-    Expects: message
-    Returns: chatbot response
+    Expects: message, optional history, optional async (logged-in users only)
+    Returns: chatbot response, or 202 with a job to poll when async is true
     """
     try:
         data = request.get_json()
         
         if not data or 'message' not in data:
             return jsonify({'error': 'Message is required'}), 400
+        if not isinstance(data['message'], str):
+            return jsonify({'error': 'Message must be a string'}), 400
         
         user_message = data['message'].strip()
-        history = data.get('history', [])
+        try:
+            history = chatbot_service.validate_history(data.get('history'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         if not user_message:
             return jsonify({'error': 'Message cannot be empty'}), 400
         
+        if data.get('async'):
+            # Queued jobs are owned by a user; anonymous callers wait for the answer instead
+            if 'user_id' not in session:
+                return jsonify({'error': 'Authentication required for async replies'}), 401
+            
+            # Answer on a job worker instead of holding this request for the API call
+            job = JobQueue.enqueue(
+                'chatbot_reply',
+                {'message': user_message, 'history': history},
+                user_id=session['user_id'],
+                max_attempts=1
+            )
+            response = jsonify({'job': job.to_dict(), 'status_url': f'/api/jobs/{job.id}', 'timestamp': data.get('timestamp')})
+            response.headers['Location'] = f'/api/jobs/{job.id}'
+            return response, 202
+        
         # Get response from chatbot service
         response = chatbot_service.get_response(user_message, history)
         
@@ -34,4 +58,25 @@ def chat():
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': f'Chatbot error: {str(e)}'}), 500
+
+@chatbot_bp.route('/cache', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """Get chatbot response cache statistics (size, hits, misses, hit rate)"""
+    try:
+        return jsonify({'cache': chatbot_service.cache_stats()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get cache stats: {str(e)}'}), 500
+
+@chatbot_bp.route('/circuit', methods=['GET'])
+@admin_required
+def get_circuit_stats():
+    """Get the chatbot API circuit breaker state (closed, open, half_open) and counters"""
+    try:
+        return jsonify({'circuit': chatbot_service.circuit_stats()}), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get circuit stats: {str(e)}'}), 500
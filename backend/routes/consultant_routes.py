@@ -1,13 +1,17 @@
 """
 Consultant dashboard and management routes
 """
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, jsonify, session, stream_with_context
 from models import db
 from models.user import User
 from models.consultant import Consultant, ConsultationRequest, ConsultationMessage
+from services.chat_broker import get_broker, consultation_channel, user_channel
 from utils.decorators import consultant_required, login_required, admin_required
+from utils.pagination import get_page_size, encode_cursor, decode_cursor, keyset_after, parse_date
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import aliased
+import json
 
 consultant_bp = Blueprint('consultant', __name__, url_prefix='/api/consultant')
 
@@ -96,6 +100,7 @@ def update_request_status(request_id):
             
         req.status = new_status
         db.session.commit()
+        get_broker().publish(user_channel(req.user_id), {'type': 'status', 'data': req.to_dict()})
         
         return jsonify({'message': f'Request status updated to {new_status}', 'request': req.to_dict()}), 200
         
@@ -106,7 +111,12 @@ def update_request_status(request_id):
 @consultant_bp.route('/chat/<int:consultation_id>', methods=['GET'])
 @login_required # Both user and consultant can access
 def get_chat_messages(consultation_id):
-    """Get chat history for a consultation"""
+    """
+    Get chat history for a consultation
+    Query params: after_id (only messages with a greater id) or
+                  since (only messages sent after an ISO timestamp)
+    Returns: messages and last_id; 304 when If-None-Match matches
+    """
     try:
         req = ConsultationRequest.query.get(consultation_id)
         if not req:
@@ -121,10 +131,38 @@ def get_chat_messages(consultation_id):
         
         if not (is_owner or is_consultant):
             return jsonify({'error': 'Unauthorized'}), 403
-            
-        messages = ConsultationMessage.query.filter_by(consultation_id=consultation_id).order_by(ConsultationMessage.timestamp.asc()).all()
         
-        return jsonify({'messages': [m.to_dict() for m in messages]}), 200
+        query = ConsultationMessage.query.filter(ConsultationMessage.consultation_id == consultation_id)
+        after_id = request.args.get('after_id')
+        if after_id:
+            try:
+                query = query.filter(ConsultationMessage.id > int(after_id))
+            except ValueError:
+                return jsonify({'error': 'after_id must be an integer'}), 400
+        since = request.args.get('since')
+        if since:
+            try:
+                query = query.filter(ConsultationMessage.timestamp > parse_date(since, 'since'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        # Messages are append-only, so the newest id identifies the history;
+        # answer unchanged polls from the index without loading any rows
+        last_id = db.session.query(func.max(ConsultationMessage.id)) \
+            .filter(ConsultationMessage.consultation_id == consultation_id).scalar() or 0
+        etag = f'chat-{consultation_id}-{last_id}-{after_id or ""}-{since or ""}'
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        messages = query.order_by(ConsultationMessage.id.asc()).all()
+        
+        response = jsonify({'messages': [m.to_dict() for m in messages], 'last_id': last_id})
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response, 200
         
     except Exception as e:
         return jsonify({'error': f'Failed to get messages: {str(e)}'}), 500
@@ -162,12 +200,115 @@ def send_message(consultation_id):
         db.session.add(msg)
         db.session.commit()
         
-        return jsonify({'message': 'Message sent successfully', 'data': msg.to_dict()}), 201
+        msg_dict = msg.to_dict()
+        get_broker().publish(consultation_channel(consultation_id), {'type': 'message', 'id': msg.id, 'data': msg_dict})
+        
+        return jsonify({'message': 'Message sent successfully', 'data': msg_dict}), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to send message: {str(e)}'}), 500
 
+def _sse_event(event_type, data, event_id=None):
+    """Format one Server-Sent Event"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+def _sse_response(subscription, backlog=(), last_id=0):
+    """
+    Stream backlog events, then live events from subscription, as text/event-stream
+    
+    Live events with an id at or below the last one sent are skipped, so the
+    subscription can be opened before the backlog is read without duplicates.
+    A comment line is sent every CHAT_STREAM_HEARTBEAT seconds to keep
+    proxies from closing an idle stream.
+    """
+    heartbeat = current_app.config.get('CHAT_STREAM_HEARTBEAT', 15)
+    
+    def generate():
+        sent_id = last_id
+        try:
+            yield 'retry: 3000\n\n'
+            for event in backlog:
+                sent_id = max(sent_id, event.get('id') or 0)
+                yield _sse_event(event['type'], event['data'], event.get('id'))
+            while not subscription.closed:
+                event = subscription.get(timeout=heartbeat)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                if event.get('id') is not None:
+                    if event['id'] <= sent_id:
+                        continue
+                    sent_id = event['id']
+                yield _sse_event(event['type'], event['data'], event.get('id'))
+        finally:
+            subscription.close()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@consultant_bp.route('/chat/<int:consultation_id>/stream', methods=['GET'])
+@login_required
+def stream_chat_messages(consultation_id):
+    """
+    Push new chat messages for a consultation as Server-Sent Events
+    Query params: after_id (or the Last-Event-ID header) to replay missed messages first
+    """
+    try:
+        req = ConsultationRequest.query.get(consultation_id)
+        if not req:
+            return jsonify({'error': 'Consultation not found'}), 404
+        
+        # Security: must be either the user or the consultant
+        user_id = session['user_id']
+        consultant = Consultant.query.filter_by(user_id=user_id).first()
+        is_owner = (req.user_id == user_id)
+        is_consultant = (consultant and req.consultant_id == consultant.id)
+        
+        if not (is_owner or is_consultant):
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        after_id = request.headers.get('Last-Event-ID') or request.args.get('after_id')
+        after_id = int(after_id) if after_id else None
+        
+        # Subscribe before reading the backlog so nothing committed in between is lost
+        subscription = get_broker().subscribe(consultation_channel(consultation_id))
+        backlog = []
+        if after_id is not None:
+            missed = ConsultationMessage.query \
+                .filter(ConsultationMessage.consultation_id == consultation_id, ConsultationMessage.id > after_id) \
+                .order_by(ConsultationMessage.id.asc()).all()
+            backlog = [{'type': 'message', 'id': m.id, 'data': m.to_dict()} for m in missed]
+        
+        # Do not hold a database connection for the life of the stream
+        db.session.remove()
+        return _sse_response(subscription, backlog, after_id or 0)
+        
+    except ValueError:
+        return jsonify({'error': 'after_id must be an integer'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Failed to open message stream: {str(e)}'}), 500
+
+@consultant_bp.route('/events', methods=['GET'])
+@login_required
+def stream_user_events():
+    """Push status changes of the current user's consultation requests as Server-Sent Events"""
+    try:
+        subscription = get_broker().subscribe(user_channel(session['user_id']))
+        db.session.remove()
+        return _sse_response(subscription)
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to open event stream: {str(e)}'}), 500
+
 @consultant_bp.route('/profile', methods=['GET'])
 @consultant_required
 def get_profile():
@@ -310,88 +451,148 @@ def get_user_requests():
 # ==================== ADMIN ENDPOINTS ====================
 # Admin endpoints for monitoring consultants and sessions
 
+def _consultant_stats_query():
+    """
+    Consultants with their user email and session counts, in one statement
+    
+    Session counts come from a single GROUP BY consultant_id, status aggregate
+    that is pivoted per consultant.
+    """
+    by_status = db.session.query(
+        ConsultationRequest.consultant_id.label('consultant_id'),
+        ConsultationRequest.status.label('status'),
+        func.count(ConsultationRequest.id).label('sessions')
+    ).group_by(ConsultationRequest.consultant_id, ConsultationRequest.status).subquery()
+    
+    def sessions_with(status):
+        return func.coalesce(func.sum(case((by_status.c.status == status, by_status.c.sessions), else_=0)), 0)
+    
+    return db.session.query(
+        Consultant,
+        User.email,
+        func.coalesce(func.sum(by_status.c.sessions), 0).label('total_sessions'),
+        sessions_with('accepted').label('active_sessions'),
+        sessions_with('completed').label('completed_sessions')
+    ).outerjoin(User, User.id == Consultant.user_id) \
+     .outerjoin(by_status, by_status.c.consultant_id == Consultant.id) \
+     .group_by(Consultant.id, User.email)
+
 @consultant_bp.route('/admin/consultants', methods=['GET'])
 @admin_required
 def admin_get_consultants():
-    """Admin: Get all consultants with their statistics"""
+    """
+    Admin: Get consultants with their statistics
+    Query params: limit, cursor
+    Returns: one page of consultants and next_cursor (None on the last page)
+    """
     try:
-        consultants = Consultant.query.all()
+        limit = get_page_size(request.args)
+        query = _consultant_stats_query()
+        cursor = request.args.get('cursor')
+        if cursor:
+            _, last_id = decode_cursor(cursor)
+            query = query.filter(Consultant.id > last_id)
+        
+        # Fetch one extra row to know whether another page exists
+        rows = query.order_by(Consultant.id).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         consultants_data = []
-        for c in consultants:
+        for c, email, total_sessions, active_sessions, completed_sessions in rows:
             c_dict = c.to_dict()
-            user = User.query.get(c.user_id)
-            
-            if user:
-                c_dict['email'] = user.email
-                if user.profile and hasattr(user.profile, 'full_name'):
-                    c_dict['full_name'] = user.profile.full_name
-                else:
-                    c_dict['full_name'] = user.email.split('@')[0]
-            
-            # Calculate statistics
-            total_sessions = ConsultationRequest.query.filter_by(consultant_id=c.id).count()
-            active_sessions = ConsultationRequest.query.filter_by(consultant_id=c.id, status='accepted').count()
-            completed_sessions = ConsultationRequest.query.filter_by(consultant_id=c.id, status='completed').count()
+            if email:
+                c_dict['email'] = email
+                c_dict['full_name'] = email.split('@')[0]
             
+            total_sessions = int(total_sessions)
+            completed_sessions = int(completed_sessions)
             c_dict['total_sessions'] = total_sessions
-            c_dict['active_sessions'] = active_sessions
+            c_dict['active_sessions'] = int(active_sessions)
             c_dict['completed_sessions'] = completed_sessions
             c_dict['completion_rate'] = (completed_sessions / total_sessions * 100) if total_sessions > 0 else 0
             
             consultants_data.append(c_dict)
-            
-        return jsonify({'consultants': consultants_data}), 200
         
+        next_cursor = encode_cursor(None, rows[-1][0].id) if has_more else None
+        return jsonify({'consultants': consultants_data, 'next_cursor': next_cursor}), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @consultant_bp.route('/admin/sessions', methods=['GET'])
 @admin_required
 def admin_get_sessions():
-    """Admin: Get all consultation sessions with filters"""
+    """
+    Admin: Get consultation sessions with participants and message counts, newest first
+    Query params: limit, cursor, status, date_from, date_to (ISO dates on created_at)
+    Returns: one page of sessions and next_cursor (None on the last page)
+    """
     try:
-        status_filter = request.args.get('status', None)
-        
-        query = ConsultationRequest.query
+        limit = get_page_size(request.args)
+        
+        # One query: requests joined to the client, the consultant and the
+        # consultant's user, plus a correlated message count that is only
+        # evaluated (on the consultation_id index) for the rows of this page
+        client = aliased(User)
+        consultant_user = aliased(User)
+        message_count = select(func.count(ConsultationMessage.id)) \
+            .where(ConsultationMessage.consultation_id == ConsultationRequest.id) \
+            .correlate(ConsultationRequest) \
+            .scalar_subquery()
+        
+        query = db.session.query(
+            ConsultationRequest,
+            client.email,
+            consultant_user.email,
+            Consultant.qualification,
+            message_count
+        ).outerjoin(client, client.id == ConsultationRequest.user_id) \
+         .outerjoin(Consultant, Consultant.id == ConsultationRequest.consultant_id) \
+         .outerjoin(consultant_user, consultant_user.id == Consultant.user_id)
+        
+        status_filter = request.args.get('status')
         if status_filter:
-            query = query.filter_by(status=status_filter)
-            
-        sessions = query.order_by(ConsultationRequest.created_at.desc()).all()
+            query = query.filter(ConsultationRequest.status == status_filter)
+        date_from = request.args.get('date_from')
+        if date_from:
+            query = query.filter(ConsultationRequest.created_at >= parse_date(date_from, 'date_from'))
+        date_to = request.args.get('date_to')
+        if date_to:
+            query = query.filter(ConsultationRequest.created_at < parse_date(date_to, 'date_to'))
+        
+        cursor = request.args.get('cursor')
+        if cursor:
+            query = keyset_after(query, ConsultationRequest.created_at, ConsultationRequest.id, cursor)
+        
+        # Fetch one extra row to know whether another page exists
+        rows = query.order_by(ConsultationRequest.created_at.desc(), ConsultationRequest.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         sessions_data = []
-        for session in sessions:
-            session_dict = session.to_dict()
-            
-            # Get user info
-            user = User.query.get(session.user_id)
-            if user:
-                session_dict['user_email'] = user.email
-                if user.profile and hasattr(user.profile, 'full_name'):
-                    session_dict['user_name'] = user.profile.full_name
-                else:
-                    session_dict['user_name'] = user.email.split('@')[0]
-            
-            # Get consultant info
-            consultant = Consultant.query.get(session.consultant_id)
-            if consultant:
-                cons_user = User.query.get(consultant.user_id)
-                if cons_user:
-                    session_dict['consultant_email'] = cons_user.email
-                    if cons_user.profile and hasattr(cons_user.profile, 'full_name'):
-                        session_dict['consultant_name'] = cons_user.profile.full_name
-                    else:
-                        session_dict['consultant_name'] = cons_user.email.split('@')[0]
-                    session_dict['consultant_qualification'] = consultant.qualification
-            
-            # Get message count
-            message_count = ConsultationMessage.query.filter_by(consultation_id=session.id).count()
-            session_dict['message_count'] = message_count
-            
+        for consultation, user_email, consultant_email, qualification, message_count in rows:
+            session_dict = consultation.to_dict()
+            if user_email:
+                session_dict['user_email'] = user_email
+                session_dict['user_name'] = user_email.split('@')[0]
+            if consultant_email:
+                session_dict['consultant_email'] = consultant_email
+                session_dict['consultant_name'] = consultant_email.split('@')[0]
+                session_dict['consultant_qualification'] = qualification
+            session_dict['message_count'] = int(message_count)
             sessions_data.append(session_dict)
-            
-        return jsonify({'sessions': sessions_data}), 200
         
+        next_cursor = None
+        if has_more:
+            last = rows[-1][0]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return jsonify({'sessions': sessions_data, 'next_cursor': next_cursor}), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,61 @@
+"""
+Background job status routes
+"""
+from flask import Blueprint, jsonify, send_file, session
+from services.jobs import JobQueue
+from services.receipt_export import ReceiptExport
+import os
+
+job_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+def _visible_job(job_id):
+    """The job if the caller may see it: its owner, an admin, or anyone for unowned jobs"""
+    job = JobQueue.get(job_id)
+    if job is None:
+        return None
+    if job.user_id is not None and job.user_id != session.get('user_id') and session.get('role') != 'admin':
+        return None
+    return job
+
+@job_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get the status of a background job
+    Returns: job with status (queued, running, succeeded, failed), attempts,
+             result once succeeded and the last error
+    """
+    try:
+        job = _visible_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        response = jsonify({'job': job.to_dict()})
+        if job.status in ('queued', 'running'):
+            # Polling hint for clients
+            response.headers['Retry-After'] = '1'
+        return response, 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get job: {str(e)}'}), 500
+
+@job_bp.route('/<job_id>/download', methods=['GET'])
+def download_job_result(job_id):
+    """Download the file written by a finished export job"""
+    try:
+        job = _visible_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        result = job.to_dict()['result'] or {}
+        if job.status != 'succeeded' or not result.get('file'):
+            return jsonify({'error': 'Job has no file to download', 'status': job.status}), 409
+        
+        return send_file(
+            os.path.join(ReceiptExport.export_dir(), result['file']),
+            mimetype=result.get('mimetype'),
+            as_attachment=True,
+            download_name=f"tax_receipts_{job.id}{os.path.splitext(result['file'])[1]}"
+        )
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to download job result: {str(e)}'}), 500
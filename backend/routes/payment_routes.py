@@ -5,6 +5,7 @@ from flask import Blueprint, request, jsonify, session
 from models import db
 from models.payment import Payment
 from models.tax_submission import TaxSubmission
+from services.stats_service import DashboardStats
 from utils.decorators import login_required
 from decimal import Decimal
 from datetime import datetime
@@ -52,9 +53,11 @@ def process_payment():
         db.session.add(payment)
         
         # Update submission status
+        was_pending = submission.status == 'pending'
         submission.status = 'paid'
         
         db.session.commit()
+        DashboardStats.record_payment(payment, session.get('email'), settled_pending=was_pending)
         
         return jsonify({
             'message': 'Payment processed successfully',
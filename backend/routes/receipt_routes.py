@@ -1,12 +1,13 @@
 """
 Receipt generation and download routes
 """
-from flask import Blueprint, send_file, jsonify, session
+from flask import Blueprint, current_app, send_file, jsonify, session
 from models.payment import Payment
 from models.user import User
 from models.taxpayer_profile import TaxpayerProfile
-from services.pdf_generator import PDFGenerator
+from services.receipt_store import ReceiptStore
 from utils.decorators import login_required
+import io
 import os
 
 receipt_bp = Blueprint('receipt', __name__, url_prefix='/api/receipt')
@@ -15,7 +16,9 @@ receipt_bp = Blueprint('receipt', __name__, url_prefix='/api/receipt')
 @login_required
 def download_receipt(payment_id):
     """
-    Generate and download PDF receipt for a payment
+    Download the PDF receipt for a payment
+    Rendered once and then served from disk; honours If-None-Match and
+    If-Modified-Since with 304 Not Modified
     """
     try:
         user_id = session['user_id']
@@ -33,16 +36,23 @@ def download_receipt(payment_id):
         if not submission:
             return jsonify({'error': 'Tax submission not found'}), 404
         
-        # Generate PDF
-        pdf_path = PDFGenerator.generate_receipt(payment, user, profile, submission)
+        # Stored receipt (rendered only when the template or data changed)
+        pdf_path, receipt_key, pdf = ReceiptStore.get_receipt(
+            payment, user, profile, submission, current_app.config.get('RECEIPT_DIR', 'static/receipts')
+        )
         
-        # Send file
-        return send_file(
-            pdf_path,
+        # Send the fresh render from memory, otherwise the stored file
+        response = send_file(
+            io.BytesIO(pdf) if pdf is not None else pdf_path,
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=f'tax_receipt_{payment.transaction_id}.pdf'
+            download_name=f'tax_receipt_{payment.transaction_id}.pdf',
+            conditional=True,
+            etag=receipt_key
         )
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
         
     except Exception as e:
         return jsonify({'error': f'Failed to generate receipt: {str(e)}'}), 500
@@ -1,46 +1,36 @@
 """
 Tax calculation and submission routes
 """
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, current_app, request, jsonify, session, stream_with_context
 from models import db
 from models.tax_submission import TaxSubmission
 from models.payment import Payment
 from models.user import User
 from services.tax_calculator import TaxCalculator
+from services.tax_engine import TaxEngine
+from services.stats_service import DashboardStats, PublicStats
 from utils.decorators import login_required
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from sqlalchemy import func
+import csv
+import hashlib
+import io
+import json
 
 tax_bp = Blueprint('tax', __name__, url_prefix='/api/tax')
 
 @tax_bp.route('/stats', methods=['GET'])
 def get_public_stats():
-    """Get public statistics for landing page"""
+    """Get public statistics for landing page (refreshed in the background, cacheable)"""
     try:
-        # User count (total users registered)
-        user_count = User.query.count()
+        interval = current_app.config.get('PUBLIC_STATS_INTERVAL', 30)
+        stats = PublicStats.get(current_app._get_current_object(), interval)
         
-        # Calculate filing percentage
-        total_submissions = TaxSubmission.query.count()
-        total_payments_count = Payment.query.filter_by(status='completed').count()
-        
-        # Calculate total revenue and due amounts
-        total_tax_paid = db.session.query(func.sum(Payment.amount)).filter(Payment.status == 'completed').scalar() or 0
-        total_tax_due = db.session.query(func.sum(Payment.amount)).filter(Payment.status != 'completed').scalar() or 0
-        
-        percent = 0
-        if total_submissions > 0:
-            percent = (total_payments_count / total_submissions) * 100
-        else:
-            percent = 0
-            
-        return jsonify({
-            'online_users': user_count,
-            'filing_percentage': round(percent, 1) if percent > 0 else 75.0,
-            'total_tax_paid': float(total_tax_paid),
-            'total_tax_due': float(total_tax_due),
-            'total_filers': user_count + 12000
-        }), 200
+        response = jsonify(stats)
+        response.set_etag(hashlib.sha1(json.dumps(stats, sort_keys=True).encode('utf-8')).hexdigest())
+        response.cache_control.public = True
+        response.cache_control.max_age = interval
+        return response.make_conditional(request)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -59,13 +49,18 @@ def calculate_tax():
         if not data or 'annual_income' not in data:
             return jsonify({'error': 'annual_income is required'}), 400
         
+        try:
+            year = TaxCalculator.normalize_assessment_year(data.get('assessment_year'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         annual_income = float(data['annual_income'])
         
         if annual_income < 0:
             return jsonify({'error': 'Income cannot be negative'}), 400
         
         # Calculate tax using tax calculator service
-        result = TaxCalculator.calculate_tax(annual_income)
+        result = TaxCalculator.calculate_tax(annual_income, year=year)
         
         return jsonify(result), 200
         
@@ -74,39 +69,171 @@ def calculate_tax():
     except Exception as e:
         return jsonify({'error': f'Tax calculation failed: {str(e)}'}), 500
 
+def _parse_batch_rows(req):
+    """
+    Parse a batch calculation body into (id, income) rows
+
+    Accepts a JSON array (or {"incomes": [...]}), NDJSON, or CSV. Each row is
+    either a bare income or an object/CSV record with 'annual_income' and an
+    optional 'id' that is echoed back.
+
+    Raises:
+        ValueError: If the body or any income is invalid
+    """
+    content_type = (req.mimetype or '').lower()
+    body = req.get_data(as_text=True)
+
+    if content_type == 'text/csv':
+        lines = [line for line in body.splitlines() if line.strip()]
+        records = list(csv.reader(lines))
+        if records and 'annual_income' in [cell.strip() for cell in records[0]]:
+            header = [cell.strip() for cell in records[0]]
+            items = [dict(zip(header, record)) for record in records[1:]]
+        else:
+            items = [record[-1] if len(record) == 1 else {'id': record[0], 'annual_income': record[1]}
+                     for record in records]
+    elif content_type in ('application/x-ndjson', 'application/ndjson'):
+        items = [json.loads(line) for line in body.splitlines() if line.strip()]
+    else:
+        items = json.loads(body) if body else None
+        if isinstance(items, dict):
+            items = items.get('incomes')
+        if not isinstance(items, list):
+            raise ValueError('Expected an array of incomes')
+
+    rows = []
+    for index, item in enumerate(items):
+        row_id = index
+        value = item
+        if isinstance(item, dict):
+            row_id = item.get('id', index)
+            value = item.get('annual_income')
+        try:
+            income = Decimal(str(value).strip())
+        except (InvalidOperation, TypeError):
+            raise ValueError(f'Invalid income value at row {index}')
+        if not income.is_finite():
+            raise ValueError(f'Invalid income value at row {index}')
+        if income < 0:
+            raise ValueError(f'Income cannot be negative (row {index})')
+        rows.append((row_id, income))
+    return rows
+
+@tax_bp.route('/calculate/batch', methods=['POST'])
+@login_required
+def calculate_tax_batch():
+    """
+    Calculate tax for many incomes in one request
+    Expects: JSON array, NDJSON or CSV body of incomes; optional ?year=2025-26
+    Returns: NDJSON stream of {id, annual_income, tax_amount}, one per row;
+             tax_amount is rounded to paisa half up, as /submit stores it, and
+             every row is priced against the same schedule
+    """
+    try:
+        year = TaxCalculator.normalize_assessment_year(request.args.get('year'))
+        rows = _parse_batch_rows(request)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    max_rows = current_app.config.get('TAX_BATCH_MAX_ROWS', 100000)
+    if len(rows) > max_rows:
+        return jsonify({'error': f'Batch too large (max {max_rows} rows)'}), 413
+
+    chunk_size = current_app.config.get('TAX_BATCH_CHUNK_SIZE', 10000)
+
+    # Resolve the schedule once, so a slab edit mid-stream cannot split the batch
+    try:
+        schedule = TaxCalculator.get_schedule(year)
+    except Exception as e:
+        return jsonify({'error': f'Failed to load tax slabs: {str(e)}'}), 500
+
+    def generate():
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            taxes = TaxCalculator.calculate_tax_batch([income for _, income in chunk], schedule=schedule)
+            yield ''.join(
+                json.dumps({'id': row_id, 'annual_income': float(income), 'tax_amount': float(tax)}) + '\n'
+                for (row_id, income), tax in zip(chunk, taxes)
+            )
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@tax_bp.route('/assess', methods=['POST'])
+@login_required
+def assess_tax():
+    """
+    Run the full tax assessment (exemptions, rebate, surcharge, minimum tax, AIT)
+    Expects: category, location, parent_of_disabled_child, salary, investments, net_wealth, ait
+    Returns: complete assessment with slab breakdown
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'Assessment data is required'}), 400
+        
+        result = TaxEngine.assess(data)
+        
+        return jsonify(result), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Tax assessment failed: {str(e)}'}), 500
+
 @tax_bp.route('/submit', methods=['POST'])
 @login_required
 def submit_tax_form():
     """
     Submit tax form with income details
     Expects: income_details (dict), total_income
+             or assessment (dict, same fields as /assess) for a full assessment
     Returns: submission record
     """
     try:
         user_id = session['user_id']
         data = request.get_json()
         
-        if not data or 'total_income' not in data:
-            return jsonify({'error': 'total_income is required'}), 400
-        
-        total_income = float(data['total_income'])
-        income_details = data.get('income_details', {})
-        
-        # Calculate tax
-        tax_result = TaxCalculator.calculate_tax(total_income)
+        if data and data.get('assessment'):
+            # Full assessment: the server computes the liability, not the client
+            assessment = data['assessment']
+            try:
+                tax_result = TaxEngine.assess(assessment)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            income_details = dict(data.get('income_details') or {})
+            income_details['assessment'] = assessment
+            total_income = tax_result['total_income']
+            taxable_income = tax_result['taxable_income']
+            # AIT in excess of the liability is not payable here
+            tax_amount = max(0.0, tax_result['tax_amount'])
+        else:
+            if not data or 'total_income' not in data:
+                return jsonify({'error': 'total_income is required'}), 400
+            
+            total_income = float(data['total_income'])
+            income_details = data.get('income_details', {})
+            
+            # Calculate tax against the current shared slab version (one
+            # indexed read), not a version checked up to a few seconds ago
+            tax_result = TaxCalculator.calculate_tax(total_income, refresh=True)
+            taxable_income = total_income  # Can be modified for deductions
+            tax_amount = tax_result['tax_amount']
         
         # Create submission record
         submission = TaxSubmission(
             user_id=user_id,
             total_income=Decimal(str(total_income)),
-            taxable_income=Decimal(str(total_income)),  # Can be modified for deductions
-            tax_amount=Decimal(str(tax_result['tax_amount'])),
+            taxable_income=Decimal(str(taxable_income)),
+            tax_amount=TaxCalculator.round_amount(tax_amount),
             status='pending'
         )
         submission.set_income_details(income_details)
         
         db.session.add(submission)
         db.session.commit()
+        DashboardStats.record_submission()
         
         return jsonify({
             'message': 'Tax form submitted successfully',
@@ -151,10 +278,13 @@ def get_submission(submission_id):
 
 @tax_bp.route('/slabs', methods=['GET'])
 def get_tax_slabs():
-    """Get all tax slabs (public endpoint)"""
+    """Get the tax slabs in effect for ?year= (public endpoint, default live schedule)"""
     try:
-        slabs = TaxCalculator.get_all_slabs()
+        year = TaxCalculator.normalize_assessment_year(request.args.get('year'))
+        slabs = TaxCalculator.get_all_slabs(year)
         return jsonify({'slabs': slabs}), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Failed to get tax slabs: {str(e)}'}), 500
@@ -3,8 +3,6 @@ from models import db
 from models.user import User
 from models.consultant import Consultant
 
-app = create_app()
-
 consultants_data = [
     {
         "email": "consultant1@tax.com",
@@ -36,28 +34,35 @@ consultants_data = [
     }
 ]
 
-with app.app_context():
-    for data in consultants_data:
-        # Check if user exists
-        user = User.query.filter_by(email=data['email']).first()
-        if not user:
-            user = User(email=data['email'], role='consultant')
-            user.set_password(data['password'])
-            db.session.add(user)
-            db.session.commit()
-            
-            # Create consultant profile
-            consultant = Consultant(
-                user_id=user.id,
-                qualification=data['qualification'],
-                experience=data['experience'],
-                bio=data['bio'],
-                is_available=True
-            )
-            db.session.add(consultant)
-            db.session.commit()
-            print(f"Created consultant: {data['email']}")
-        else:
-            print(f"Consultant already exists: {data['email']}")
+def main():
+    """Create the sample consultant accounts that do not exist yet"""
+    app = create_app()
+    
+    with app.app_context():
+        for data in consultants_data:
+            # Check if user exists
+            user = User.query.filter_by(email=data['email']).first()
+            if not user:
+                user = User(email=data['email'], role='consultant')
+                user.set_password(data['password'])
+                db.session.add(user)
+                db.session.commit()
+                
+                # Create consultant profile
+                consultant = Consultant(
+                    user_id=user.id,
+                    qualification=data['qualification'],
+                    experience=data['experience'],
+                    bio=data['bio'],
+                    is_available=True
+                )
+                db.session.add(consultant)
+                db.session.commit()
+                print(f"Created consultant: {data['email']}")
+            else:
+                print(f"Consultant already exists: {data['email']}")
+
+    print("Seeding completed.")
 
-print("Seeding completed.")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Publish/subscribe fan-out for consultation chat events
+Routes publish events on named channels (one per consultation or user) and
+Server-Sent Event streams subscribe to them. The default broker fans out
+in-process; a broker backed by an external message bus can replace it with
+set_broker() without touching the routes.
+
+With several worker processes an in-process broker only reaches streams held
+by the worker that handled the send, so the chat pages also poll for newer
+messages (after_id) and re-fetch when a stream reconnects.
+"""
+from abc import ABC, abstractmethod
+import queue
+import threading
+
+# Events buffered per subscriber before it is considered too slow
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def consultation_channel(consultation_id):
+    """Channel carrying the messages of one consultation"""
+    return f'consultation:{consultation_id}'
+
+
+def user_channel(user_id):
+    """Channel carrying consultation status changes for one user"""
+    return f'user:{user_id}'
+
+
+class Subscription:
+    """One subscriber's view of a channel"""
+
+    def __init__(self, broker, channel, maxsize=SUBSCRIBER_QUEUE_SIZE):
+        self.broker = broker
+        self.channel = channel
+        self.closed = False
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def deliver(self, event):
+        """
+        Queue an event for this subscriber
+
+        A subscriber whose buffer is full is closed instead of blocking the
+        publisher; its client reconnects and catches up from the database.
+        """
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.close()
+
+    def get(self, timeout=None):
+        """
+        Wait for the next event
+
+        Returns:
+            dict or None: The event, or None on timeout or once closed
+        """
+        if self.closed and self._queue.empty():
+            return None
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stop receiving events"""
+        if not self.closed:
+            self.closed = True
+            self.broker.unsubscribe(self)
+
+
+class ChatBroker(ABC):
+    """Broker interface used by the chat routes"""
+
+    @abstractmethod
+    def subscribe(self, channel):
+        """Subscribe to a channel; returns a Subscription"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def unsubscribe(self, subscription):
+        """Remove a subscription"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def publish(self, channel, event):
+        """Deliver an event to every subscriber of a channel"""
+        raise NotImplementedError
+
+
+class InProcessChatBroker(ChatBroker):
+    """Fan-out between threads of one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return len(subscribers)
+
+    def subscriber_count(self, channel=None):
+        """Number of subscribers on a channel (or across all channels)"""
+        with self._lock:
+            if channel is not None:
+                return len(self._channels.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._channels.values())
+
+
+_broker = InProcessChatBroker()
+
+
+def get_broker():
+    """Get the active broker"""
+    return _broker
+
+
+def set_broker(broker):
+    """Replace the active broker (e.g. with one backed by a message bus)"""
+    global _broker
+    _broker = broker
@@ -1,48 +1,26 @@
 """
 AI Chatbot service
 Handles chatbot conversations using external AI API (OpenRouter)
+Answers to questions asked without conversation history are cached by
+their normalized text, so repeated FAQ questions skip the API call
 """
+from utils.cache import LRUCache
+from utils.circuit_breaker import CircuitBreaker
+from requests.adapters import HTTPAdapter
 import requests
 import os
 import json
+import re
+import unicodedata
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-class ChatbotService:
-    """Service for handling chatbot conversations"""
-    
-    def __init__(self):
-        # OpenRouter API URL
-        self.api_url = os.getenv('CHATBOT_API_URL', 'https://openrouter.ai/api/v1/chat/completions')
-        # API Key from environment variable
-        self.api_key = os.getenv('CHATBOT_API_KEY')
-        # Default model for OpenRouter (Google Gemini is better for long responses)
-        self.model = os.getenv('CHATBOT_MODEL', 'google/gemini-2.0-flash-exp:free')
-        self.use_api = bool(self.api_key)
-    
-    def get_response(self, user_message, history=None):
-        """
-        Get chatbot response for user message
-        
-        Args:
-            user_message: User's question/message
-            history: List of previous messages in the session
-            
-        Returns:
-            str: Chatbot response
-        """
-        if self.use_api:
-            return self._get_api_response(user_message, history)
-        else:
-            return self._get_rule_based_response(user_message)
-    
-    def _get_api_response(self, user_message, history=None):
-        """Get response from OpenRouter API"""
-        try:
-            # System prompt for tax-related assistance
-            system_prompt = """You are 'TaxC Assistant', a professional tax assistant for TaxC Bangladesh.
+# System prompt for tax-related assistance
+# Bump PROMPT_VERSION whenever it changes so cached answers are not reused
+PROMPT_VERSION = 1
+SYSTEM_PROMPT = """You are 'TaxC Assistant', a professional tax assistant for TaxC Bangladesh.
             
 DIRECTIONS:
 1. ALWAYS speak in Bangla (বাংলা). 
@@ -66,49 +44,212 @@ DIRECTIONS:
 8. If the user uses Romanized Bangla (e.g., 'kemon achen'), respond in proper Bangla script (বাংলা লিপি).
 9. If thanked, acknowledge and offer further help.
 """
+
+# Answers to history-free questions keyed by (prompt version, model, normalized message)
+_response_cache = LRUCache(
+    maxsize=int(os.getenv('CHATBOT_CACHE_SIZE', '2048')),
+    ttl=int(os.getenv('CHATBOT_CACHE_TTL', '86400')) or None
+)
+
+# Spelling variants folded together: Bangla vowel length, sibilants and nasals,
+# and common Romanized Bangla spellings (sonchoy/shonchoy, jakat/zakat, ...)
+_BANGLA_FOLDS = str.maketrans({
+    'ঈ': 'ই', 'ঊ': 'উ', 'ী': 'ি', 'ূ': 'ু',
+    'শ': 'স', 'ষ': 'স', 'ণ': 'ন',
+})
+_ROMAN_FOLDS = (('ee', 'i'), ('oo', 'u'), ('ph', 'f'), ('sh', 's'), ('z', 'j'))
+_BANGLA_DIGITS = str.maketrans('০১২৩৪৫৬৭৮৯', '0123456789')
+_REPEATED_LETTER = re.compile(r'([a-z])\1+')
+
+def normalize_message(message):
+    """
+    Canonical form of a chat message, used as the response cache key
+    
+    Folds Unicode composition, case, Bangla digits, punctuation (including
+    the danda), zero-width joiners, whitespace and common Bangla/Romanized
+    spelling variants.
+    """
+    text = unicodedata.normalize('NFC', message).casefold()
+    text = text.translate(_BANGLA_DIGITS).replace('\u200c', '').replace('\u200d', '')
+    text = ''.join(' ' if unicodedata.category(ch)[0] in 'PS' else ch for ch in text)
+    text = text.translate(_BANGLA_FOLDS)
+    for variant, canonical in _ROMAN_FOLDS:
+        text = text.replace(variant, canonical)
+    text = _REPEATED_LETTER.sub(r'\1', text)
+    return ' '.join(text.split())
+
+class ChatbotService:
+    """Service for handling chatbot conversations"""
+    
+    def __init__(self):
+        # OpenRouter API URL
+        self.api_url = os.getenv('CHATBOT_API_URL', 'https://openrouter.ai/api/v1/chat/completions')
+        # API Key from environment variable
+        self.api_key = os.getenv('CHATBOT_API_KEY')
+        # Default model for OpenRouter (Google Gemini is better for long responses)
+        self.model = os.getenv('CHATBOT_MODEL', 'google/gemini-2.0-flash-exp:free')
+        self.use_api = bool(self.api_key)
+        # Seconds to establish a connection / to wait for the answer
+        self.timeout = (
+            float(os.getenv('CHATBOT_CONNECT_TIMEOUT', '3')),
+            float(os.getenv('CHATBOT_READ_TIMEOUT', '20'))
+        )
+        # Skip the API after consecutive failures, probing again after the reset timeout
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv('CHATBOT_BREAKER_THRESHOLD', '3')),
+            reset_timeout=float(os.getenv('CHATBOT_BREAKER_RESET', '30'))
+        )
+        self.session = self._create_session()
+    
+    def _create_session(self):
+        """Shared HTTP session keeping connections to the API alive between requests"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=int(os.getenv('CHATBOT_POOL_SIZE', '10')))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.api_key}',
+            'HTTP-Referer': 'http://localhost:3000',
+            'X-Title': 'Tax Payment System'
+        })
+        return session
+    
+    def get_response(self, user_message, history=None):
+        """
+        Get chatbot response for user message
+        
+        Args:
+            user_message: User's question/message
+            history: List of previous messages in the session
             
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {self.api_key}',
-                'HTTP-Referer': 'http://localhost:3000',
-                'X-Title': 'Tax Payment System'
-            }
-            
-            # Construct messages with history
-            messages = [{'role': 'system', 'content': system_prompt}]
-            
-            if history and isinstance(history, list):
-                # Only take last 10 for context to avoid token limits
-                for msg in history[-10:]:
-                    role = 'assistant' if msg.get('isBot') else 'user'
-                    messages.append({'role': role, 'content': msg.get('text', '')})
+        Returns:
+            str: Chatbot response
             
-            # Add current message
-            messages.append({'role': 'user', 'content': user_message})
+        Raises:
+            ValueError: If history is malformed
+        """
+        history = self.validate_history(history)
+        if not self.use_api:
+            return self._get_rule_based_response(user_message)
+        if self._has_context(history):
+            # Answers that depend on the conversation are not shared
+            return self._get_api_response(user_message, history)[0]
+        
+        key = (PROMPT_VERSION, self.model, normalize_message(user_message))
+        response = _response_cache.get(key)
+        if response is None:
+            response, answered = self._get_api_response(user_message)
+            # Only real API answers are cached; fallbacks retry the API next time
+            if answered:
+                _response_cache.set(key, response)
+        return response
+    
+    @staticmethod
+    def validate_history(history):
+        """
+        Check conversation history supplied by the caller
+        
+        Args:
+            history: None, or a list of {'text': str, 'isBot': bool} messages
             
-            payload = {
-                'model': self.model,
-                'messages': messages,
-                'max_tokens': 2000,
-                'temperature': 0.5,
-                'top_p': 0.9,
-                'frequency_penalty': 0.3
-            }
+        Returns:
+            list: The messages reduced to text and isBot
             
-            response = requests.post(self.api_url, json=payload, headers=headers, timeout=20)
+        Raises:
+            ValueError: If history is not a list of message objects
+        """
+        if history is None:
+            return []
+        if not isinstance(history, list):
+            raise ValueError('History must be a list of messages')
+        
+        messages = []
+        for msg in history:
+            if not isinstance(msg, dict) or not isinstance(msg.get('text', ''), str):
+                raise ValueError('History messages must be objects with a text string')
+            messages.append({'text': msg.get('text', ''), 'isBot': bool(msg.get('isBot'))})
+        return messages
+    
+    @staticmethod
+    def _has_context(history):
+        """
+        Whether validated history holds anything the user said
+        
+        The chat widget always sends its greeting; a history of bot messages
+        only is treated as a fresh, cacheable question.
+        """
+        return any(not msg['isBot'] for msg in history)
+    
+    @staticmethod
+    def cache_stats():
+        """Get response cache statistics (size, hits, misses, hit rate)"""
+        return _response_cache.stats()
+    
+    def circuit_stats(self):
+        """Get the API circuit breaker state and counters"""
+        return self.breaker.stats()
+    
+    def _get_api_response(self, user_message, history=None):
+        """
+        Get response from OpenRouter API
+        
+        Only transport errors and unusable answers count against the circuit
+        breaker; history has been validated before this is called.
+        
+        Returns:
+            tuple: (response, whether the API answered it)
+        """
+        # Construct messages with history
+        messages = [{'role': 'system', 'content': SYSTEM_PROMPT}]
+        # Only take last 10 for context to avoid token limits
+        for msg in (history or [])[-10:]:
+            role = 'assistant' if msg['isBot'] else 'user'
+            messages.append({'role': role, 'content': msg['text']})
+        
+        # Add current message
+        messages.append({'role': 'user', 'content': user_message})
+        
+        payload = {
+            'model': self.model,
+            'messages': messages,
+            'max_tokens': 2000,
+            'temperature': 0.5,
+            'top_p': 0.9,
+            'frequency_penalty': 0.3
+        }
+        
+        if not self.breaker.allow():
+            # The API keeps failing; answer locally until the next probe
+            return self._get_rule_based_response(user_message), False
+        
+        try:
+            response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
             response.raise_for_status()
-            
-            data = response.json()
-            
-            if 'choices' in data and len(data['choices']) > 0:
-                raw_content = data['choices'][0]['message']['content']
-                return raw_content.strip()
-            else:
-                return "দুঃখিত, আমি বিষয়টি বুঝতে পারছি না। দয়া করে আবার জিজ্ঞাসা করুন।"
-                
-        except Exception as e:
+            content = self._answer_text(response.json())
+        except requests.RequestException as e:
+            self.breaker.record_failure()
             print(f"API Error: {str(e)}")
-            return self._get_rule_based_response(user_message)
+            return self._get_rule_based_response(user_message), False
+        
+        if content is None:
+            # The API answered, but not with a usable completion
+            self.breaker.record_failure()
+            return "দুঃখিত, আমি বিষয়টি বুঝতে পারছি না। দয়া করে আবার জিজ্ঞাসা করুন।", False
+        
+        self.breaker.record_success()
+        return content, True
+    
+    @staticmethod
+    def _answer_text(data):
+        """Completion text from an API response body, or None if it has none"""
+        try:
+            content = data['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError):
+            return None
+        if not isinstance(content, str) or not content.strip():
+            return None
+        return content.strip()
     
     def _get_rule_based_response(self, user_message):
         """Fallback rule-based chatbot in Bangla"""
@@ -0,0 +1,60 @@
+"""
+Handlers for background job types
+Loaded by the job queue before it runs a job; each handler receives the
+job's JSON payload and returns a JSON-serializable result.
+"""
+from flask import current_app
+from services.chatbot import chatbot_service
+from services.jobs import JobQueue, job_cleanup, job_handler
+from services.reassessment import ReassessmentService
+from services.receipt_export import ReceiptExport
+import os
+
+
+@job_handler('chatbot_reply')
+def chatbot_reply(payload, job):
+    """Answer a chatbot message (the external API may take up to its timeout)"""
+    return {'response': chatbot_service.get_response(payload['message'], payload.get('history'))}
+
+
+@job_handler('receipt_export')
+def receipt_export(payload, job):
+    """Write a bulk receipt export to EXPORT_DIR"""
+    query = ReceiptExport.query_from_args(payload)
+    total = query.count()
+    if total == 0:
+        return {'count': 0, 'file': None}
+
+    body, mimetype, extension = ReceiptExport.output(query, payload.get('format', 'zip'), total)
+    export_dir = ReceiptExport.export_dir()
+    os.makedirs(export_dir, exist_ok=True)
+    filename = f'{job.id}.{extension}'
+    # One temporary file per attempt, so a reclaimed job never shares it
+    tmp_path = os.path.join(export_dir, f'{filename}.{job.attempts}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in body:
+                JobQueue.check_lease(job)
+                f.write(chunk)
+        os.replace(tmp_path, os.path.join(export_dir, filename))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {'count': total, 'file': filename, 'mimetype': mimetype}
+
+
+@job_cleanup('receipt_export')
+def remove_receipt_export(job):
+    """Delete the export file of a purged job"""
+    result = job.to_dict()['result'] or {}
+    if result.get('file'):
+        path = os.path.join(ReceiptExport.export_dir(), result['file'])
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@job_handler('reassess')
+def reassess(payload, job):
+    """Re-price pending submissions against the live slabs, recording progress on the job"""
+    return ReassessmentService.reassess_pending(job, current_app.config.get('REASSESSMENT_CHUNK_SIZE', 1000))
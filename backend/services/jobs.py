@@ -0,0 +1,453 @@
+"""
+Background job queue
+Slow work (chatbot replies, bulk exports) is recorded in the jobs table and
+run by worker threads, either inside the web process (JOB_WORKERS) or in
+separate `python manage.py worker` processes. The table is the source of
+truth; a broker only tells idle workers which job to try next:
+    database  polls the jobs table, shared by any number of processes
+    memory    in-process queue (single process, development and tests)
+Failed jobs are retried with exponential backoff up to max_attempts.
+A claimed job carries a lease that the running worker keeps extending; a job
+whose lease ran out is claimed again, and the worker that lost it can no
+longer record an outcome. Long handlers call JobQueue.check_lease() between
+chunks of work to stop early once that has happened.
+"""
+from flask import current_app
+from models import db
+from models.job import Job
+from sqlalchemy import and_, delete, or_, select, update
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+import heapq
+import importlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+
+_handlers = {}
+_cleanups = {}
+_broker = None
+_broker_lock = threading.Lock()
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def job_handler(job_type):
+    """
+    Register a function as the handler for a job type
+
+    The handler is called as handler(payload, job) inside an app context and
+    returns a JSON-serializable result; raising marks the attempt as failed.
+    """
+    def register(fn):
+        _handlers[job_type] = fn
+        return fn
+    return register
+
+
+def job_cleanup(job_type):
+    """
+    Register a function that releases what a finished job left behind
+
+    Called as cleanup(job) before JobQueue.purge_finished deletes the job,
+    e.g. to remove a file named in its result.
+    """
+    def register(fn):
+        _cleanups[job_type] = fn
+        return fn
+    return register
+
+
+def _claimable(now):
+    """Jobs that are due, or running on a worker that stopped renewing its lease"""
+    return or_(
+        and_(Job.status == 'queued', Job.run_after <= now),
+        and_(Job.status == 'running', Job.lease_expires_at < now)
+    )
+
+
+class LeaseLost(Exception):
+    """Raised in a handler whose job lease ran out and may be held by another worker"""
+
+
+class _LeaseHeartbeat:
+    """Keeps extending the lease of a running job until stopped"""
+
+    def __init__(self, engine, job_id, owner, lease):
+        self.engine = engine
+        self.job_id = job_id
+        self.owner = owner
+        self.lease = lease
+        self.lost = False
+        # Monotonic time until which the last successful renewal holds the lease
+        self.held_until = time.monotonic() + lease
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def expired(self):
+        """Whether the lease was taken over or could not be renewed in time"""
+        return self.lost or time.monotonic() >= self.held_until
+
+    def _beat(self):
+        # Renew three times per lease so one slow round trip does not lose it
+        while not self._stop.wait(self.lease / 3):
+            renewed_at = time.monotonic()
+            try:
+                with self.engine.begin() as connection:
+                    result = connection.execute(
+                        update(Job)
+                        .where(Job.id == self.job_id, Job.claimed_by == self.owner, Job.status == 'running')
+                        .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease))
+                    )
+            except Exception:
+                # Try again on the next beat; the lease still has time left
+                continue
+            if result.rowcount != 1:
+                self.lost = True
+                return
+            self.held_until = renewed_at + self.lease
+
+
+class JobBroker(ABC):
+    """Broker interface used by the job queue"""
+
+    @abstractmethod
+    def enqueue(self, job_id, run_after):
+        """Announce a job that becomes due at run_after"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def reserve(self, timeout):
+        """
+        Wait for a due job
+
+        Returns:
+            str or None: A job id to claim, or None on timeout
+        """
+        raise NotImplementedError
+
+
+class InProcessJobBroker(JobBroker):
+    """Due-time ordered queue shared by the worker threads of one process"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._heap = []
+
+    def enqueue(self, job_id, run_after):
+        with self._condition:
+            heapq.heappush(self._heap, (run_after, job_id))
+            self._condition.notify()
+
+    def reserve(self, timeout):
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = datetime.utcnow()
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)[1]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                if self._heap:
+                    remaining = min(remaining, (self._heap[0][0] - now).total_seconds())
+                self._condition.wait(remaining)
+
+
+class DatabaseJobBroker(JobBroker):
+    """Polls the jobs table; needs an app context"""
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+
+    def enqueue(self, job_id, run_after):
+        # The row is already committed; wake local workers instead of waiting for the next poll
+        self._wakeup.set()
+
+    def reserve(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            row = db.session.execute(
+                select(Job.id)
+                .where(_claimable(datetime.utcnow()))
+                .order_by(Job.run_after)
+                .limit(1)
+            ).first()
+            # End the read transaction so the next poll sees newly committed jobs
+            db.session.commit()
+            if row:
+                return row.id
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self._wakeup.wait(min(self.poll_interval, remaining))
+            self._wakeup.clear()
+
+
+def get_broker(app):
+    """Get the broker selected by JOB_BROKER, creating it on first use"""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                if app.config.get('JOB_BROKER', 'database') == 'memory':
+                    _broker = InProcessJobBroker()
+                else:
+                    _broker = DatabaseJobBroker(app.config.get('JOB_POLL_INTERVAL', 1.0))
+    return _broker
+
+
+def set_broker(broker):
+    """Replace the active broker (e.g. with one backed by a message bus)"""
+    global _broker
+    _broker = broker
+
+
+class JobQueue:
+    """Queues background jobs and runs them on worker threads"""
+
+    @staticmethod
+    def enqueue(job_type, payload=None, user_id=None, max_attempts=None):
+        """
+        Record a job and hand it to the broker
+
+        Args:
+            job_type: Name registered with @job_handler
+            payload: JSON-serializable handler arguments
+            user_id: Owner allowed to read the job status (None = anyone with the id)
+            max_attempts: Attempts before the job fails (default JOB_MAX_ATTEMPTS)
+
+        Returns:
+            Job: The queued job
+        """
+        app = current_app._get_current_object()
+        job = Job(
+            id=uuid.uuid4().hex,
+            type=job_type,
+            status='queued',
+            payload=json.dumps(payload or {}),
+            user_id=user_id,
+            max_attempts=max_attempts or app.config.get('JOB_MAX_ATTEMPTS', 3),
+            run_after=datetime.utcnow()
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        get_broker(app).enqueue(job.id, job.run_after)
+        JobQueue.start_workers(app)
+        return job
+
+    @staticmethod
+    def get(job_id):
+        """Get a job by id, or None"""
+        return db.session.get(Job, job_id)
+
+    @staticmethod
+    def purge_finished(max_age, batch_size=500):
+        """
+        Delete succeeded and failed jobs that finished more than max_age ago
+
+        Cleanups registered with @job_cleanup run for each job before its
+        row is deleted.
+
+        Args:
+            max_age: Retention in seconds
+            batch_size: Jobs deleted per transaction
+
+        Returns:
+            int: Number of jobs deleted
+        """
+        importlib.import_module('services.job_handlers')
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+        deleted = 0
+        while True:
+            jobs = Job.query.filter(Job.status.in_(('succeeded', 'failed')), Job.finished_at < cutoff) \
+                .order_by(Job.finished_at).limit(batch_size).all()
+            if not jobs:
+                return deleted
+            for job in jobs:
+                cleanup = _cleanups.get(job.type)
+                if cleanup is not None:
+                    cleanup(job)
+            db.session.execute(
+                delete(Job)
+                .where(Job.id.in_([job.id for job in jobs]))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            deleted += len(jobs)
+
+    @staticmethod
+    def start_workers(app):
+        """Start JOB_WORKERS worker threads in this process (once)"""
+        if _workers:
+            return
+        with _workers_lock:
+            if not _workers:
+                for _ in range(app.config.get('JOB_WORKERS', 2)):
+                    thread = threading.Thread(target=JobQueue.work, args=(app,), daemon=True)
+                    thread.start()
+                    _workers.append(thread)
+
+    @staticmethod
+    def work(app, stop=None):
+        """
+        Worker loop: reserve, claim and run jobs until stop is set
+
+        Args:
+            app: Flask application
+            stop: Optional threading.Event ending the loop
+        """
+        broker = get_broker(app)
+        poll_interval = app.config.get('JOB_POLL_INTERVAL', 1.0)
+        while stop is None or not stop.is_set():
+            with app.app_context():
+                try:
+                    job_id = broker.reserve(timeout=poll_interval)
+                    if job_id:
+                        JobQueue.run(job_id)
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.warning(f"Job worker error: {e}")
+                    time.sleep(poll_interval)
+                finally:
+                    db.session.remove()
+
+    @staticmethod
+    def _claim(job_id, owner):
+        """Atomically mark a job as running for owner; False if another worker got it"""
+        now = datetime.utcnow()
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, _claimable(now))
+            .values(
+                status='running',
+                attempts=Job.attempts + 1,
+                started_at=now,
+                claimed_by=owner,
+                lease_expires_at=now + timedelta(seconds=current_app.config.get('JOB_LEASE', 600))
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    def run(job_id):
+        """
+        Claim and run one job
+
+        Returns:
+            bool: Whether this worker ran the job
+        """
+        owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        if not JobQueue._claim(job_id, owner):
+            return False
+        job = JobQueue.get(job_id)
+
+        importlib.import_module('services.job_handlers')
+        handler = _handlers.get(job.type)
+        if handler is None:
+            JobQueue._finish(job_id, owner, 'failed', error=f"Unknown job type '{job.type}'")
+            return True
+        if job.attempts > job.max_attempts:
+            # Claimed again after its worker vanished, with no attempts left
+            JobQueue._finish(job_id, owner, 'failed', error=job.error or 'Job exceeded its lease')
+            return True
+
+        heartbeat = _LeaseHeartbeat(db.engine, job_id, owner, current_app.config.get('JOB_LEASE', 600))
+        job.lease_heartbeat = heartbeat
+        with heartbeat:
+            try:
+                result = handler(json.loads(job.payload or '{}'), job)
+            except LeaseLost:
+                # Whoever holds the job now records its outcome
+                db.session.rollback()
+                current_app.logger.warning(f"Job {job_id} lost its lease; {owner} stopped early")
+                return True
+            except Exception as e:
+                db.session.rollback()
+                JobQueue._retry_or_fail(JobQueue.get(job_id), owner, str(e))
+                return True
+        JobQueue._finish(job_id, owner, 'succeeded', result=result)
+        return True
+
+    @staticmethod
+    def check_lease(job):
+        """
+        Stop a handler whose job lease was lost
+
+        Long handlers call this between chunks of work so a worker that was
+        too slow to renew its lease does not keep writing next to the worker
+        that reclaimed the job.
+
+        Args:
+            job: The Job passed to the handler
+
+        Raises:
+            LeaseLost: If the lease was taken over or could not be renewed
+        """
+        heartbeat = getattr(job, 'lease_heartbeat', None)
+        if heartbeat is not None and heartbeat.expired():
+            raise LeaseLost(f'Job {job.id} lost its lease')
+
+    @staticmethod
+    def _update_owned(job_id, owner, **values):
+        """
+        Write values to a running job only if owner still holds its lease
+
+        Returns:
+            bool: False if the lease ran out and another worker took the job
+        """
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.claimed_by == owner, Job.status == 'running')
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        if result.rowcount != 1:
+            current_app.logger.warning(f"Job {job_id} lost its lease; discarding the outcome of {owner}")
+            return False
+        return True
+
+    @staticmethod
+    def _finish(job_id, owner, status, result=None, error=None):
+        values = {
+            'status': status,
+            'result': json.dumps(result) if result is not None else None,
+            'finished_at': datetime.utcnow(),
+            'lease_expires_at': None
+        }
+        if error is not None:
+            values['error'] = error
+        return JobQueue._update_owned(job_id, owner, **values)
+
+    @staticmethod
+    def _retry_or_fail(job, owner, error):
+        """Requeue a failed attempt with exponential backoff, or fail the job"""
+        if job.attempts >= job.max_attempts:
+            JobQueue._finish(job.id, owner, 'failed', error=error)
+            return
+
+        config = current_app.config
+        delay = min(
+            config.get('JOB_RETRY_BACKOFF', 5.0) * 2 ** (job.attempts - 1),
+            config.get('JOB_RETRY_BACKOFF_MAX', 300.0)
+        )
+        run_after = datetime.utcnow() + timedelta(seconds=delay)
+        if JobQueue._update_owned(job.id, owner, status='queued', error=error, run_after=run_after,
+                                  claimed_by=None, lease_expires_at=None):
+            get_broker(current_app).enqueue(job.id, run_after)
@@ -0,0 +1,145 @@
+"""
+Password hashing on a bounded worker pool
+bcrypt is CPU-bound by design. Hashes and checks run in a small process pool
+so a burst of logins cannot pin every request thread; when more than
+BCRYPT_MAX_PENDING operations are queued, new ones are rejected immediately
+with PasswordHasherBusy (the auth routes answer 429).
+Settings (BCRYPT_*) are read from the app config; the pool and the pending
+limit are sized on first use.
+"""
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+import threading
+import bcrypt
+
+_pool_lock = threading.Lock()
+_pool = None
+_slots = None
+
+
+class PasswordHasherBusy(Exception):
+    """The hashing pool is saturated; the caller should retry later"""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification through the worker pool"""
+
+    @staticmethod
+    def _get_pool(workers):
+        global _pool
+        if _pool is None:
+            with _pool_lock:
+                if _pool is None:
+                    # Workers only run the bcrypt functions below
+                    _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+    @staticmethod
+    def _get_slots():
+        """Semaphore bounding the operations queued or running in this process"""
+        global _slots
+        if _slots is None:
+            with _pool_lock:
+                if _slots is None:
+                    _slots = threading.BoundedSemaphore(current_app.config.get('BCRYPT_MAX_PENDING', 32))
+        return _slots
+
+    @staticmethod
+    def _reset_pool(broken):
+        """Drop a pool whose worker died so the next call starts a fresh one"""
+        global _pool
+        with _pool_lock:
+            if _pool is broken:
+                _pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _run(fn, *args):
+        """
+        Run fn in the pool, waiting at most BCRYPT_TIMEOUT seconds
+
+        A pool broken by a dying worker (e.g. the OOM killer) is replaced and
+        the operation retried once.
+
+        Raises:
+            PasswordHasherBusy: If the pool is saturated, too slow or keeps breaking
+        """
+        try:
+            return PasswordHasher._submit(fn, *args)
+        except BrokenProcessPool:
+            try:
+                return PasswordHasher._submit(fn, *args)
+            except BrokenProcessPool:
+                raise PasswordHasherBusy('Password hashing pool is unavailable')
+
+    @staticmethod
+    def _submit(fn, *args):
+        """Run fn once, resetting the pool if it turns out to be broken"""
+        slots = PasswordHasher._get_slots()
+        if not slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Too many concurrent password operations')
+
+        workers = current_app.config.get('BCRYPT_WORKERS', 4)
+        if workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                slots.release()
+
+        pool = PasswordHasher._get_pool(workers)
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            slots.release()
+            PasswordHasher._reset_pool(pool)
+            raise
+        except Exception:
+            slots.release()
+            raise
+        # The slot is held until the worker finishes, even if this request gives up
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=current_app.config.get('BCRYPT_TIMEOUT', 10))
+        except FutureTimeoutError:
+            raise PasswordHasherBusy('Password operation timed out')
+        except BrokenProcessPool:
+            PasswordHasher._reset_pool(pool)
+            raise
+
+    @staticmethod
+    def hash_password(password):
+        """
+        Hash a password with the configured work factor
+
+        Returns:
+            str: bcrypt hash
+        """
+        rounds = current_app.config.get('BCRYPT_ROUNDS', 12)
+        return PasswordHasher._run(_hash, password.encode('utf-8'), rounds).decode('utf-8')
+
+    @staticmethod
+    def verify_password(password, hashed):
+        """Check a password against a stored bcrypt hash"""
+        return PasswordHasher._run(_check, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    @staticmethod
+    def needs_rehash(hashed):
+        """
+        Whether a stored hash uses a lower work factor than BCRYPT_ROUNDS
+
+        Hashes made with a higher factor are kept, so lowering the setting
+        never downgrades stored passwords.
+        """
+        try:
+            return int(hashed.split('$')[2]) < current_app.config.get('BCRYPT_ROUNDS', 12)
+        except (IndexError, ValueError):
+            return True
@@ -4,44 +4,29 @@ PDF receipt generation service using reportlab
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from datetime import datetime
+import io
 import os
+import threading
 
-class PDFGenerator:
-    """Service for generating PDF receipts"""
+# Bump whenever the receipt layout changes so stored receipts are re-rendered
+RECEIPT_TEMPLATE_VERSION = 1
+
+FOOTER_TEXT = "This is a computer-generated receipt and does not require a signature.<br/>Thank you for your payment."
+
+_template_lock = threading.Lock()
+_template = None
+
+
+class _ReceiptTemplate:
+    """Paragraph and table styles shared by every receipt (built once per process)"""
     
-    @staticmethod
-    def generate_receipt(payment, user, profile, submission, output_dir='static/receipts'):
-        """
-        Generate PDF receipt for a payment
-        
-        Args:
-            payment: Payment model instance
-            user: User model instance
-            profile: TaxpayerProfile model instance (can be None)
-            submission: TaxSubmission model instance
-            output_dir: Directory to save PDF files
-            
-        Returns:
-            str: Path to generated PDF file
-        """
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Generate filename
-        filename = f"receipt_{payment.transaction_id}.pdf"
-        filepath = os.path.join(output_dir, filename)
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(filepath, pagesize=letter)
-        story = []
-        
-        # Styles
+    def __init__(self):
         styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
+        self.title_style = ParagraphStyle(
             'CustomTitle',
             parent=styles['Heading1'],
             fontSize=24,
@@ -49,29 +34,22 @@ class PDFGenerator:
             spaceAfter=30,
             alignment=TA_CENTER
         )
-        
-        heading_style = ParagraphStyle(
+        self.heading_style = ParagraphStyle(
             'CustomHeading',
             parent=styles['Heading2'],
             fontSize=14,
             textColor=colors.HexColor('#2c3e50'),
             spaceAfter=12
         )
+        self.footer_style = ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=colors.grey,
+            alignment=TA_CENTER
+        )
         
-        # Title
-        title = Paragraph("TAX PAYMENT RECEIPT", title_style)
-        story.append(title)
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Receipt information
-        receipt_data = [
-            ['Receipt Number:', payment.transaction_id],
-            ['Date:', payment.paid_at.strftime('%Y-%m-%d %H:%M:%S') if payment.paid_at else 'N/A'],
-            ['Status:', payment.status.upper()]
-        ]
-        
-        receipt_table = Table(receipt_data, colWidths=[2*inch, 4*inch])
-        receipt_table.setStyle(TableStyle([
+        self.receipt_table_style = TableStyle([
             ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
             ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
             ('FONTSIZE', (0, 0), (-1, -1), 11),
@@ -79,44 +57,16 @@ class PDFGenerator:
             ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
             ('ALIGN', (1, 0), (1, -1), 'LEFT'),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        story.append(receipt_table)
-        story.append(Spacer(1, 0.4*inch))
-        
-        # Taxpayer Information
-        story.append(Paragraph("Taxpayer Information", heading_style))
-        
-        taxpayer_data = [
-            ['Name:', profile.name if profile else 'N/A'],
-            ['Email:', user.email],
-            ['NID:', profile.nid if profile else 'N/A'],
-            ['TIN:', profile.tin if profile and profile.tin else 'N/A'],
-        ]
-        
-        taxpayer_table = Table(taxpayer_data, colWidths=[2*inch, 4*inch])
-        taxpayer_table.setStyle(TableStyle([
+        ])
+        self.taxpayer_table_style = TableStyle([
             ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
             ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
             ('FONTSIZE', (0, 0), (-1, -1), 10),
             ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
             ('ALIGN', (1, 0), (1, -1), 'LEFT'),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ]))
-        story.append(taxpayer_table)
-        story.append(Spacer(1, 0.4*inch))
-        
-        # Tax Calculation Details
-        story.append(Paragraph("Tax Calculation Details", heading_style))
-        
-        tax_data = [
-            ['Description', 'Amount'],
-            ['Total Income', f'৳{float(submission.total_income):,.2f}'],
-            ['Taxable Income', f'৳{float(submission.taxable_income):,.2f}'],
-            ['Tax Amount', f'৳{float(submission.tax_amount):,.2f}'],
-        ]
-        
-        tax_table = Table(tax_data, colWidths=[3*inch, 2.5*inch])
-        tax_table.setStyle(TableStyle([
+        ])
+        self.tax_table_style = TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -129,44 +79,164 @@ class PDFGenerator:
             ('FONTSIZE', (0, 1), (-1, -1), 10),
             ('TOPPADDING', (0, 1), (-1, -1), 8),
             ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-        ]))
-        story.append(tax_table)
-        story.append(Spacer(1, 0.4*inch))
-        
-        # Payment Information
-        story.append(Paragraph("Payment Information", heading_style))
-        
-        payment_data = [
-            ['Amount Paid:', f'৳{float(payment.amount):,.2f}'],
-            ['Payment Method:', payment.payment_method.capitalize()],
-            ['Transaction ID:', payment.transaction_id],
-        ]
-        
-        payment_table = Table(payment_data, colWidths=[2*inch, 4*inch])
-        payment_table.setStyle(TableStyle([
+        ])
+        self.payment_table_style = TableStyle([
             ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
             ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
             ('FONTSIZE', (0, 0), (-1, -1), 11),
             ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
             ('ALIGN', (1, 0), (1, -1), 'LEFT'),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        story.append(payment_table)
-        story.append(Spacer(1, 0.5*inch))
+        ])
+
+
+def _get_template():
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = _ReceiptTemplate()
+    return _template
+
+class PDFGenerator:
+    """Service for generating PDF receipts"""
+    
+    @staticmethod
+    def receipt_fields(payment, user, profile, submission):
+        """
+        Every value printed on a receipt, as display strings
         
-        # Footer
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
-        footer_text = "This is a computer-generated receipt and does not require a signature.<br/>Thank you for your payment."
-        footer = Paragraph(footer_text, footer_style)
-        story.append(footer)
+        Returns:
+            dict: Field name -> string
+        """
+        return {
+            'transaction_id': payment.transaction_id,
+            'date': payment.paid_at.strftime('%Y-%m-%d %H:%M:%S') if payment.paid_at else 'N/A',
+            'status': payment.status.upper(),
+            'name': profile.name if profile else 'N/A',
+            'email': user.email,
+            'nid': profile.nid if profile else 'N/A',
+            'tin': profile.tin if profile and profile.tin else 'N/A',
+            'total_income': f'৳{float(submission.total_income):,.2f}',
+            'taxable_income': f'৳{float(submission.taxable_income):,.2f}',
+            'tax_amount': f'৳{float(submission.tax_amount):,.2f}',
+            'amount_paid': f'৳{float(payment.amount):,.2f}',
+            'payment_method': payment.payment_method.capitalize(),
+        }
+    
+    @staticmethod
+    def render_receipt(fields):
+        """
+        Render a receipt into memory
+        
+        Args:
+            fields: Values from receipt_fields()
+            
+        Returns:
+            bytes: PDF document
+        """
+        return PDFGenerator.render_receipts([fields])
+    
+    @staticmethod
+    def render_receipts(fields_list):
+        """
+        Render several receipts into one PDF, each starting on a new page
+        
+        Args:
+            fields_list: Values from receipt_fields(), one dict per receipt
+            
+        Returns:
+            bytes: PDF document
+        """
+        template = _get_template()
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        story = []
+        for index, fields in enumerate(fields_list):
+            if index:
+                story.append(PageBreak())
+            PDFGenerator._receipt_story(story, fields, template)
         
         # Build PDF
         doc.build(story)
+        return buffer.getvalue()
+    
+    @staticmethod
+    def _receipt_story(story, fields, template):
+        """Append the flowables of one receipt to story"""
+        # Title
+        story.append(Paragraph("TAX PAYMENT RECEIPT", template.title_style))
+        story.append(Spacer(1, 0.3*inch))
+        
+        # Receipt information
+        receipt_data = [
+            ['Receipt Number:', fields['transaction_id']],
+            ['Date:', fields['date']],
+            ['Status:', fields['status']]
+        ]
+        story.append(Table(receipt_data, colWidths=[2*inch, 4*inch], style=template.receipt_table_style))
+        story.append(Spacer(1, 0.4*inch))
+        
+        # Taxpayer Information
+        story.append(Paragraph("Taxpayer Information", template.heading_style))
+        taxpayer_data = [
+            ['Name:', fields['name']],
+            ['Email:', fields['email']],
+            ['NID:', fields['nid']],
+            ['TIN:', fields['tin']],
+        ]
+        story.append(Table(taxpayer_data, colWidths=[2*inch, 4*inch], style=template.taxpayer_table_style))
+        story.append(Spacer(1, 0.4*inch))
+        
+        # Tax Calculation Details
+        story.append(Paragraph("Tax Calculation Details", template.heading_style))
+        tax_data = [
+            ['Description', 'Amount'],
+            ['Total Income', fields['total_income']],
+            ['Taxable Income', fields['taxable_income']],
+            ['Tax Amount', fields['tax_amount']],
+        ]
+        story.append(Table(tax_data, colWidths=[3*inch, 2.5*inch], style=template.tax_table_style))
+        story.append(Spacer(1, 0.4*inch))
+        
+        # Payment Information
+        story.append(Paragraph("Payment Information", template.heading_style))
+        payment_data = [
+            ['Amount Paid:', fields['amount_paid']],
+            ['Payment Method:', fields['payment_method']],
+            ['Transaction ID:', fields['transaction_id']],
+        ]
+        story.append(Table(payment_data, colWidths=[2*inch, 4*inch], style=template.payment_table_style))
+        story.append(Spacer(1, 0.5*inch))
+        
+        # Footer
+        story.append(Paragraph(FOOTER_TEXT, template.footer_style))
+    
+    @staticmethod
+    def generate_receipt(payment, user, profile, submission, output_dir='static/receipts', filename=None):
+        """
+        Generate PDF receipt for a payment and save it to disk
+        
+        Args:
+            payment: Payment model instance
+            user: User model instance
+            profile: TaxpayerProfile model instance (can be None)
+            submission: TaxSubmission model instance
+            output_dir: Directory to save PDF files
+            filename: File name inside output_dir (default receipt_<transaction id>.pdf)
+            
+        Returns:
+            str: Path to generated PDF file
+        """
+        # Create output directory if it doesn't exist
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Generate filename
+        filename = filename or f"receipt_{payment.transaction_id}.pdf"
+        filepath = os.path.join(output_dir, filename)
+        
+        pdf = PDFGenerator.render_receipt(PDFGenerator.receipt_fields(payment, user, profile, submission))
+        with open(filepath, 'wb') as f:
+            f.write(pdf)
         
         return filepath
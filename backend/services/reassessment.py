@@ -0,0 +1,165 @@
+"""
+Bulk re-assessment of pending tax submissions
+Re-prices every pending submission against the current slab schedule after
+the live slabs change. Runs as a 'reassess' job on the persistent job queue,
+so progress is stored in the jobs table and visible from every process.
+"""
+from models import db
+from models.job import Job
+from models.tax_submission import TaxSubmission
+from services.jobs import JobQueue
+from services.tax_calculator import TaxCalculator
+from sqlalchemy import case, select, update
+import json
+
+JOB_TYPE = 'reassess'
+
+# Number of jobs returned by the listing endpoint
+_MAX_LISTED_JOBS = 20
+
+# Job statuses as reported by the re-assessment endpoints
+_STATUSES = {'succeeded': 'completed'}
+
+
+class ReassessmentService:
+    """Queues re-assessment jobs and reports their progress"""
+
+    @staticmethod
+    def start(reason=None, user_id=None):
+        """
+        Queue a re-assessment of pending submissions
+
+        A job that is still queued has not read the slabs yet and is reused;
+        otherwise (none, or one already running against the old slabs) a new
+        job is queued.
+
+        Args:
+            reason: Short description shown in the job status
+            user_id: Admin who asked for it
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job.query.filter_by(type=JOB_TYPE, status='queued') \
+            .order_by(Job.created_at.desc()).first()
+        if job is not None:
+            return job
+        return JobQueue.enqueue(JOB_TYPE, {'reason': reason}, user_id=user_id)
+
+    @staticmethod
+    def get(job_id):
+        """Get a re-assessment job by id, or None"""
+        job = JobQueue.get(job_id)
+        return job if job is not None and job.type == JOB_TYPE else None
+
+    @staticmethod
+    def list_jobs():
+        """Get the most recent re-assessment jobs, newest first"""
+        return Job.query.filter_by(type=JOB_TYPE) \
+            .order_by(Job.created_at.desc()) \
+            .limit(_MAX_LISTED_JOBS).all()
+
+    @staticmethod
+    def to_dict(job):
+        """Convert a re-assessment job and its stored progress to dictionary"""
+        payload = json.loads(job.payload or '{}')
+        progress = json.loads(job.result) if job.result else {}
+        status = _STATUSES.get(job.status, job.status)
+        total = progress.get('total', 0)
+        processed = progress.get('processed', 0)
+        return {
+            'id': job.id,
+            'reason': payload.get('reason'),
+            'status': status,
+            'attempts': job.attempts,
+            'total': total,
+            'processed': processed,
+            'updated': progress.get('updated', 0),
+            'progress': round(processed / total * 100, 1) if total else (100.0 if status == 'completed' else 0.0),
+            'error': job.error,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'started_at': job.started_at.isoformat() if job.started_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None
+        }
+
+    @staticmethod
+    def _engine_priced(income_details):
+        """Whether a submission was priced by the full assessment engine"""
+        # Cheap substring test first; only parse JSON for likely matches
+        if not income_details or '"assessment"' not in income_details:
+            return False
+        return 'assessment' in json.loads(income_details)
+
+    @staticmethod
+    def reassess_pending(job, chunk_size=1000):
+        """
+        Re-price all pending submissions in keyset-paginated chunks
+
+        The live schedule is re-read from the shared version row when the job
+        starts and that one schedule prices every chunk, so a run never mixes
+        slab sets. Each chunk is priced in one batch and changed rows are
+        written back with a single UPDATE ... CASE, committed per chunk
+        together with the job's progress. Amounts are rounded like /submit
+        stores them (half up), so unchanged submissions compare equal.
+        Submissions priced by the full assessment engine do not depend on the
+        slab table and are left alone. The job's lease is checked before each
+        chunk is written, so a worker that lost the job stops there.
+
+        Args:
+            job: The running Job whose result holds the progress
+            chunk_size: Submissions per chunk
+
+        Returns:
+            dict: Final progress (total, processed, updated)
+
+        Raises:
+            LeaseLost: If another worker took the job over
+        """
+        schedule = TaxCalculator.get_schedule(refresh=True)
+
+        progress = {
+            'total': TaxSubmission.query.filter_by(status='pending').count(),
+            'processed': 0,
+            'updated': 0
+        }
+        job.result = json.dumps(progress)
+        db.session.commit()
+
+        last_id = 0
+        while True:
+            stmt = (
+                select(TaxSubmission.id, TaxSubmission.taxable_income,
+                       TaxSubmission.tax_amount, TaxSubmission.income_details)
+                .where(TaxSubmission.status == 'pending', TaxSubmission.id > last_id)
+                .order_by(TaxSubmission.id)
+                .limit(chunk_size)
+            )
+            rows = db.session.execute(stmt).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            slab_priced = [row for row in rows if not ReassessmentService._engine_priced(row.income_details)]
+            new_taxes = TaxCalculator.calculate_tax_batch(
+                [row.taxable_income for row in slab_priced], schedule=schedule)
+            changes = {
+                row.id: tax
+                for row, tax in zip(slab_priced, new_taxes)
+                if tax != row.tax_amount
+            }
+
+            JobQueue.check_lease(job)
+            if changes:
+                db.session.execute(
+                    update(TaxSubmission)
+                    .where(TaxSubmission.id.in_(list(changes)), TaxSubmission.status == 'pending')
+                    .values(tax_amount=case(changes, value=TaxSubmission.id))
+                    .execution_options(synchronize_session=False)
+                )
+
+            progress['processed'] += len(rows)
+            progress['updated'] += len(changes)
+            job.result = json.dumps(progress)
+            db.session.commit()
+
+        return progress
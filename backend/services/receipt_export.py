@@ -0,0 +1,273 @@
+"""
+Bulk receipt export
+Pages through payments joined with their user, profile and submission, fans
+rendering out to a process pool and streams the receipts back as a ZIP
+archive or as merged PDFs. Only a bounded number of rendered batches is held
+in memory at any time.
+"""
+from flask import current_app
+from models import db
+from models.payment import Payment
+from models.user import User
+from models.taxpayer_profile import TaxpayerProfile
+from models.tax_submission import TaxSubmission
+from services.pdf_generator import PDFGenerator
+from utils.pagination import parse_date
+from werkzeug.utils import secure_filename
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from datetime import datetime
+import os
+import threading
+import zipfile
+
+# Worker processes (0 = render in the calling thread)
+RECEIPT_EXPORT_WORKERS = int(os.getenv('RECEIPT_EXPORT_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Payments fetched per database round trip
+RECEIPT_EXPORT_CHUNK_SIZE = int(os.getenv('RECEIPT_EXPORT_CHUNK_SIZE', '1000'))
+# Receipts rendered per worker task
+RECEIPT_EXPORT_BATCH_SIZE = int(os.getenv('RECEIPT_EXPORT_BATCH_SIZE', '25'))
+# Receipts per merged PDF
+RECEIPT_EXPORT_PDF_PART_SIZE = int(os.getenv('RECEIPT_EXPORT_PDF_PART_SIZE', '500'))
+
+_pool_lock = threading.Lock()
+_pool = None
+
+
+def _render_batch(fields_list, merged):
+    """Worker task: one PDF per receipt, or one PDF for the whole batch"""
+    if merged:
+        return [PDFGenerator.render_receipts(fields_list)]
+    return [PDFGenerator.render_receipt(fields) for fields in fields_list]
+
+
+class _ZipStream:
+    """Write-only file object for zipfile whose output is drained as it grows"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ReceiptExport:
+    """Streams receipts for many payments at once"""
+
+    @staticmethod
+    def query(date_from=None, date_to=None, status=None, district=None):
+        """
+        Payments to export, with everything a receipt prints
+
+        Args:
+            date_from: Include payments made at or after this datetime
+            date_to: Include payments made before this datetime
+            status: Payment status
+            district: Text matched against the taxpayer's address
+
+        Returns:
+            Query: Rows of (Payment, User, TaxpayerProfile or None, TaxSubmission)
+        """
+        query = db.session.query(Payment, User, TaxpayerProfile, TaxSubmission) \
+            .join(User, Payment.user_id == User.id) \
+            .join(TaxSubmission, Payment.submission_id == TaxSubmission.id) \
+            .outerjoin(TaxpayerProfile, TaxpayerProfile.user_id == Payment.user_id)
+
+        if date_from:
+            query = query.filter(Payment.paid_at >= date_from)
+        if date_to:
+            query = query.filter(Payment.paid_at < date_to)
+        if status:
+            query = query.filter(Payment.status == status)
+        if district:
+            query = query.filter(TaxpayerProfile.address.ilike(f'%{district.strip()}%'))
+        return query
+
+    @staticmethod
+    def query_from_args(args):
+        """
+        Build the export query from request-style filters
+
+        Args:
+            args: Mapping with optional status, district, date_from and
+                  date_to (ISO dates on paid_at)
+
+        Raises:
+            ValueError: If a date is malformed
+        """
+        date_from = args.get('date_from')
+        date_to = args.get('date_to')
+        return ReceiptExport.query(
+            date_from=parse_date(date_from, 'date_from') if date_from else None,
+            date_to=parse_date(date_to, 'date_to') if date_to else None,
+            status=args.get('status'),
+            district=args.get('district')
+        )
+
+    @staticmethod
+    def output(query, export_format, total):
+        """
+        Pick the output for a selection of total payments
+
+        Args:
+            query: Query from ReceiptExport.query()
+            export_format: 'zip' (one PDF per receipt) or 'pdf' (merged)
+            total: Number of payments query returns
+
+        Returns:
+            tuple: (iterator of bytes, mimetype, file extension)
+        """
+        if export_format == 'pdf' and total <= RECEIPT_EXPORT_PDF_PART_SIZE:
+            return ReceiptExport.stream_pdf(query), 'application/pdf', 'pdf'
+        # Larger merged exports become a ZIP of merged parts
+        return ReceiptExport.stream_zip(query, merged=export_format == 'pdf'), 'application/zip', 'zip'
+
+    @staticmethod
+    def export_dir():
+        """
+        Directory for export files written by background jobs
+
+        A relative EXPORT_DIR is resolved against the application root, so
+        web and worker processes agree whatever their working directory.
+        """
+        return os.path.join(current_app.root_path, current_app.config.get('EXPORT_DIR', 'static/exports'))
+
+    @staticmethod
+    def _get_pool():
+        global _pool
+        if _pool is None:
+            with _pool_lock:
+                if _pool is None:
+                    _pool = ProcessPoolExecutor(max_workers=RECEIPT_EXPORT_WORKERS)
+        return _pool
+
+    @staticmethod
+    def _reset_pool(broken):
+        """Drop a pool whose worker died so the next export starts a fresh one"""
+        global _pool
+        with _pool_lock:
+            if _pool is broken:
+                _pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _batches(query, batch_size):
+        """Receipt fields in batches, paging through query by payment id"""
+        last_id = 0
+        batch = []
+        while True:
+            rows = query.filter(Payment.id > last_id) \
+                .order_by(Payment.id) \
+                .limit(RECEIPT_EXPORT_CHUNK_SIZE).all()
+            for payment, user, profile, submission in rows:
+                batch.append(PDFGenerator.receipt_fields(payment, user, profile, submission))
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if len(rows) < RECEIPT_EXPORT_CHUNK_SIZE:
+                break
+            last_id = rows[-1][0].id
+            # Release the page before fetching the next one
+            db.session.expunge_all()
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _rendered(batches, merged):
+        """
+        Render batches on the pool, yielding (batch, pdfs) in order
+
+        At most two batches per worker are in flight, which bounds memory
+        no matter how many payments the query returns. If a worker dies and
+        breaks the pool, the pool is replaced once and the batches in flight
+        are rendered again.
+        """
+        if RECEIPT_EXPORT_WORKERS <= 0:
+            for batch in batches:
+                yield batch, _render_batch(batch, merged)
+            return
+
+        pool = ReceiptExport._get_pool()
+        max_pending = RECEIPT_EXPORT_WORKERS * 2
+        pending = deque()
+        unsent = None
+        restarted = False
+        batches = iter(batches)
+        try:
+            while True:
+                try:
+                    while len(pending) < max_pending:
+                        unsent = unsent or next(batches, None)
+                        if unsent is None:
+                            break
+                        pending.append((unsent, pool.submit(_render_batch, unsent, merged)))
+                        unsent = None
+                    if not pending:
+                        return
+                    pdfs = pending[0][1].result()
+                except BrokenProcessPool:
+                    if restarted:
+                        raise
+                    restarted = True
+                    ReceiptExport._reset_pool(pool)
+                    pool = ReceiptExport._get_pool()
+                    pending = deque((batch, pool.submit(_render_batch, batch, merged)) for batch, _ in pending)
+                    continue
+                batch, _ = pending.popleft()
+                yield batch, pdfs
+        finally:
+            # The client went away: drop work that has not started yet
+            for _, future in pending:
+                future.cancel()
+
+    @staticmethod
+    def stream_zip(query, merged=False):
+        """
+        Stream a ZIP archive of receipts
+
+        Args:
+            query: Query from ReceiptExport.query()
+            merged: Pack RECEIPT_EXPORT_PDF_PART_SIZE receipts into each PDF
+                    instead of one PDF per receipt
+
+        Yields:
+            bytes: Successive pieces of the archive
+        """
+        batch_size = RECEIPT_EXPORT_PDF_PART_SIZE if merged else RECEIPT_EXPORT_BATCH_SIZE
+        stream = _ZipStream()
+        date_time = datetime.utcnow().timetuple()[:6]
+        part = 0
+
+        # PDFs are already compressed; storing them keeps the workers the bottleneck
+        with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for batch, pdfs in ReceiptExport._rendered(ReceiptExport._batches(query, batch_size), merged):
+                if merged:
+                    part += 1
+                    names = [f'tax_receipts_part_{part:04d}.pdf']
+                else:
+                    names = [f"tax_receipt_{secure_filename(fields['transaction_id'])}.pdf" for fields in batch]
+                for name, pdf in zip(names, pdfs):
+                    archive.writestr(zipfile.ZipInfo(name, date_time), pdf)
+                yield stream.drain()
+        yield stream.drain()
+
+    @staticmethod
+    def stream_pdf(query):
+        """
+        Stream one merged PDF (at most RECEIPT_EXPORT_PDF_PART_SIZE receipts)
+
+        Yields:
+            bytes: The PDF document
+        """
+        for _, pdfs in ReceiptExport._rendered(ReceiptExport._batches(query, RECEIPT_EXPORT_PDF_PART_SIZE), True):
+            yield pdfs[0]
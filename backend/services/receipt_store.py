@@ -0,0 +1,64 @@
+"""
+Stored PDF receipts
+A receipt is rendered once and kept on disk under a name derived from the
+transaction ID and a hash of the template version and every printed value,
+so it is only re-rendered when the template or the underlying data changes.
+A fresh render is returned in memory as well, so the first download is
+served without reading the file back.
+"""
+from services.pdf_generator import PDFGenerator, RECEIPT_TEMPLATE_VERSION
+from werkzeug.utils import secure_filename
+import glob
+import hashlib
+import json
+import os
+import uuid
+
+
+class ReceiptStore:
+    """Content-addressed receipt files"""
+
+    @staticmethod
+    def receipt_key(fields):
+        """Hash of the template version and the printed values"""
+        payload = json.dumps({'template': RECEIPT_TEMPLATE_VERSION, 'fields': fields}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_receipt(payment, user, profile, submission, receipt_dir='static/receipts'):
+        """
+        Get the stored receipt for a payment, rendering it if needed
+
+        Returns:
+            tuple: (path to the PDF, receipt key usable as an ETag,
+                    PDF bytes if it was rendered by this call, else None)
+        """
+        fields = PDFGenerator.receipt_fields(payment, user, profile, submission)
+        key = ReceiptStore.receipt_key(fields)
+        prefix = f"receipt_{secure_filename(payment.transaction_id)}"
+        filename = f"{prefix}_{key[:16]}.pdf"
+        path = os.path.join(receipt_dir, filename)
+
+        if os.path.exists(path):
+            return path, key, None
+
+        pdf = PDFGenerator.render_receipt(fields)
+
+        # Write under a temporary name, then publish atomically
+        os.makedirs(receipt_dir, exist_ok=True)
+        tmp_path = os.path.join(receipt_dir, f"{filename}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(pdf)
+        os.replace(tmp_path, path)
+
+        # Drop renders of older template versions or data
+        stale = glob.glob(os.path.join(receipt_dir, glob.escape(prefix) + '_*.pdf'))
+        stale.append(os.path.join(receipt_dir, f"{prefix}.pdf"))
+        for old_path in stale:
+            if old_path != path:
+                try:
+                    os.remove(old_path)
+                except FileNotFoundError:
+                    pass
+
+        return path, key, pdf
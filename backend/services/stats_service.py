@@ -0,0 +1,226 @@
+"""
+Aggregate statistics service
+Keeps an in-memory snapshot of the admin dashboard counters, computed with a
+single aggregate query and updated incrementally as submissions and payments
+are committed, and the public landing page statistics, recomputed by a
+background thread so page views never hit the database
+"""
+from models import db
+from models.user import User
+from models.payment import Payment
+from models.tax_submission import TaxSubmission
+from sqlalchemy import case, func, select, true
+from sqlalchemy.orm import contains_eager
+from decimal import Decimal
+import threading
+import time
+
+# Number of recent payments shown on the dashboard
+RECENT_PAYMENTS = 5
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def _count_if(condition):
+    """SUM(CASE WHEN condition THEN 1 ELSE 0 END)"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+class DashboardStats:
+    """In-memory admin dashboard snapshot with a staleness bound"""
+
+    @staticmethod
+    def compute_counts():
+        """
+        Compute every dashboard counter in one round trip
+
+        Returns:
+            dict: Counter name -> value (revenue as Decimal)
+        """
+        users = select(
+            _count_if(User.role == 'user').label('total_users'),
+            _count_if(User.role == 'admin').label('total_admins')
+        ).subquery()
+        payments = select(
+            func.count(Payment.id).label('total_payments'),
+            func.coalesce(func.sum(Payment.amount), 0).label('total_revenue')
+        ).subquery()
+        submissions = select(
+            func.count(TaxSubmission.id).label('total_submissions'),
+            _count_if(TaxSubmission.status == 'pending').label('pending_submissions')
+        ).subquery()
+
+        # Each derived table aggregates one row; cross-join them into a single row
+        stmt = select(users, payments, submissions).select_from(
+            users.join(payments, true()).join(submissions, true())
+        )
+        row = db.session.execute(stmt).one()
+        counts = dict(row._mapping)
+        counts['total_revenue'] = Decimal(str(counts['total_revenue']))
+        for name in ('total_users', 'total_admins', 'total_payments', 'total_submissions', 'pending_submissions'):
+            counts[name] = int(counts[name])
+        return counts
+
+    @staticmethod
+    def recent_payments():
+        """Latest payments with the payer's email, in one joined query"""
+        payments = Payment.query \
+            .join(Payment.user) \
+            .options(contains_eager(Payment.user)) \
+            .order_by(Payment.paid_at.desc(), Payment.id.desc()) \
+            .limit(RECENT_PAYMENTS).all()
+        return [DashboardStats._payment_entry(payment, payment.user.email) for payment in payments]
+
+    @staticmethod
+    def _payment_entry(payment, user_email):
+        payment_dict = payment.to_dict()
+        payment_dict['user_email'] = user_email
+        return payment_dict
+
+    @staticmethod
+    def refresh():
+        """Recompute the snapshot from the database"""
+        global _snapshot
+        snapshot = {
+            'counts': DashboardStats.compute_counts(),
+            'recent_payments': DashboardStats.recent_payments(),
+            'refreshed_at': time.monotonic()
+        }
+        with _lock:
+            _snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def get(max_age=60):
+        """
+        Get the dashboard payload, refreshing if older than max_age seconds
+
+        Returns:
+            dict: {'stats': {...}, 'recent_payments': [...]}
+        """
+        snapshot = _snapshot
+        if snapshot is None or time.monotonic() - snapshot['refreshed_at'] > max_age:
+            snapshot = DashboardStats.refresh()
+
+        with _lock:
+            counts = dict(snapshot['counts'])
+            recent = list(snapshot['recent_payments'])
+
+        counts['total_revenue'] = float(counts['total_revenue'])
+        return {'stats': counts, 'recent_payments': recent}
+
+    @staticmethod
+    def invalidate():
+        """Drop the snapshot so the next read recomputes it"""
+        global _snapshot
+        with _lock:
+            _snapshot = None
+
+    @staticmethod
+    def record_submission():
+        """Account for a newly committed pending submission"""
+        with _lock:
+            if _snapshot is not None:
+                _snapshot['counts']['total_submissions'] += 1
+                _snapshot['counts']['pending_submissions'] += 1
+
+    @staticmethod
+    def record_payment(payment, user_email, settled_pending=True):
+        """
+        Account for a newly committed payment
+
+        Args:
+            payment: Committed Payment
+            user_email: Payer's email for the recent payments list
+            settled_pending: Whether the paid submission was pending before
+        """
+        with _lock:
+            if _snapshot is not None:
+                counts = _snapshot['counts']
+                counts['total_payments'] += 1
+                counts['total_revenue'] += Decimal(str(payment.amount))
+                if settled_pending:
+                    counts['pending_submissions'] = max(0, counts['pending_submissions'] - 1)
+                recent = [DashboardStats._payment_entry(payment, user_email)] + _snapshot['recent_payments']
+                _snapshot['recent_payments'] = recent[:RECENT_PAYMENTS]
+
+
+_public_lock = threading.Lock()
+_public_snapshot = None
+_public_refresher = None
+
+
+class PublicStats:
+    """Landing page statistics, refreshed by a background thread"""
+
+    @staticmethod
+    def compute():
+        """
+        Compute the public landing page statistics in one round trip
+
+        Returns:
+            dict: Payload served by GET /api/tax/stats
+        """
+        users = select(func.count(User.id).label('user_count')).subquery()
+        submissions = select(func.count(TaxSubmission.id).label('total_submissions')).subquery()
+        payments = select(
+            _count_if(Payment.status == 'completed').label('completed_payments'),
+            func.coalesce(func.sum(case((Payment.status == 'completed', Payment.amount), else_=0)), 0).label('total_tax_paid'),
+            func.coalesce(func.sum(case((Payment.status != 'completed', Payment.amount), else_=0)), 0).label('total_tax_due')
+        ).subquery()
+
+        stmt = select(users, submissions, payments).select_from(
+            users.join(submissions, true()).join(payments, true())
+        )
+        row = db.session.execute(stmt).one()
+
+        user_count = int(row.user_count)
+        total_submissions = int(row.total_submissions)
+        percent = (int(row.completed_payments) / total_submissions) * 100 if total_submissions > 0 else 0
+
+        return {
+            'online_users': user_count,
+            'filing_percentage': round(percent, 1) if percent > 0 else 75.0,
+            'total_tax_paid': float(row.total_tax_paid),
+            'total_tax_due': float(row.total_tax_due),
+            'total_filers': user_count + 12000
+        }
+
+    @staticmethod
+    def get(app, interval=30):
+        """
+        Get the latest snapshot, starting the background refresher on first use
+
+        Args:
+            app: Flask application (the refresher thread needs its context)
+            interval: Seconds between refreshes
+
+        Returns:
+            dict: Latest public statistics
+        """
+        global _public_snapshot, _public_refresher
+        if _public_refresher is None:
+            with _public_lock:
+                if _public_snapshot is None:
+                    _public_snapshot = PublicStats.compute()
+                if _public_refresher is None:
+                    _public_refresher = threading.Thread(
+                        target=PublicStats._refresh_loop, args=(app, interval), daemon=True
+                    )
+                    _public_refresher.start()
+        return _public_snapshot
+
+    @staticmethod
+    def _refresh_loop(app, interval):
+        """Recompute the snapshot every interval seconds"""
+        global _public_snapshot
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    _public_snapshot = PublicStats.compute()
+                except Exception as e:
+                    app.logger.warning(f"Public stats refresh failed: {e}")
+                finally:
+                    db.session.remove()
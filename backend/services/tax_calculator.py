@@ -2,20 +2,367 @@
 Tax calculation service
 Handles tax calculations based on progressive tax slabs stored in the database
 """
-from models.tax_slab import TaxSlab
-from decimal import Decimal
+from models import db
+from models.tax_slab import TaxSlab, TaxSlabVersion
+from utils.cache import LRUCache
+from sqlalchemy import update
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from bisect import bisect_left
+import os
+import re
+import threading
+import time
+
+# NumPy is optional; batch calculations fall back to the Decimal path
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Compiled slab schedules shared by all requests in this process, keyed by
+# requested assessment year (None = the live, undated schedule).
+# The schedule version lives in the tax_slab_version row so that admin slab
+# edits reach every worker process: each process re-reads it at most every
+# TAX_SLAB_VERSION_CHECK_INTERVAL seconds and recompiles when it moved, so
+# quotes may lag an edit made elsewhere by that long. Callers that store the
+# amount (/submit, re-assessment) pass refresh=True to read it every time.
+_schedule_lock = threading.Lock()
+_schedule_version = None
+_version_checked_at = 0.0
+_schedules = {}
+
+SLAB_VERSION_CHECK_INTERVAL = float(os.getenv('TAX_SLAB_VERSION_CHECK_INTERVAL', '2'))
+
+ASSESSMENT_YEAR_PATTERN = re.compile(r'^\d{4}-\d{2}$')
+
+# Memoized calculate_tax results keyed by (shared schedule version, year,
+# income, breakdown); dropped whenever a process sees the version move
+_result_cache = LRUCache(
+    maxsize=int(os.getenv('TAX_RESULT_CACHE_SIZE', '4096')),
+    ttl=int(os.getenv('TAX_RESULT_CACHE_TTL', '3600')) or None
+)
+
+
+class SlabSchedule:
+    """
+    Immutable, in-memory compiled form of the tax slab table
+
+    Bounds and rates are stored in min_income order. cumulative_tax[i] is
+    the tax due on a full walk through every slab below slab i, so the
+    liability at any boundary is known without touching the database.
+    """
+
+    __slots__ = ('version', 'assessment_year', 'lower_bounds', 'upper_bounds', 'rates',
+                 'contiguous', 'cumulative_tax', 'integer_table')
+
+    def __init__(self, slabs, version, assessment_year=None):
+        """
+        Args:
+            slabs: TaxSlab rows ordered by min_income
+            version: Schedule version the rows were loaded at
+            assessment_year: Year of the slab set (None for the live schedule)
+        """
+        self.version = version
+        self.assessment_year = assessment_year
+        self.lower_bounds = tuple(Decimal(slab.min_income) for slab in slabs)
+        self.upper_bounds = tuple(
+            Decimal(slab.max_income) if slab.max_income is not None else None
+            for slab in slabs
+        )
+        self.rates = tuple(Decimal(slab.tax_rate) for slab in slabs)
+
+        # Prefix sums are only valid when slabs do not overlap and only the
+        # last slab is open-ended; anything else falls back to a full walk
+        self.contiguous = all(
+            upper is not None and upper <= next_lower
+            for upper, next_lower in zip(self.upper_bounds, self.lower_bounds[1:])
+        )
+
+        cumulative = []
+        running = Decimal('0')
+        for lower, upper, rate in zip(self.lower_bounds, self.upper_bounds, self.rates):
+            cumulative.append(running)
+            if upper is not None:
+                running += max(Decimal('0'), upper - lower) * (rate / Decimal('100'))
+        self.cumulative_tax = tuple(cumulative)
+        self.integer_table = self._build_integer_table()
+
+    def _build_integer_table(self):
+        """
+        Exact integer form of the schedule for vectorized batch pricing
+
+        Bounds are in paisa (1/100 taka) and rates in basis points, so every
+        tax value is an integer number of micro-taka (paisa x basis point).
+        Returns None when the schedule cannot be represented exactly.
+        """
+        if not self.contiguous:
+            return None
+
+        def scaled(value):
+            value = value * 100
+            return int(value) if value == value.to_integral_value() else None
+
+        lower = [scaled(value) for value in self.lower_bounds]
+        upper = [scaled(value) for value in self.upper_bounds[:-1]]
+        rates = [scaled(value) for value in self.rates]
+        if None in lower or None in upper or None in rates:
+            return None
+
+        # Only the top slab may be open-ended; keep None for "no limit"
+        if self.upper_bounds:
+            top = self.upper_bounds[-1]
+            upper.append(scaled(top) if top is not None else None)
+            if top is not None and upper[-1] is None:
+                return None
+
+        cumulative = []
+        running = 0
+        for low, high, rate in zip(lower, upper, rates):
+            cumulative.append(running)
+            if high is not None:
+                running += max(0, high - low) * rate
+        return tuple(lower), tuple(upper), tuple(rates), tuple(cumulative)
+
+    def __setattr__(self, name, value):
+        # integer_table is the last attribute assigned in __init__
+        if hasattr(self, 'integer_table'):
+            raise AttributeError('SlabSchedule is immutable')
+        object.__setattr__(self, name, value)
+
+    def __len__(self):
+        return len(self.lower_bounds)
+
+    def _taxable_in_slab(self, index, income):
+        """Portion of income falling inside slab `index` (never negative)"""
+        upper = self.upper_bounds[index]
+        upper_limit = income if upper is None else min(income, upper)
+        return max(Decimal('0'), upper_limit - self.lower_bounds[index])
+
+    def tax_for(self, income):
+        """
+        Total tax on income
+
+        Binary-searches the bracket containing income and adds the
+        prefix-summed tax of every bracket below it.
+
+        Args:
+            income: Annual income (Decimal)
+
+        Returns:
+            Decimal: Total tax
+        """
+        if not self.contiguous:
+            return sum(
+                (self._taxable_in_slab(i, income) * (self.rates[i] / Decimal('100'))
+                 for i in range(len(self)) if income > self.lower_bounds[i]),
+                Decimal('0')
+            )
+
+        # Number of slabs whose lower bound is strictly below income
+        count = bisect_left(self.lower_bounds, income)
+        if count == 0:
+            return Decimal('0')
+
+        top = count - 1
+        taxable = self._taxable_in_slab(top, income)
+        return self.cumulative_tax[top] + taxable * (self.rates[top] / Decimal('100'))
+
+    def breakdown_for(self, income):
+        """
+        Per-slab breakdown of the tax on income
+
+        Args:
+            income: Annual income (Decimal)
+
+        Returns:
+            list: Breakdown rows as returned by TaxCalculator.calculate_tax
+        """
+        breakdown = []
+
+        for index, (min_income, max_income, tax_rate) in enumerate(zip(self.lower_bounds, self.upper_bounds, self.rates)):
+            # Skip if income is below this slab
+            if income <= min_income:
+                if self.contiguous:
+                    break
+                continue
+
+            taxable_in_slab = self._taxable_in_slab(index, income)
+            if taxable_in_slab > 0:
+                tax_in_slab = taxable_in_slab * (tax_rate / Decimal('100'))
+
+                slab_range = f"{float(min_income):,.2f}"
+                if max_income:
+                    slab_range += f" - {float(max_income):,.2f}"
+                else:
+                    slab_range += "+"
+
+                breakdown.append({
+                    'slab': slab_range,
+                    'taxable_amount': float(taxable_in_slab),
+                    'rate': float(tax_rate),
+                    'tax': float(tax_in_slab)
+                })
+
+        return breakdown
+
 
 class TaxCalculator:
     """Service class for calculating taxes based on slabs"""
-    
+
+    @staticmethod
+    def bump_schedule_version():
+        """
+        Invalidate the compiled slab schedule in every process
+        Must be called after any committed change to the tax_slabs table
+        """
+        global _schedule_version, _version_checked_at
+        result = db.session.execute(
+            update(TaxSlabVersion)
+            .where(TaxSlabVersion.id == 1)
+            .values(version=TaxSlabVersion.version + 1, updated_at=datetime.utcnow())
+        )
+        if result.rowcount == 0:
+            db.session.add(TaxSlabVersion(id=1, version=1))
+        db.session.commit()
+
+        # This process re-reads the new version on its next calculation
+        with _schedule_lock:
+            _schedule_version = None
+            _version_checked_at = 0.0
+        _result_cache.clear()
+
+    @staticmethod
+    def schedule_version(force=False):
+        """
+        Current slab schedule version shared by all processes
+
+        Read from the tax_slab_version row at most every
+        SLAB_VERSION_CHECK_INTERVAL seconds.
+
+        Args:
+            force: Read the row now instead of trusting the last check
+        """
+        global _schedule_version, _version_checked_at
+        now = time.monotonic()
+        version = _schedule_version
+        if not force and version is not None and now - _version_checked_at < SLAB_VERSION_CHECK_INTERVAL:
+            return version
+
+        version = db.session.query(TaxSlabVersion.version).filter(TaxSlabVersion.id == 1).scalar() or 0
+        with _schedule_lock:
+            changed = _schedule_version is not None and _schedule_version != version
+            _schedule_version = version
+            _version_checked_at = now
+        if changed:
+            # Results of the old schedule can never be hit again
+            _result_cache.clear()
+        return version
+
+    @staticmethod
+    def cache_stats():
+        """Get hit/miss/eviction counters of the calculate_tax result cache"""
+        stats = _result_cache.stats()
+        stats['schedule_version'] = _schedule_version
+        return stats
+
+    @staticmethod
+    def normalize_assessment_year(year):
+        """
+        Validate an assessment year such as '2025-26'
+
+        Returns:
+            str or None: The year, or None for blank input (live schedule)
+
+        Raises:
+            ValueError: If the year is not in YYYY-YY form
+        """
+        if year is None or str(year).strip() == '':
+            return None
+        year = str(year).strip()
+        if not ASSESSMENT_YEAR_PATTERN.match(year) or (int(year[:4]) + 1) % 100 != int(year[5:]):
+            raise ValueError('assessment_year must look like 2025-26')
+        return year
+
+    @staticmethod
+    def assessment_year_for(moment):
+        """
+        Assessment year in progress at a given date
+
+        Bangladesh assessment years run July to June, e.g. 2025-07-01 to
+        2026-06-30 is assessment year 2025-26.
+        """
+        start = moment.year if moment.month >= 7 else moment.year - 1
+        return f"{start}-{(start + 1) % 100:02d}"
+
     @staticmethod
-    def calculate_tax(annual_income):
+    def _load_slabs(year):
+        """
+        Load the slab rows in effect for an assessment year
+
+        A dated year uses the latest slab set whose assessment_year is not
+        after it; if there is none (or year is None) the undated live slabs
+        are used.
+
+        Returns:
+            tuple: (slabs ordered by min_income, effective year or None)
+        """
+        effective_year = None
+        if year is not None:
+            effective_year = TaxSlab.query.with_entities(TaxSlab.assessment_year) \
+                .filter(TaxSlab.assessment_year.isnot(None), TaxSlab.assessment_year <= year) \
+                .order_by(TaxSlab.assessment_year.desc()) \
+                .limit(1).scalar()
+
+        if effective_year is None:
+            query = TaxSlab.query.filter(TaxSlab.assessment_year.is_(None))
+        else:
+            query = TaxSlab.query.filter(TaxSlab.assessment_year == effective_year)
+        return query.order_by(TaxSlab.min_income).all(), effective_year
+
+    @staticmethod
+    def get_schedule(year=None, refresh=False):
+        """
+        Get the compiled slab schedule, rebuilding it if the version moved
+
+        Each assessment year is compiled once and cached until the next slab
+        edit, so historical lookups never touch the live schedule.
+
+        Args:
+            year: Assessment year such as '2025-26' (None = live schedule)
+            refresh: Re-read the shared version first, so an edit made in
+                another process within the check interval is seen
+
+        Returns:
+            SlabSchedule: Current compiled schedule
+        """
+        version = TaxCalculator.schedule_version(force=refresh)
+        schedule = _schedules.get(year)
+        if schedule is not None and schedule.version == version:
+            return schedule
+
+        with _schedule_lock:
+            schedule = _schedules.get(year)
+            if schedule is None or schedule.version != version:
+                slabs, effective_year = TaxCalculator._load_slabs(year)
+                schedule = SlabSchedule(slabs, version, effective_year)
+                _schedules[year] = schedule
+            return schedule
+
+    @staticmethod
+    def calculate_tax(annual_income, include_breakdown=True, year=None, refresh=False):
         """
         Calculate tax based on annual income using progressive tax slabs
-        
+
         Args:
             annual_income: Annual income amount (Decimal or float)
-            
+            include_breakdown: Build the per-slab breakdown list. Callers that
+                only need the totals should pass False.
+            year: Assessment year to price against (None = live schedule)
+            refresh: Re-read the shared schedule version first instead of
+                trusting a check up to SLAB_VERSION_CHECK_INTERVAL old; use
+                when the amount is stored
+
         Returns:
             dict: {
                 'total_income': float,
@@ -30,70 +377,128 @@ class TaxCalculator:
                     }
                 ]
             }
+            'breakdown' is omitted when include_breakdown is False.
         """
         income = Decimal(str(annual_income))
-        
-        # Fetch all tax slabs ordered by min_income
-        slabs = TaxSlab.query.order_by(TaxSlab.min_income).all()
-        
-        if not slabs:
-            # No slabs defined, return zero tax
-            return {
-                'total_income': float(income),
-                'tax_amount': 0.0,
-                'effective_rate': 0.0,
-                'breakdown': []
-            }
-        
-        total_tax = Decimal('0')
-        breakdown = []
-        remaining_income = income
-        
-        for slab in slabs:
-            # Skip if income is below this slab
-            if income <= slab.min_income:
-                continue
-            
-            # Calculate taxable amount in this slab
-            if slab.max_income is None:
-                # Highest slab (no upper limit)
-                taxable_in_slab = max(Decimal('0'), income - slab.min_income)
-            else:
-                # Calculate how much income falls in this slab
-                upper_limit = min(income, slab.max_income)
-                taxable_in_slab = max(Decimal('0'), upper_limit - slab.min_income)
-            
-            if taxable_in_slab > 0:
-                # Calculate tax for this slab
-                tax_in_slab = taxable_in_slab * (slab.tax_rate / Decimal('100'))
-                total_tax += tax_in_slab
-                
-                # Add to breakdown
-                slab_range = f"{float(slab.min_income):,.2f}"
-                if slab.max_income:
-                    slab_range += f" - {float(slab.max_income):,.2f}"
-                else:
-                    slab_range += "+"
-                
-                breakdown.append({
-                    'slab': slab_range,
-                    'taxable_amount': float(taxable_in_slab),
-                    'rate': float(slab.tax_rate),
-                    'tax': float(tax_in_slab)
-                })
-        
+
+        # Use the in-memory compiled schedule instead of querying slabs
+        schedule = TaxCalculator.get_schedule(year, refresh)
+
+        # Results are cached per shared schedule version, so an edit made
+        # through any worker stops them being served
+        cache_key = (schedule.version, year, income.normalize(), include_breakdown)
+        cached = _result_cache.get(cache_key)
+        if cached is not None:
+            return TaxCalculator._copy_result(cached)
+
+        total_tax = schedule.tax_for(income)
+
         # Calculate effective tax rate
         effective_rate = (total_tax / income * Decimal('100')) if income > 0 else Decimal('0')
-        
-        return {
+
+        result = {
             'total_income': float(income),
             'tax_amount': float(total_tax),
             'effective_rate': float(effective_rate),
-            'breakdown': breakdown
         }
-    
+        if include_breakdown:
+            result['breakdown'] = schedule.breakdown_for(income)
+
+        _result_cache.set(cache_key, result)
+        return TaxCalculator._copy_result(result)
+
+    @staticmethod
+    def _copy_result(result):
+        """Copy a cached result so callers cannot mutate the cache entry"""
+        copy = dict(result)
+        if 'breakdown' in copy:
+            copy['breakdown'] = [dict(row) for row in copy['breakdown']]
+        return copy
+
+    @staticmethod
+    def round_amount(amount):
+        """
+        Round a tax amount to paisa, half up
+
+        This is the rounding of stored submission amounts, so batch results
+        compare equal to what /submit saved for the same income.
+
+        Args:
+            amount: Tax amount (Decimal, float or str)
+
+        Returns:
+            Decimal: Amount quantized to 0.01
+        """
+        return Decimal(str(amount)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    @staticmethod
+    def calculate_tax_batch(incomes, year=None, schedule=None):
+        """
+        Calculate tax for many incomes in one vectorized pass
+
+        Uses numpy.searchsorted over the compiled slab bounds and the
+        cumulative-tax array. Results equal round_amount() of calculate_tax's
+        tax_amount (2 decimals, half up), because all arithmetic is done
+        exactly in integer micro-taka. Falls back to the Decimal path when
+        NumPy is missing, an income has more than 2 decimals, or the values
+        would overflow 64-bit integers.
+
+        Args:
+            incomes: Sequence of non-negative Decimal incomes
+            year: Assessment year to price against (None = live schedule)
+            schedule: SlabSchedule to price against instead of looking one
+                up, so a caller working in chunks uses the same schedule
+                throughout
+
+        Returns:
+            list: Decimal tax amounts quantized to 0.01, in input order
+        """
+        if schedule is None:
+            schedule = TaxCalculator.get_schedule(year)
+
+        table = schedule.integer_table
+        cents = None
+        if np is not None and table is not None and incomes:
+            scaled = [income * 100 for income in incomes]
+            if all(value == value.to_integral_value() for value in scaled):
+                cents = [int(value) for value in scaled]
+
+        if cents is not None:
+            lower, upper, rates, cumulative = table
+            limit = np.iinfo(np.int64).max
+            largest_tax = max(cumulative, default=0) + max(cents) * max(rates, default=0)
+            if max(cents) > limit or largest_tax > limit:
+                cents = None
+
+        if cents is None:
+            return [TaxCalculator.round_amount(schedule.tax_for(income)) for income in incomes]
+
+        if not lower:
+            return [Decimal('0.00')] * len(incomes)
+
+        income_arr = np.asarray(cents, dtype=np.int64)
+        lower_arr = np.asarray(lower, dtype=np.int64)
+        # Open-ended top slab: cap at the income itself
+        upper_arr = np.asarray([high if high is not None else limit for high in upper], dtype=np.int64)
+        rate_arr = np.asarray(rates, dtype=np.int64)
+        cumulative_arr = np.asarray(cumulative, dtype=np.int64)
+
+        # Index of the highest slab whose lower bound is strictly below income
+        top = np.searchsorted(lower_arr, income_arr, side='left') - 1
+        in_schedule = top >= 0
+        top = np.maximum(top, 0)
+
+        taxable = np.maximum(np.minimum(income_arr, upper_arr[top]) - lower_arr[top], 0)
+        tax_micro = np.where(in_schedule, cumulative_arr[top] + taxable * rate_arr[top], 0)
+
+        # Round micro-taka to paisa, half up (tax is never negative)
+        quotient, remainder = np.divmod(tax_micro, 10000)
+        quotient += remainder >= 5000
+
+        return [Decimal(int(value)).scaleb(-2) for value in quotient]
+
     @staticmethod
-    def get_all_slabs():
-        """Get all tax slabs ordered by min_income"""
-        slabs = TaxSlab.query.order_by(TaxSlab.min_income).all()
+    def get_all_slabs(year=None):
+        """Get the tax slabs in effect for an assessment year, ordered by min_income"""
+        slabs, _ = TaxCalculator._load_slabs(year)
         return [slab.to_dict() for slab in slabs]
@@ -0,0 +1,229 @@
+"""
+Full individual income tax assessment engine
+Computes salary exemptions, category thresholds, slab tax, investment rebate,
+wealth surcharge, minimum tax and AIT in one call. This is the server-side
+version of the calculator on the Account page.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_FLOOR
+
+# Rule tables per assessment year
+ASSESSMENT_RULES = {
+    '2025-26': {
+        # Tax-free threshold by taxpayer category
+        'exemption_limits': {
+            'general': Decimal('350000'),
+            'woman_senior': Decimal('400000'),
+            'disabled': Decimal('475000'),
+            'freedom_fighter': Decimal('500000'),
+        },
+        'disabled_child_bonus': Decimal('50000'),
+        # Slab widths above the tax-free threshold (None = no limit)
+        'slabs': [
+            (Decimal('100000'), Decimal('5')),
+            (Decimal('400000'), Decimal('10')),
+            (Decimal('500000'), Decimal('15')),
+            (Decimal('500000'), Decimal('20')),
+            (Decimal('1200000'), Decimal('25')),
+            (None, Decimal('30')),
+        ],
+        # Salary exemptions: (share of basic, absolute cap)
+        'house_rent_exemption': (Decimal('0.3333'), Decimal('300000')),
+        'medical_exemption': (Decimal('0.1'), Decimal('120000')),
+        'conveyance_exemption_cap': Decimal('30000'),
+        # Investment caps and rebate rate
+        'dps_cap': Decimal('120000'),
+        'sanchayapatra_cap': Decimal('500000'),
+        'rebate_rate': Decimal('0.15'),
+        # Net wealth surcharge: (lower bound exclusive, rate)
+        'surcharge_bands': [
+            (Decimal('500000000'), Decimal('0.35')),
+            (Decimal('200000000'), Decimal('0.3')),
+            (Decimal('100000000'), Decimal('0.2')),
+            (Decimal('40000000'), Decimal('0.1')),
+        ],
+        'minimum_tax': {
+            'dhaka_ctg_nganj': Decimal('5000'),
+            'other_city': Decimal('4000'),
+            'other_areas': Decimal('3000'),
+        },
+    },
+}
+
+DEFAULT_ASSESSMENT_YEAR = '2025-26'
+
+SALARY_FIELDS = ('basic', 'house_rent', 'medical', 'conveyance', 'bonuses', 'overtime', 'other')
+INVESTMENT_FIELDS = ('life_insurance', 'dps', 'sanchayapatra', 'provident_fund', 'stocks', 'zakat')
+
+
+def _amount(source, field):
+    """Read a non-negative Decimal amount from a dict; blanks count as zero"""
+    value = (source or {}).get(field)
+    if value in (None, ''):
+        return Decimal('0')
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'Invalid value for {field}')
+    if not amount.is_finite() or amount < 0:
+        raise ValueError(f'Invalid value for {field}')
+    return amount
+
+
+def _round(value):
+    """Round to whole taka, halves up (matches the browser calculator)"""
+    return (value + Decimal('0.5')).to_integral_value(rounding=ROUND_FLOOR)
+
+
+class TaxEngine:
+    """Rule engine for a complete individual tax assessment"""
+
+    @staticmethod
+    def slab_bounds(assessment_year=DEFAULT_ASSESSMENT_YEAR, category='general'):
+        """
+        Absolute slab bounds for a category, as stored in the tax_slabs table
+
+        Returns:
+            list: (min_income, max_income or None, tax_rate) tuples
+        """
+        rules = ASSESSMENT_RULES[assessment_year]
+        lower = rules['exemption_limits'][category]
+        bounds = [(Decimal('0'), lower, Decimal('0'))]
+        for width, rate in rules['slabs']:
+            upper = lower + width if width is not None else None
+            bounds.append((lower, upper, rate))
+            lower = upper
+        return bounds
+
+    @staticmethod
+    def assess(data, assessment_year=None):
+        """
+        Compute the full tax liability for one taxpayer
+
+        Args:
+            data: dict with
+                category: general | woman_senior | disabled | freedom_fighter
+                location: dhaka_ctg_nganj | other_city | other_areas
+                parent_of_disabled_child: bool
+                salary: {basic, house_rent, medical, conveyance, bonuses, overtime, other}
+                investments: {life_insurance, dps, sanchayapatra, provident_fund, stocks, zakat}
+                net_wealth, ait: amounts
+                assessment_year: used when the argument is not given
+            assessment_year: Key into ASSESSMENT_RULES (default: data's, or
+                DEFAULT_ASSESSMENT_YEAR)
+
+        Returns:
+            dict: Assessment with income, exemptions, slab breakdown, rebate,
+                surcharge, minimum tax and final tax_amount (negative when
+                AIT exceeds the liability)
+
+        Raises:
+            ValueError: If an input is invalid or the year is unknown
+        """
+        if not isinstance(data, dict):
+            raise ValueError('Assessment data must be an object')
+        for field in ('salary', 'investments'):
+            if data.get(field) is not None and not isinstance(data[field], dict):
+                raise ValueError(f'{field} must be an object')
+
+        if assessment_year is None:
+            assessment_year = data.get('assessment_year', DEFAULT_ASSESSMENT_YEAR)
+        rules = ASSESSMENT_RULES.get(assessment_year) if isinstance(assessment_year, str) else None
+        if rules is None:
+            raise ValueError(f'Unsupported assessment year: {assessment_year}')
+
+        category = data.get('category', 'general')
+        if not isinstance(category, str) or category not in rules['exemption_limits']:
+            raise ValueError(f'Invalid category: {category}')
+        location = data.get('location', 'dhaka_ctg_nganj')
+        if not isinstance(location, str) or location not in rules['minimum_tax']:
+            raise ValueError(f'Invalid location: {location}')
+
+        salary = {field: _amount(data.get('salary'), field) for field in SALARY_FIELDS}
+        investments = {field: _amount(data.get('investments'), field) for field in INVESTMENT_FIELDS}
+        net_wealth = _amount(data, 'net_wealth')
+        ait = _amount(data, 'ait')
+
+        # --- 1. Income and salary exemptions ---
+        basic = salary['basic']
+        house_rent_share, house_rent_cap = rules['house_rent_exemption']
+        medical_share, medical_cap = rules['medical_exemption']
+        exemptions = {
+            'house_rent': min(salary['house_rent'], basic * house_rent_share, house_rent_cap),
+            'medical': min(salary['medical'], basic * medical_share, medical_cap),
+            'conveyance': min(salary['conveyance'], rules['conveyance_exemption_cap']),
+        }
+
+        total_income = sum(salary.values(), Decimal('0'))
+        taxable_income = (
+            basic
+            + max(Decimal('0'), salary['house_rent'] - exemptions['house_rent'])
+            + max(Decimal('0'), salary['medical'] - exemptions['medical'])
+            + max(Decimal('0'), salary['conveyance'] - exemptions['conveyance'])
+            + salary['bonuses'] + salary['overtime'] + salary['other']
+        )
+
+        # --- 2. Slab tax above the category threshold ---
+        exemption_limit = rules['exemption_limits'][category]
+        if data.get('parent_of_disabled_child'):
+            exemption_limit += rules['disabled_child_bonus']
+
+        remaining = taxable_income
+        tax_liability = Decimal('0')
+        breakdown = []
+        for limit, rate in [(exemption_limit, Decimal('0'))] + rules['slabs']:
+            if remaining <= 0:
+                break
+            portion = remaining if limit is None else min(remaining, limit)
+            tax = portion * rate / Decimal('100')
+            breakdown.append({
+                'limit': float(limit) if limit is not None else None,
+                'rate': float(rate),
+                'portion': float(portion),
+                'tax': float(tax)
+            })
+            tax_liability += tax
+            remaining -= portion
+
+        # --- 3. Investment rebate ---
+        eligible = dict(investments)
+        eligible['dps'] = min(eligible['dps'], rules['dps_cap'])
+        eligible['sanchayapatra'] = min(eligible['sanchayapatra'], rules['sanchayapatra_cap'])
+        total_investment = sum(eligible.values(), Decimal('0'))
+        rebate = total_investment * rules['rebate_rate']
+
+        # --- 4. Net wealth surcharge ---
+        surcharge_rate = Decimal('0')
+        for lower, rate in rules['surcharge_bands']:
+            if net_wealth > lower:
+                surcharge_rate = rate
+                break
+        surcharge = tax_liability * surcharge_rate
+
+        # --- 5. Minimum tax and final liability ---
+        net_tax = max(Decimal('0'), tax_liability - rebate)
+        minimum_tax = rules['minimum_tax'][location]
+        minimum_tax_applied = taxable_income > exemption_limit and net_tax < minimum_tax
+        if minimum_tax_applied:
+            net_tax = minimum_tax
+
+        final_tax = net_tax + surcharge - ait
+        effective_rate = (final_tax / taxable_income * Decimal('100')) if taxable_income else Decimal('0')
+
+        return {
+            'assessment_year': assessment_year,
+            'total_income': float(total_income),
+            'taxable_income': float(taxable_income),
+            'exemption_limit': float(exemption_limit),
+            'exemptions': {name: float(value) for name, value in exemptions.items()},
+            'tax_before_rebate': float(_round(tax_liability)),
+            'total_investment': float(total_investment),
+            'investment_rebate': float(_round(rebate)),
+            'surcharge_rate': float(surcharge_rate),
+            'surcharge': float(_round(surcharge)),
+            'minimum_tax': float(minimum_tax),
+            'minimum_tax_applied': minimum_tax_applied,
+            'ait': float(ait),
+            'tax_amount': float(_round(final_tax)),
+            'effective_rate': float(effective_rate),
+            'breakdown': breakdown
+        }
@@ -0,0 +1,42 @@
+"""
+Shared pytest fixtures
+
+Run from the backend directory:
+    python -m pytest
+Each test that uses the app gets a fresh SQLite database with every
+migration applied; external services are replaced by local stand-ins.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import config as app_config  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Application on a temporary SQLite database"""
+    from app import create_app
+    from database import init_db
+
+    class Config(app_config.TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        EXPORT_DIR = str(tmp_path / 'exports')
+
+    monkeypatch.setitem(app_config.config, 'testing', Config)
+    app = create_app('testing')
+    init_db(app)
+    yield app
+
+    from database import db
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
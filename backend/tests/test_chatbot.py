@@ -0,0 +1,133 @@
+"""
+Chatbot service against a stub upstream: response cache, circuit breaker, timeouts
+"""
+import time
+
+import pytest
+
+from services import chatbot
+from services.chatbot import ChatbotService
+from upstream_stub import StubUpstream
+
+
+@pytest.fixture
+def upstream():
+    stub = StubUpstream()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def service(upstream, monkeypatch):
+    monkeypatch.setenv('CHATBOT_API_URL', upstream.url)
+    monkeypatch.setenv('CHATBOT_API_KEY', 'test-key')
+    monkeypatch.setenv('CHATBOT_READ_TIMEOUT', '0.3')
+    monkeypatch.setenv('CHATBOT_BREAKER_THRESHOLD', '3')
+    monkeypatch.setenv('CHATBOT_BREAKER_RESET', '0.2')
+    chatbot._response_cache.clear()
+    service = ChatbotService()
+    yield service
+    service.session.close()
+    chatbot._response_cache.clear()
+
+
+def trip(service, upstream):
+    upstream.mode = 'fail'
+    for i in range(3):
+        service.get_response(f'failing question {i}')
+    assert service.breaker.state == 'open'
+
+
+def test_repeated_question_is_answered_from_cache(service, upstream):
+    first = service.get_response('What is the tax-free limit?')
+    second = service.get_response('  what is the TAX-FREE limit ')
+
+    assert first == second == 'ANS:What is the tax-free limit?'
+    assert upstream.calls == 1
+    assert service.cache_stats()['hits'] == 1
+
+
+def test_question_with_user_history_skips_cache(service, upstream):
+    history = [{'text': 'greeting', 'isBot': True}, {'text': 'my income is 5L', 'isBot': False}]
+    service.get_response('how much tax?', history)
+    service.get_response('how much tax?', history)
+
+    assert upstream.calls == 2
+
+
+def test_breaker_opens_after_consecutive_failures(service, upstream):
+    trip(service, upstream)
+    calls = upstream.calls
+
+    answer = service.get_response('asked while open')
+
+    assert upstream.calls == calls
+    assert not answer.startswith('ANS:')
+    assert service.circuit_stats()['rejected'] == 1
+
+
+def test_half_open_probe_failure_reopens(service, upstream):
+    trip(service, upstream)
+    time.sleep(0.25)
+    assert service.breaker.state == 'half_open'
+
+    service.get_response('probe')
+
+    assert upstream.calls == 4
+    assert service.breaker.state == 'open'
+
+
+def test_successful_probe_closes_breaker(service, upstream):
+    trip(service, upstream)
+    time.sleep(0.25)
+    upstream.mode = 'ok'
+
+    assert service.get_response('probe') == 'ANS:probe'
+    assert service.circuit_stats()['state'] == 'closed'
+    assert service.circuit_stats()['consecutive_failures'] == 0
+
+
+def test_slow_upstream_times_out_to_fallback(service, upstream):
+    upstream.delay = 1
+    began = time.monotonic()
+
+    answer = service.get_response('slow question')
+
+    assert time.monotonic() - began < 0.9
+    assert not answer.startswith('ANS:')
+    assert service.circuit_stats()['consecutive_failures'] == 1
+
+
+def test_unusable_answer_counts_as_failure_and_is_not_cached(service, upstream):
+    upstream.mode = 'empty'
+    service.get_response('question')
+    service.get_response('question')
+
+    assert upstream.calls == 2
+    assert service.circuit_stats()['consecutive_failures'] == 2
+
+
+@pytest.mark.parametrize('history', ['text', ['text', {'text': 'hi'}], [{'text': 5}], {'text': 'hi'}])
+def test_malformed_history_is_rejected_without_touching_breaker(service, upstream, history):
+    with pytest.raises(ValueError):
+        service.get_response('question', history)
+
+    assert upstream.calls == 0
+    assert service.circuit_stats()['consecutive_failures'] == 0
+
+
+def test_chat_route_answers_400_for_malformed_history(client):
+    for _ in range(5):
+        response = client.post('/api/chatbot', json={'message': 'hi', 'history': ['oops', {'text': 'x'}]})
+        assert response.status_code == 400
+    assert client.post('/api/chatbot', json={'message': ['hi']}).status_code == 400
+    assert chatbot.chatbot_service.circuit_stats()['consecutive_failures'] == 0
+
+
+def test_async_reply_requires_login(client):
+    response = client.post('/api/chatbot', json={'message': 'hi', 'async': True})
+
+    assert response.status_code == 401
+    with client.application.app_context():
+        from models.job import Job
+        assert Job.query.count() == 0
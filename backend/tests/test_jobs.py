@@ -0,0 +1,167 @@
+"""
+Job queue claims, leases, retries and retention
+"""
+from datetime import datetime, timedelta
+import os
+import threading
+import time
+
+import pytest
+
+from models import db
+from models.job import Job
+import services.jobs as jobs
+from services.jobs import JobQueue, LeaseLost
+
+
+@pytest.fixture
+def ctx(app):
+    app.config.update(JOB_RETRY_BACKOFF=5.0, JOB_RETRY_BACKOFF_MAX=300.0)
+    with app.app_context():
+        yield app
+
+
+def _reload(job_id):
+    db.session.expire_all()
+    return db.session.get(Job, job_id)
+
+
+def test_only_one_of_two_racing_workers_claims_a_job(ctx):
+    job_id = JobQueue.enqueue('noop').id
+    barrier = threading.Barrier(2)
+    claims = {}
+
+    def claim(owner):
+        with ctx.app_context():
+            barrier.wait()
+            claims[owner] = JobQueue._claim(job_id, owner)
+            db.session.remove()
+
+    workers = [threading.Thread(target=claim, args=(owner,)) for owner in ('a', 'b')]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(claims.values()) == [False, True]
+    job = _reload(job_id)
+    assert job.status == 'running'
+    assert job.attempts == 1
+    assert claims[job.claimed_by] is True
+
+
+def test_running_job_is_not_claimed_while_its_lease_holds(ctx):
+    job_id = JobQueue.enqueue('noop').id
+
+    assert JobQueue._claim(job_id, 'a')
+    assert not JobQueue._claim(job_id, 'b')
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_cannot_finish(ctx):
+    job_id = JobQueue.enqueue('noop').id
+    assert JobQueue._claim(job_id, 'a')
+    Job.query.filter_by(id=job_id).update({'lease_expires_at': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+
+    assert JobQueue._claim(job_id, 'b')
+    assert not JobQueue._finish(job_id, 'a', 'succeeded', result={'by': 'a'})
+    assert JobQueue._finish(job_id, 'b', 'succeeded', result={'by': 'b'})
+
+    job = _reload(job_id)
+    assert job.status == 'succeeded'
+    assert job.attempts == 2
+    assert job.to_dict()['result'] == {'by': 'b'}
+
+
+def test_failed_attempts_back_off_then_fail(ctx, monkeypatch):
+    def fail(payload, job):
+        raise RuntimeError(f'attempt {job.attempts}')
+
+    monkeypatch.setitem(jobs._handlers, 'flaky', fail)
+    job_id = JobQueue.enqueue('flaky', max_attempts=3).id
+
+    for attempt, delay in ((1, 5), (2, 10)):
+        before = datetime.utcnow()
+        assert JobQueue.run(job_id)
+        job = _reload(job_id)
+        assert job.status == 'queued'
+        assert job.error == f'attempt {attempt}'
+        assert job.claimed_by is None
+        assert before + timedelta(seconds=delay) <= job.run_after <= datetime.utcnow() + timedelta(seconds=delay)
+        # Not due yet
+        assert not JobQueue.run(job_id)
+        job.run_after = datetime.utcnow()
+        db.session.commit()
+
+    assert JobQueue.run(job_id)
+    job = _reload(job_id)
+    assert job.status == 'failed'
+    assert job.attempts == 3
+    assert job.error == 'attempt 3'
+    assert not JobQueue.run(job_id)
+
+
+def test_backoff_is_capped(ctx, monkeypatch):
+    ctx.config['JOB_RETRY_BACKOFF_MAX'] = 7.0
+    monkeypatch.setitem(jobs._handlers, 'flaky', lambda payload, job: 1 / 0)
+    job = JobQueue.enqueue('flaky', max_attempts=5)
+    Job.query.filter_by(id=job.id).update({'attempts': 3})
+    db.session.commit()
+
+    before = datetime.utcnow()
+    JobQueue.run(job.id)
+
+    job = _reload(job.id)
+    assert job.status == 'queued'
+    assert before + timedelta(seconds=7) <= job.run_after <= datetime.utcnow() + timedelta(seconds=7)
+
+
+def test_handler_stops_once_its_lease_is_lost(ctx, monkeypatch):
+    ctx.config['JOB_LEASE'] = 1
+    seen = {}
+
+    def long_running(payload, job):
+        # Another worker takes the job over; the heartbeat notices on its next beat
+        Job.query.filter_by(id=job.id).update({'claimed_by': 'other'})
+        db.session.commit()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                JobQueue.check_lease(job)
+            except LeaseLost:
+                seen['lost'] = True
+                raise
+            time.sleep(0.05)
+        return 'finished anyway'
+
+    monkeypatch.setitem(jobs._handlers, 'long', long_running)
+    job_id = JobQueue.enqueue('long').id
+
+    assert JobQueue.run(job_id)
+
+    assert seen == {'lost': True}
+    job = _reload(job_id)
+    assert job.status == 'running'
+    assert job.claimed_by == 'other'
+    assert job.error is None
+
+
+def test_purge_deletes_only_old_finished_jobs_and_their_files(ctx):
+    export_dir = ctx.config['EXPORT_DIR']
+    os.makedirs(export_dir)
+    old = datetime.utcnow() - timedelta(days=30)
+    db.session.add_all([
+        Job(id='old-export', type='receipt_export', status='succeeded', finished_at=old,
+            result='{"count": 1, "file": "old-export.zip"}'),
+        Job(id='old-failed', type='chatbot_reply', status='failed', finished_at=old),
+        Job(id='recent', type='chatbot_reply', status='succeeded', finished_at=datetime.utcnow()),
+        Job(id='running', type='reassess', status='running', started_at=old),
+    ])
+    db.session.commit()
+    with open(os.path.join(export_dir, 'old-export.zip'), 'wb') as f:
+        f.write(b'zip')
+
+    assert JobQueue.purge_finished(7 * 24 * 3600) == 2
+
+    assert sorted(job.id for job in Job.query.all()) == ['recent', 'running']
+    assert not os.path.exists(os.path.join(export_dir, 'old-export.zip'))
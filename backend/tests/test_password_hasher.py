@@ -0,0 +1,26 @@
+"""
+Password hashing settings and rehash policy
+"""
+from services.password_hasher import PasswordHasher
+
+
+def test_hashes_use_configured_rounds(app):
+    with app.app_context():
+        hashed = PasswordHasher.hash_password('secret')
+
+        assert hashed.split('$')[2] == '04'
+        assert PasswordHasher.verify_password('secret', hashed)
+        assert not PasswordHasher.verify_password('other', hashed)
+
+
+def test_only_weaker_hashes_need_rehash(app):
+    with app.app_context():
+        app.config['BCRYPT_ROUNDS'] = 5
+        weaker = '$2b$04$' + 'a' * 53
+        same = '$2b$05$' + 'a' * 53
+        stronger = '$2b$12$' + 'a' * 53
+
+        assert PasswordHasher.needs_rehash(weaker)
+        assert not PasswordHasher.needs_rehash(same)
+        assert not PasswordHasher.needs_rehash(stronger)
+        assert PasswordHasher.needs_rehash('not-a-bcrypt-hash')
@@ -0,0 +1,103 @@
+"""
+Re-assessment of pending submissions against the live slab schedule
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+
+from models import db
+from models.job import Job
+from models.tax_slab import TaxSlab, TaxSlabVersion
+from models.tax_submission import TaxSubmission
+from models.user import User
+import services.tax_calculator as tax_calculator
+from services.reassessment import ReassessmentService
+from services.tax_calculator import TaxCalculator
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        user = User(email='payer@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.add_all([
+            TaxSlab(min_income=Decimal('0'), max_income=Decimal('100000'), tax_rate=Decimal('0')),
+            TaxSlab(min_income=Decimal('100000'), max_income=None, tax_rate=Decimal('5')),
+        ])
+        db.session.commit()
+        TaxCalculator.bump_schedule_version()
+        yield user
+
+
+def _submit(user, income):
+    """Store a pending submission the way /submit prices it"""
+    tax = TaxCalculator.calculate_tax(income, include_breakdown=False)['tax_amount']
+    submission = TaxSubmission(
+        user_id=user.id,
+        total_income=Decimal(income),
+        taxable_income=Decimal(income),
+        tax_amount=TaxCalculator.round_amount(tax),
+        status='pending'
+    )
+    submission.set_income_details({})
+    db.session.add(submission)
+    db.session.commit()
+    return submission
+
+
+def _job():
+    job = Job(id='reassess-test', type='reassess', status='running', payload='{}')
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def test_half_paisa_amounts_match_submit_rounding(ctx):
+    # 5% of 0.10 is 0.005: half up gives 0.01, half even would give 0.00
+    submission = _submit(ctx, '100000.10')
+    assert submission.tax_amount == Decimal('0.01')
+
+    progress = ReassessmentService.reassess_pending(_job())
+
+    assert progress == {'total': 1, 'processed': 1, 'updated': 0}
+    assert db.session.get(TaxSubmission, submission.id).tax_amount == Decimal('0.01')
+
+
+def test_reads_slab_edits_made_by_another_process(ctx, monkeypatch):
+    monkeypatch.setattr(tax_calculator, 'SLAB_VERSION_CHECK_INTERVAL', 3600)
+    submission = _submit(ctx, '200000')
+    assert submission.tax_amount == Decimal('5000.00')
+
+    # Another worker edits the slabs; this process's version check is still fresh
+    TaxSlab.query.filter(TaxSlab.max_income.is_(None)).update({'tax_rate': Decimal('10')})
+    db.session.execute(update(TaxSlabVersion).where(TaxSlabVersion.id == 1)
+                       .values(version=TaxSlabVersion.version + 1))
+    db.session.commit()
+
+    progress = ReassessmentService.reassess_pending(_job())
+
+    assert progress['updated'] == 1
+    db.session.expire_all()
+    assert db.session.get(TaxSubmission, submission.id).tax_amount == Decimal('10000.00')
+
+
+def test_one_schedule_prices_every_chunk(ctx, monkeypatch):
+    for _ in range(3):
+        _submit(ctx, '200000')
+    schedules = []
+    calculate = TaxCalculator.calculate_tax_batch
+
+    def record(incomes, year=None, schedule=None):
+        schedules.append(schedule)
+        # A slab edit lands between chunks; the run must not pick it up
+        TaxCalculator.bump_schedule_version()
+        return calculate(incomes, year, schedule)
+
+    monkeypatch.setattr(TaxCalculator, 'calculate_tax_batch', staticmethod(record))
+
+    ReassessmentService.reassess_pending(_job(), chunk_size=1)
+
+    assert len(schedules) == 3
+    assert schedules[0] is not None
+    assert all(schedule is schedules[0] for schedule in schedules)
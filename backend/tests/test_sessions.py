@@ -0,0 +1,210 @@
+"""
+Server-side session stores, the store-backed session interface and the
+filesystem session sweeper
+"""
+import os
+import struct
+import time
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, session
+
+import utils.cache as cache_module
+from utils.sessions import (
+    MemorySessionStore, RedisSessionStore, StoreSessionInterface, sweep_session_files
+)
+
+
+class FakeRedis:
+    """Records calls the way a Redis client would see them"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode('utf-8')
+        self.expiry[key] = ex
+
+    def delete(self, key):
+        self.data.pop(key, None)
+        self.expiry.pop(key, None)
+
+
+class RecordingStore(MemorySessionStore):
+    """Memory store that counts writes and deletes"""
+
+    def __init__(self, ttl):
+        super().__init__(ttl)
+        self.saves = []
+        self.deletes = []
+
+    def save(self, sid, data):
+        self.saves.append(sid)
+        super().save(sid, data)
+
+    def delete(self, sid):
+        self.deletes.append(sid)
+        super().delete(sid)
+
+
+def test_memory_store_expires_entries_after_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module, 'time', SimpleNamespace(monotonic=lambda: clock[0]))
+    store = MemorySessionStore(ttl=60)
+
+    store.save('sid', 'data')
+    clock[0] += 59
+    assert store.load('sid') == 'data'
+
+    # A write restarts the lifetime
+    store.save('sid', 'newer')
+    clock[0] += 59
+    assert store.load('sid') == 'newer'
+    clock[0] += 2
+    assert store.load('sid') is None
+
+
+def test_memory_store_delete():
+    store = MemorySessionStore(ttl=60)
+    store.save('sid', 'data')
+
+    store.delete('sid')
+
+    assert store.load('sid') is None
+
+
+def test_redis_store_prefixes_keys_and_sets_ttl():
+    client = FakeRedis()
+    store = RedisSessionStore(client, ttl=3600, prefix='s:')
+
+    store.save('abc', '{"user_id": 1}')
+
+    assert client.expiry == {'s:abc': 3600}
+    assert store.load('abc') == '{"user_id": 1}'
+    assert store.load('missing') is None
+    store.delete('abc')
+    assert client.data == {}
+
+
+@pytest.fixture
+def store():
+    return RecordingStore(ttl=3600)
+
+
+@pytest.fixture
+def session_client(store):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.session_interface = StoreSessionInterface(store)
+
+    @app.route('/login')
+    def login():
+        session['user_id'] = 1
+        return 'ok'
+
+    @app.route('/whoami')
+    def whoami():
+        return str(session.get('user_id'))
+
+    @app.route('/logout')
+    def logout():
+        session.clear()
+        return 'ok'
+
+    return app.test_client()
+
+
+def _session_cookie(response):
+    return [header for header in response.headers.getlist('Set-Cookie') if header.startswith('session=')]
+
+
+def test_anonymous_request_writes_nothing(session_client, store):
+    response = session_client.get('/whoami')
+
+    assert response.get_data(as_text=True) == 'None'
+    assert store.saves == []
+    assert _session_cookie(response) == []
+
+
+def test_unmodified_session_is_read_but_not_written(session_client, store):
+    session_client.get('/login')
+    assert len(store.saves) == 1
+
+    for _ in range(3):
+        response = session_client.get('/whoami')
+        assert response.get_data(as_text=True) == '1'
+        assert _session_cookie(response) == []
+
+    assert len(store.saves) == 1
+
+
+def test_session_ids_are_random_and_not_taken_from_unknown_cookies(store):
+    sids = set()
+    for _ in range(2):
+        app = Flask(__name__)
+        app.secret_key = 'test'
+        app.session_interface = StoreSessionInterface(store)
+
+        @app.route('/login')
+        def login():
+            session['user_id'] = 1
+            return 'ok'
+
+        client = app.test_client()
+        client.set_cookie('session', 'chosen-by-attacker')
+        client.get('/login')
+        sids.add(client.get_cookie('session').value)
+
+    assert len(sids) == 2
+    assert 'chosen-by-attacker' not in sids
+    assert all(len(sid) >= 32 for sid in sids)
+    assert set(store.saves) == sids
+
+
+def test_clearing_a_session_deletes_it(session_client, store):
+    session_client.get('/login')
+    sid = session_client.get_cookie('session').value
+
+    response = session_client.get('/logout')
+
+    assert store.deletes == [sid]
+    assert store.load(sid) is None
+    assert _session_cookie(response)
+    assert session_client.get_cookie('session') is None
+
+
+def _session_file(directory, name, expires, age=0):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(struct.pack('I', expires) + b'payload')
+    if age:
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_sweep_removes_expired_session_files(tmp_path):
+    now = int(time.time())
+    directory = str(tmp_path)
+    stale = _session_file(directory, 'stale', 0, age=7200)
+    header_expired = _session_file(directory, 'header-expired', now - 10)
+    no_expiry = _session_file(directory, 'no-expiry', 0)
+    live = _session_file(directory, 'live', now + 3600)
+    os.mkdir(os.path.join(directory, 'subdir'))
+
+    assert sweep_session_files(directory, max_age=3600) == 2
+
+    assert not os.path.exists(stale)
+    assert not os.path.exists(header_expired)
+    assert os.path.exists(no_expiry)
+    assert os.path.exists(live)
+    assert os.path.isdir(os.path.join(directory, 'subdir'))
+
+
+def test_sweep_of_missing_directory_removes_nothing(tmp_path):
+    assert sweep_session_files(str(tmp_path / 'missing'), max_age=3600) == 0
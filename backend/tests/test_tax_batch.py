@@ -0,0 +1,53 @@
+"""
+Batch tax calculation endpoint
+"""
+from decimal import Decimal
+import json
+
+import pytest
+
+from models import db
+from models.tax_slab import TaxSlab
+from services.tax_calculator import TaxCalculator
+
+
+@pytest.fixture
+def user_client(app, client):
+    with app.app_context():
+        db.session.add_all([
+            TaxSlab(min_income=Decimal('0'), max_income=Decimal('100000'), tax_rate=Decimal('0')),
+            TaxSlab(min_income=Decimal('100000'), max_income=None, tax_rate=Decimal('5')),
+        ])
+        db.session.commit()
+        TaxCalculator.bump_schedule_version()
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+    return client
+
+
+def _rows(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_batch_rounds_half_up_like_submit(user_client):
+    response = user_client.post('/api/tax/calculate/batch', json=[100000.10, 100000.30, 200000])
+
+    assert response.status_code == 200
+    assert [row['tax_amount'] for row in _rows(response)] == [0.01, 0.02, 5000.0]
+
+
+def test_batch_resolves_the_schedule_once(app, user_client, monkeypatch):
+    app.config['TAX_BATCH_CHUNK_SIZE'] = 1
+    lookups = []
+    get_schedule = TaxCalculator.get_schedule
+
+    def counting(year=None, refresh=False):
+        lookups.append(year)
+        return get_schedule(year, refresh)
+
+    monkeypatch.setattr(TaxCalculator, 'get_schedule', staticmethod(counting))
+
+    response = user_client.post('/api/tax/calculate/batch', json=[150000, 250000, 350000])
+
+    assert [row['tax_amount'] for row in _rows(response)] == [2500.0, 7500.0, 12500.0]
+    assert lookups == [None]
@@ -0,0 +1,48 @@
+"""
+Tax submission pricing
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+
+from models import db
+from models.tax_slab import TaxSlab, TaxSlabVersion
+from models.user import User
+import services.tax_calculator as tax_calculator
+from services.tax_calculator import TaxCalculator
+
+
+@pytest.fixture
+def user_client(app, client):
+    with app.app_context():
+        user = User(email='payer@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.add_all([
+            TaxSlab(min_income=Decimal('0'), max_income=Decimal('100000'), tax_rate=Decimal('0')),
+            TaxSlab(min_income=Decimal('100000'), max_income=None, tax_rate=Decimal('5')),
+        ])
+        db.session.commit()
+        TaxCalculator.bump_schedule_version()
+        user_id = user.id
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+    return client
+
+
+def test_submit_sees_slab_edits_from_another_process_immediately(app, user_client, monkeypatch):
+    monkeypatch.setattr(tax_calculator, 'SLAB_VERSION_CHECK_INTERVAL', 3600)
+    quote = user_client.post('/api/tax/calculate', json={'annual_income': 200000}).get_json()
+
+    # Another worker edits the slabs; this process's version check is still fresh
+    with app.app_context():
+        TaxSlab.query.filter(TaxSlab.max_income.is_(None)).update({'tax_rate': Decimal('10')})
+        db.session.execute(update(TaxSlabVersion).where(TaxSlabVersion.id == 1)
+                           .values(version=TaxSlabVersion.version + 1))
+        db.session.commit()
+
+    response = user_client.post('/api/tax/submit', json={'total_income': 200000})
+
+    assert response.status_code == 201
+    assert response.get_json()['submission']['tax_amount'] == 10000.0
+    assert quote['tax_amount'] == 5000.0
@@ -0,0 +1,56 @@
+"""
+Local stand-in for the chatbot completion API
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+
+class StubUpstream:
+    """
+    OpenRouter-shaped HTTP server on a free local port
+
+    mode: 'ok' answers 'ANS:<last message>', 'fail' returns 503,
+    'empty' returns 200 without choices; delay sleeps before answering.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.mode = 'ok'
+        self.delay = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.calls += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if stub.mode == 'fail':
+                    self._send(503, b'')
+                    return
+                answer = {} if stub.mode == 'empty' else {
+                    'choices': [{'message': {'content': 'ANS:' + body['messages'][-1]['content']}}]
+                }
+                self._send(200, json.dumps(answer).encode('utf-8'))
+
+            def _send(self, status, data):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
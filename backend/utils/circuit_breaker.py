@@ -0,0 +1,89 @@
+"""
+Circuit breaker for calls to external services
+"""
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker
+
+    closed     calls go through; failure_threshold consecutive failures open it
+    open       calls are refused until reset_timeout seconds have passed
+    half_open  one probe call goes through; success closes the circuit,
+               failure opens it again for another reset_timeout
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = 'closed'
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self.rejected = 0
+        self.trips = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = 'half_open'
+        return self._state
+
+    def allow(self):
+        """
+        Whether a call may go through now
+
+        In the half-open state only one caller gets True (the probe) until it
+        reports its outcome.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        """Report a successful call"""
+        with self._lock:
+            self._state = 'closed'
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """Report a failed call"""
+        with self._lock:
+            self._failures += 1
+            if self._state == 'half_open' or self._failures >= self.failure_threshold:
+                if self._state != 'open':
+                    self.trips += 1
+                self._state = 'open'
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self):
+        """Get breaker state and counters"""
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'trips': self.trips,
+                'rejected': self.rejected
+            }
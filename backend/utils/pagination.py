@@ -0,0 +1,75 @@
+"""
+Keyset (cursor) pagination helpers
+Cursors are opaque URL-safe tokens holding the sort key of the last row sent
+"""
+from sqlalchemy import and_, or_
+from datetime import datetime
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def get_page_size(args, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Read ?limit= from request args, clamped to [1, maximum]
+
+    Raises:
+        ValueError: If limit is not an integer
+    """
+    value = args.get('limit')
+    if value in (None, ''):
+        return default
+    return max(1, min(int(value), maximum))
+
+
+def encode_cursor(timestamp, row_id):
+    """Build a cursor from a (timestamp, id) sort key"""
+    payload = json.dumps([timestamp.isoformat() if timestamp else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Parse a cursor produced by encode_cursor
+
+    Returns:
+        tuple: (datetime or None, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (datetime.fromisoformat(timestamp) if timestamp else None), int(row_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def parse_date(value, field):
+    """
+    Parse an ISO date/datetime query parameter
+
+    Raises:
+        ValueError: If the value is not ISO formatted
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f'{field} must be an ISO date') from e
+
+
+def keyset_after(query, timestamp_column, id_column, cursor):
+    """
+    Restrict a (timestamp DESC, id DESC) ordered query to rows after cursor
+    """
+    timestamp, row_id = decode_cursor(cursor)
+    if timestamp is None:
+        return query.filter(timestamp_column.is_(None), id_column < row_id)
+    return query.filter(or_(
+        timestamp_column < timestamp,
+        and_(timestamp_column == timestamp, id_column < row_id),
+        timestamp_column.is_(None)
+    ))
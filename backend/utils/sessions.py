@@ -0,0 +1,212 @@
+"""
+Server-side session backends
+SESSION_TYPE selects the backend:
+    filesystem  Flask-Session files, expired by a background sweeper
+    memory      TTL-aware in-process store (single node)
+    redis       Pooled store on any Redis-protocol server
+"""
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from utils.cache import LRUCache
+import os
+import secrets
+import struct
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    from flask_session import Session
+except ImportError:
+    Session = None
+
+_serializer = TaggedJSONSerializer()
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session data held server-side under a random id"""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+        CallbackDict.__init__(self, initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class MemorySessionStore:
+    """In-process session store; entries expire ttl seconds after their last write"""
+
+    def __init__(self, ttl, maxsize=100000):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def load(self, sid):
+        return self._cache.get(sid)
+
+    def save(self, sid, data):
+        self._cache.set(sid, data)
+
+    def delete(self, sid):
+        self._cache.delete(sid)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class RedisSessionStore:
+    """
+    Session store on a Redis-protocol server
+
+    Any client exposing get(key), set(key, value, ex=seconds) and delete(key)
+    works, so a local stand-in can replace the server in development.
+    """
+
+    def __init__(self, client, ttl, prefix='session:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, ttl, pool_size=20, prefix='session:'):
+        """Build a store on a bounded connection pool shared by all requests"""
+        if redis is None:
+            raise RuntimeError("SESSION_TYPE 'redis' requires the redis package")
+        pool = redis.ConnectionPool.from_url(url, max_connections=pool_size)
+        return cls(redis.Redis(connection_pool=pool), ttl, prefix)
+
+    def load(self, sid):
+        value = self.client.get(self.prefix + sid)
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+
+    def save(self, sid, data):
+        self.client.set(self.prefix + sid, data, ex=self.ttl)
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+
+class StoreSessionInterface(SessionInterface):
+    """
+    Session interface over a MemorySessionStore or RedisSessionStore
+
+    The cookie holds only a random session id. The store is written only
+    when the session changed, so ordinary authenticated requests cost one
+    read and no write.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.load(sid)
+            if data:
+                return ServerSession(_serializer.loads(data), sid=sid)
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not session.modified:
+            return
+
+        self.store.save(session.sid, _serializer.dumps(dict(session)))
+        response.set_cookie(
+            name, session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+
+def sweep_session_files(directory, max_age):
+    """
+    Delete filesystem session files that have expired
+
+    A file is expired when its stored expiry has passed or it has not been
+    written for max_age seconds.
+
+    Returns:
+        int: Number of files removed
+    """
+    now = time.time()
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+
+    for entry in entries:
+        try:
+            if not entry.is_file():
+                continue
+            expired = now - entry.stat().st_mtime > max_age
+            if not expired:
+                # Flask-Session files start with a 4-byte expiry timestamp (0 = never)
+                with open(entry.path, 'rb') as f:
+                    header = f.read(4)
+                if len(header) == 4:
+                    expires = struct.unpack('I', header)[0]
+                    expired = expires != 0 and expires < now
+            if expired:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def start_session_sweeper(app, directory, interval, max_age):
+    """Run sweep_session_files every interval seconds in a daemon thread"""
+    def sweep():
+        while True:
+            time.sleep(interval)
+            removed = sweep_session_files(directory, max_age)
+            if removed:
+                app.logger.info(f"Removed {removed} expired session files")
+
+    thread = threading.Thread(target=sweep, daemon=True)
+    thread.start()
+    return thread
+
+
+def init_sessions(app):
+    """Install the session backend selected by SESSION_TYPE"""
+    session_type = app.config.get('SESSION_TYPE', 'filesystem')
+    ttl = app.config.get('SESSION_LIFETIME', 31 * 86400)
+
+    if session_type == 'memory':
+        app.session_interface = StoreSessionInterface(
+            MemorySessionStore(ttl, app.config.get('SESSION_MEMORY_MAX_ENTRIES', 100000))
+        )
+    elif session_type == 'redis':
+        app.session_interface = StoreSessionInterface(RedisSessionStore.from_url(
+            app.config['SESSION_REDIS_URL'], ttl,
+            pool_size=app.config.get('SESSION_REDIS_POOL_SIZE', 20),
+            prefix=app.config.get('SESSION_KEY_PREFIX', 'session:')
+        ))
+    elif Session:
+        Session(app)
+        interval = app.config.get('SESSION_SWEEP_INTERVAL', 0)
+        if session_type == 'filesystem' and interval:
+            directory = app.config.get('SESSION_FILE_DIR') or os.path.join(os.getcwd(), 'flask_session')
+            start_session_sweeper(app, directory, interval, ttl)
+    else:
+        app.logger.warning("Flask-Session not installed; using default client-side sessions.")
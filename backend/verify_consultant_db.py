@@ -3,17 +3,22 @@ from models import db
 from models.consultant import Consultant
 from models.user import User
 
-app = create_app()
-with app.app_context():
-    u = User.query.filter_by(role='consultant').first()
-    c = Consultant.query.first()
-    
-    if u:
-        print(f"✓ Found Consultant User: {u.email}")
-    else:
-        print("✗ Consultant User not found")
+def main():
+    """Check that a consultant user and profile exist"""
+    app = create_app()
+    with app.app_context():
+        u = User.query.filter_by(role='consultant').first()
+        c = Consultant.query.first()
         
-    if c:
-        print(f"✓ Found Consultant Profile: {c.qualification}")
-    else:
-        print("✗ Consultant Profile not found")
+        if u:
+            print(f"✓ Found Consultant User: {u.email}")
+        else:
+            print("✗ Consultant User not found")
+            
+        if c:
+            print(f"✓ Found Consultant Profile: {c.qualification}")
+        else:
+            print("✗ Consultant Profile not found")
+
+if __name__ == '__main__':
+    main()
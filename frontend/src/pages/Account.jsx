@@ -104,122 +104,50 @@ const TaxCalculatorCard = () => {
     ];
   };
 
-  const calculate = () => {
+  const calculate = async () => {
     setLoading(true);
 
-    // --- 1. INCOME CALCULATION ---
-    const basic = Number(salaryIncome.basic) || 0;
-    const houseRent = Number(salaryIncome.houseRent) || 0;
-    const medical = Number(salaryIncome.medical) || 0;
-    const conveyance = Number(salaryIncome.conveyance) || 0;
-    const bonuses = Number(salaryIncome.bonuses) || 0;
-    const overtime = Number(salaryIncome.overtime) || 0;
-    const otherSalaryIncome = Number(salaryIncome.other) || 0;
-
-    // Exemptions (Simplified NBR rules)
-    const houseRentExemption = Math.min(houseRent, basic * 0.3333, 300000);
-    const medicalExemption = Math.min(medical, basic * 0.1, 120000);
-    const conveyanceExemption = Math.min(conveyance, 30000);
-
-    const taxableSalary = (basic) +
-      Math.max(0, houseRent - houseRentExemption) +
-      Math.max(0, medical - medicalExemption) +
-      Math.max(0, conveyance - conveyanceExemption) +
-      bonuses + overtime + otherSalaryIncome;
-
-    const totalTaxableIncome = taxableSalary; // Assuming only salary for this detailed form for now
-
-    // --- 2. TAX LIABILITY CALCULATION ---
-    let exemptionLimit = 350000;
-    if (profile.category === 'woman_senior') exemptionLimit = 400000;
-    else if (profile.category === 'disabled') exemptionLimit = 475000;
-    else if (profile.category === 'freedom_fighter') exemptionLimit = 500000;
-
-    // Extra exemption for parent of disabled child
-    if (profile.parentOfDisabledChild) exemptionLimit += 50000;
-
-    const slabs = [
-      { limit: exemptionLimit, rate: 0 },
-      { limit: 100000, rate: 5 },
-      { limit: 400000, rate: 10 },
-      { limit: 500000, rate: 15 },
-      { limit: 500000, rate: 20 },
-      { limit: 1200000, rate: 25 },
-      { limit: Infinity, rate: 30 }
-    ];
-
-    let remainingTaxable = totalTaxableIncome;
-    let totalTaxLiability = 0;
-    const newBreakdown = [];
-
-    for (const slab of slabs) {
-      if (remainingTaxable <= 0) break;
-      const taxableInSlab = Math.min(remainingTaxable, slab.limit);
-      const taxInSlab = taxableInSlab * (slab.rate / 100);
-
-      if (taxableInSlab > 0) {
-        newBreakdown.push({
-          range: slab.rate === 0 ? t('tax_guide.tax_free_limits.limit') : `৳${slab.limit.toLocaleString()}`,
-          rate: slab.rate,
-          portion: taxableInSlab,
-          tax: taxInSlab
-        });
-        totalTaxLiability += taxInSlab;
-        remainingTaxable -= taxableInSlab;
-      }
-    }
-
-    // --- 3. INVESTMENT REBATE ---
-    const lifeIns = Number(investments.lifeInsurance) || 0;
-    const dps = Math.min(Number(investments.dps) || 0, 120000);
-    const sanchayapatra = Math.min(Number(investments.sanchayapatra) || 0, 500000);
-    const pf = Number(investments.providentFund) || 0;
-    const stocks = Number(investments.stocks) || 0;
-    const zakat = Number(investments.zakat) || 0;
-
-    const totalInvestment = lifeIns + dps + sanchayapatra + pf + stocks + zakat;
-
-    // Rebate = 15% of total investment
-    const rebate = totalInvestment * 0.15;
-
-    // --- 4. SURCHARGE ---
-    const netWealth = Number(adjustments.netWealth) || 0;
-    let surchargeRate = 0;
-    if (netWealth > 40000000 && netWealth <= 100000000) surchargeRate = 0.1;
-    else if (netWealth > 100000000 && netWealth <= 200000000) surchargeRate = 0.2;
-    else if (netWealth > 200000000 && netWealth <= 500000000) surchargeRate = 0.3;
-    else if (netWealth > 500000000) surchargeRate = 0.35;
-
-    const surcharge = totalTaxLiability * surchargeRate;
-
-    // --- 5. FINAL CALCULATION ---
-    const ait = Number(adjustments.ait) || 0;
-    let netTax = Math.max(0, totalTaxLiability - rebate);
-
-    // Minimum Tax based on Location
-    let minTaxValue = 3000;
-    if (profile.location === 'dhaka_ctg_nganj') minTaxValue = 5000;
-    else if (profile.location === 'other_city') minTaxValue = 4000;
-
-    if (totalTaxableIncome > exemptionLimit && netTax < minTaxValue) {
-      netTax = minTaxValue;
+    // The assessment rules live on the server (POST /api/tax/assess)
+    try {
+      const data = await taxService.assessTax({
+        category: profile.category,
+        location: profile.location,
+        parent_of_disabled_child: profile.parentOfDisabledChild,
+        salary: {
+          basic: salaryIncome.basic,
+          house_rent: salaryIncome.houseRent,
+          medical: salaryIncome.medical,
+          conveyance: salaryIncome.conveyance,
+          bonuses: salaryIncome.bonuses,
+          overtime: salaryIncome.overtime,
+          other: salaryIncome.other
+        },
+        investments: {
+          life_insurance: investments.lifeInsurance,
+          dps: investments.dps,
+          sanchayapatra: investments.sanchayapatra,
+          provident_fund: investments.providentFund,
+          stocks: investments.stocks,
+          zakat: investments.zakat
+        },
+        net_wealth: adjustments.netWealth,
+        ait: adjustments.ait
+      });
+
+      setBreakdown(data.breakdown.map((slab) => ({
+        range: slab.rate === 0
+          ? t('tax_guide.tax_free_limits.limit')
+          : `৳${slab.limit === null ? '∞' : slab.limit.toLocaleString()}`,
+        rate: slab.rate,
+        portion: slab.portion,
+        tax: slab.tax
+      })));
+      setResult(data);
+    } catch (error) {
+      console.error('Tax assessment failed:', error);
+    } finally {
+      setLoading(false);
     }
-
-    const finalTaxPayable = netTax + surcharge - ait;
-
-    setBreakdown(newBreakdown);
-    setResult({
-      total_income: (basic + houseRent + medical + conveyance + bonuses + overtime + otherSalaryIncome),
-      taxable_income: totalTaxableIncome,
-      tax_before_rebate: Math.round(totalTaxLiability),
-      investment_rebate: Math.round(rebate),
-      surcharge: Math.round(surcharge),
-      ait: ait,
-      tax_amount: Math.round(finalTaxPayable),
-      effective_rate: totalTaxableIncome ? (finalTaxPayable / totalTaxableIncome) * 100 : 0
-    });
-
-    setLoading(false);
   };
 
   return (
@@ -6,11 +6,15 @@ import consultantService from '../services/consultantService';
 import './ConsultantDashboard.css';
 import './ChatStyles.css';
 
+// Milliseconds between fallback polls for messages the stream did not deliver
+const CATCH_UP_INTERVAL = 10000;
+
 const ActiveConsultation = () => {
     const { t } = useTranslation();
     const { id } = useParams();
     const navigate = useNavigate();
     const messagesEndRef = useRef(null);
+    const lastIdRef = useRef(0);
 
     const [messages, setMessages] = useState([]);
     const [newMessage, setNewMessage] = useState('');
@@ -21,16 +25,44 @@ const ActiveConsultation = () => {
 
     useEffect(() => {
         fetchConsultation();
-        fetchMessages();
-
-        // Poll for new messages every 3 seconds
-        const interval = setInterval(() => {
-            fetchMessages();
-        }, 3000);
 
-        return () => clearInterval(interval);
+        // Load the history once, then receive new messages over a push stream
+        let stream = null;
+        let closed = false;
+        fetchMessages().then((msgs) => {
+            if (closed) return;
+            const lastId = msgs.length ? msgs[msgs.length - 1].id : 0;
+            stream = consultantService.openChatStream(id, lastId);
+            stream.addEventListener('message', (event) => appendMessage(JSON.parse(event.data)));
+            // Re-fetch whatever was missed while the stream was reconnecting
+            stream.addEventListener('open', catchUp);
+        });
+
+        // The push stream only carries messages sent through the same backend
+        // worker, so poll for newer messages as a fallback
+        const poll = setInterval(catchUp, CATCH_UP_INTERVAL);
+
+        return () => {
+            closed = true;
+            clearInterval(poll);
+            if (stream) stream.close();
+        };
     }, [id]);
 
+    const appendMessage = (msg) => {
+        lastIdRef.current = Math.max(lastIdRef.current, msg.id);
+        setMessages(prev => prev.some(m => m.id === msg.id) ? prev : [...prev, msg]);
+    };
+
+    const catchUp = async () => {
+        try {
+            const { messages: msgs } = await consultantService.getChatMessages(id, lastIdRef.current);
+            msgs.forEach(appendMessage);
+        } catch (error) {
+            console.error('Failed to fetch new messages:', error);
+        }
+    };
+
     useEffect(() => {
         scrollToBottom();
     }, [messages]);
@@ -54,10 +86,13 @@ const ActiveConsultation = () => {
         try {
             const { messages: msgs } = await consultantService.getChatMessages(id);
             setMessages(msgs);
+            if (msgs.length) lastIdRef.current = msgs[msgs.length - 1].id;
             setLoading(false);
+            return msgs;
         } catch (error) {
             console.error('Failed to fetch messages:', error);
             setLoading(false);
+            return [];
         }
     };
 
@@ -67,9 +102,9 @@ const ActiveConsultation = () => {
 
         setSending(true);
         try {
-            await consultantService.sendMessage(id, newMessage);
+            const { data } = await consultantService.sendMessage(id, newMessage);
             setNewMessage('');
-            await fetchMessages();
+            appendMessage(data);
         } catch (error) {
             console.error('Failed to send message:', error);
             alert(t('consultant.chat.send_error'));
@@ -8,18 +8,22 @@ const AdminConsultants = () => {
     const { t } = useTranslation();
     const [consultants, setConsultants] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
 
     useEffect(() => {
         loadConsultants();
     }, []);
 
-    const loadConsultants = async () => {
+    const loadConsultants = async (cursor = null) => {
         try {
-            setLoading(true);
+            if (!cursor) setLoading(true);
+            const params = cursor ? { cursor } : {};
             const response = await axios.get('http://localhost:5000/api/consultant/admin/consultants', {
+                params,
                 withCredentials: true
             });
-            setConsultants(response.data.consultants);
+            setConsultants(prev => cursor ? [...prev, ...response.data.consultants] : response.data.consultants);
+            setNextCursor(response.data.next_cursor);
         } catch (error) {
             console.error('Failed to load consultants:', error);
         } finally {
@@ -34,7 +38,7 @@ const AdminConsultants = () => {
     return (
         <div className="consultant-dashboard">
             <header className="dashboard-header">
-                <h1><Users size={28} /> All Consultants ({consultants.length})</h1>
+                <h1><Users size={28} /> All Consultants ({consultants.length}{nextCursor ? '+' : ''})</h1>
                 <p>Monitor and track all tax consultants in the system</p>
             </header>
 
@@ -102,6 +106,13 @@ const AdminConsultants = () => {
                     </div>
                 ))}
             </div>
+            {nextCursor && (
+                <div className="table-controls">
+                    <button className="tab-btn" onClick={() => loadConsultants(nextCursor)}>
+                        Load more
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
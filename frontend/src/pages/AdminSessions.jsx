@@ -11,19 +11,24 @@ const AdminSessions = () => {
     const [sessions, setSessions] = useState([]);
     const [loading, setLoading] = useState(true);
     const [filter, setFilter] = useState('all');
+    const [nextCursor, setNextCursor] = useState(null);
 
     useEffect(() => {
         loadSessions();
     }, [filter]);
 
-    const loadSessions = async () => {
+    const loadSessions = async (cursor = null) => {
         try {
-            setLoading(true);
-            const params = filter !== 'all' ? `?status=${filter}` : '';
-            const response = await axios.get(`http://localhost:5000/api/consultant/admin/sessions${params}`, {
+            if (!cursor) setLoading(true);
+            const params = {};
+            if (filter !== 'all') params.status = filter;
+            if (cursor) params.cursor = cursor;
+            const response = await axios.get('http://localhost:5000/api/consultant/admin/sessions', {
+                params,
                 withCredentials: true
             });
-            setSessions(response.data.sessions);
+            setSessions(prev => cursor ? [...prev, ...response.data.sessions] : response.data.sessions);
+            setNextCursor(response.data.next_cursor);
         } catch (error) {
             console.error('Failed to load sessions:', error);
         } finally {
@@ -143,6 +148,13 @@ const AdminSessions = () => {
                         </tbody>
                     </table>
                 </div>
+                {nextCursor && (
+                    <div className="table-controls">
+                        <button className="tab-btn" onClick={() => loadSessions(nextCursor)}>
+                            Load more
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -3,9 +3,13 @@ import { useNavigate } from 'react-router-dom';
 import { Clock, CheckCircle, XCircle, MessageSquare, UserCircle, AlertCircle } from 'lucide-react';
 import { useTranslation } from 'react-i18next';
 import axios from 'axios';
+import consultantService from '../services/consultantService';
 import './ConsultantDashboard.css';
 import './ChatStyles.css';
 
+// Milliseconds between fallback reloads for changes the stream did not deliver
+const REFRESH_INTERVAL = 15000;
+
 const MyConsultations = () => {
     const { t } = useTranslation();
     const navigate = useNavigate();
@@ -16,17 +20,28 @@ const MyConsultations = () => {
     useEffect(() => {
         loadRequests();
 
-        // Poll for status updates every 5 seconds
-        const interval = setInterval(() => {
-            loadRequests();
-        }, 5000);
+        // Status changes are pushed by the server instead of polled
+        const stream = consultantService.openEventStream();
+        stream.addEventListener('status', (event) => {
+            const updated = JSON.parse(event.data);
+            setRequests(prev => prev.map(req => req.id === updated.id ? { ...req, ...updated } : req));
+        });
+        // Catch up on anything missed while the stream was disconnected
+        stream.addEventListener('open', () => loadRequests(true));
+
+        // The stream only carries changes made through the same backend
+        // worker, so reload quietly now and then as a fallback
+        const poll = setInterval(() => loadRequests(true), REFRESH_INTERVAL);
 
-        return () => clearInterval(interval);
+        return () => {
+            clearInterval(poll);
+            stream.close();
+        };
     }, []);
 
-    const loadRequests = async () => {
+    const loadRequests = async (quiet = false) => {
         try {
-            setLoading(true);
+            if (!quiet) setLoading(true);
             const response = await axios.get('http://localhost:5000/api/consultant/user/requests', {
                 withCredentials: true
             });
@@ -18,8 +18,10 @@ const consultantService = {
         return response.data;
     },
 
-    getChatMessages: async (consultationId) => {
-        const response = await axios.get(`${API_URL}/chat/${consultationId}`, { withCredentials: true });
+    // afterId: only fetch messages newer than the last one already shown
+    getChatMessages: async (consultationId, afterId = null) => {
+        const params = afterId ? { after_id: afterId } : {};
+        const response = await axios.get(`${API_URL}/chat/${consultationId}`, { params, withCredentials: true });
         return response.data;
     },
 
@@ -28,6 +30,16 @@ const consultantService = {
         return response.data;
     },
 
+    // Server-Sent Events: new messages after afterId, pushed as they are sent
+    openChatStream: (consultationId, afterId = 0) => {
+        return new EventSource(`${API_URL}/chat/${consultationId}/stream?after_id=${afterId}`, { withCredentials: true });
+    },
+
+    // Server-Sent Events: status changes of the current user's requests
+    openEventStream: () => {
+        return new EventSource(`${API_URL}/events`, { withCredentials: true });
+    },
+
     getProfile: async () => {
         const response = await axios.get(`${API_URL}/profile`, { withCredentials: true });
         return response.data;
@@ -13,6 +13,14 @@ const taxService = {
         return response.data;
     },
 
+    /**
+     * Run the full server-side tax assessment
+     */
+    async assessTax(assessment) {
+        const response = await api.post('/tax/assess', assessment);
+        return response.data;
+    },
+
     /**
      * Submit tax form
      */